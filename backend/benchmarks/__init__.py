@@ -0,0 +1,14 @@
+"""
+Benchmarks
+Latency, throughput and peak memory of indicators, strategies, backtests and
+HTTP endpoints, tracked in a JSON history file (``python -m benchmarks``)
+"""
+from .harness import BenchmarkCase, measure, find_regressions, load_history, save_history
+
+__all__ = [
+    "BenchmarkCase",
+    "measure",
+    "find_regressions",
+    "load_history",
+    "save_history",
+]
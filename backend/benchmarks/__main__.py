@@ -0,0 +1,108 @@
+"""
+Run the benchmarks from the backend directory:
+
+    python -m benchmarks --sizes 1000,10000,100000,1000000
+
+Results are appended to the history file, and the exit status is 1 when a
+case regressed against its recent history (see ``find_regressions``).
+"""
+import argparse
+import gc
+import sys
+from benchmarks.cases import GROUPS, build_cases, create_app, mock_series
+from benchmarks.harness import (
+    find_regressions,
+    load_history,
+    record_run,
+    run_cases,
+    save_history,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma-separated candle counts")
+    parser.add_argument("--groups", default=",".join(GROUPS),
+                        help=f"comma-separated subset of {', '.join(GROUPS)}")
+    parser.add_argument("--filter", default=None, help="only cases whose key contains this text")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--http-max-size", type=int, default=100_000,
+                        help="largest series sent through the HTTP endpoints (JSON bodies grow fast)")
+    parser.add_argument("--min-repeat", type=int, default=3)
+    parser.add_argument("--max-repeat", type=int, default=50)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to spend timing each case")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurement")
+    parser.add_argument("--history", default="benchmarks/history.json")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown of the median latency, as a fraction")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="allowed growth of peak memory, as a fraction")
+    parser.add_argument("--window", type=int, default=5, help="recorded runs forming the baseline")
+    parser.add_argument("--label", default=None, help="free-form label stored with the run")
+    parser.add_argument("--no-record", action="store_true", help="compare without appending to the history")
+    parser.add_argument("--no-fail", action="store_true", help="exit 0 even when a case regressed")
+    return parser.parse_args(argv)
+
+
+def report(result):
+    memory = f"{result['peak_memory_mb']:9.2f} MB" if result["peak_memory_mb"] is not None else ""
+    throughput = f"{result['candles_per_second']:14,.0f} c/s" if result["candles_per_second"] else ""
+    print(
+        f"{result['group'] + '/' + result['name']:58s} {result['size']:>9,d} "
+        f"p50 {result['p50_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms  {throughput} {memory}",
+        flush=True
+    )
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    groups = [group for group in args.groups.split(",") if group]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        print(f"Unknown groups: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    client = None
+    if "http" in groups:
+        from fastapi.testclient import TestClient
+        client = TestClient(create_app())
+        client.__enter__()
+
+    results = []
+    try:
+        for size in sizes:
+            series = mock_series(size, args.seed)
+            # Request models are only built for sizes the HTTP group runs at
+            cases = build_cases(groups, series, client if size <= args.http_max_size else None)
+            gc.collect()
+            if args.filter:
+                cases = [case for case in cases if args.filter in case.key]
+            results += run_cases(
+                cases, args.min_repeat, args.max_repeat, args.min_time,
+                trace_memory=not args.no_memory, report=report
+            )
+    finally:
+        if client is not None:
+            client.__exit__(None, None, None)
+
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, args.threshold, args.memory_threshold, args.window)
+    if not args.no_record:
+        history.append(record_run(results, regressions, args.label))
+        save_history(args.history, history)
+
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['case']} {regression['metric']}: "
+            f"{regression['baseline']} -> {regression['value']} ({regression['change_percent']:+}%)",
+            file=sys.stderr
+        )
+    if regressions and not args.no_fail:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
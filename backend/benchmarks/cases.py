@@ -0,0 +1,171 @@
+"""
+Benchmark Cases
+Indicators (both kernel backends), strategies, backtests and HTTP endpoints
+over seeded mock series
+"""
+import json
+import os
+from typing import Iterator, List
+from models.execution import ExecutionModel
+from models.ohlcv_series import OHLCVSeries
+from services.market_service import MarketService
+from services.strategy_service import StrategyService
+from services.backtest_service import BacktestService
+from services.indicator_cache import indicator_cache
+from utils import technical_indicators, fast_indicators
+from benchmarks.harness import BenchmarkCase
+
+GROUPS = ("indicators", "strategies", "backtest", "http")
+
+# (function, input columns, extra arguments)
+INDICATOR_CALLS = (
+    ("calculate_sma", ("close",), (20,)),
+    ("calculate_ema", ("close",), (20,)),
+    ("calculate_rsi", ("close",), (14,)),
+    ("calculate_macd", ("close",), (12, 26, 9)),
+    ("calculate_bollinger_bands", ("close",), (20, 2.0)),
+    ("calculate_atr", ("high", "low", "close"), (14,)),
+    ("calculate_stochastic", ("high", "low", "close"), (14, 3)),
+)
+
+# Fills with every execution feature on, for the simulator's worst case
+EXECUTION = ExecutionModel(
+    stop_loss=0.02,
+    take_profit=0.04,
+    fee_rate=0.001,
+    slippage=0.0005,
+    allow_short=True,
+    max_entries=3,
+)
+
+# (name, path, request body without market_data)
+HTTP_CALLS = (
+    ("indicators_calculate", "/api/indicators/calculate", {"indicator_config": {"type": "rsi", "period": 14}}),
+    ("indicators_calculate_multiple", "/api/indicators/calculate-multiple", {
+        "configs": [
+            {"type": "sma", "period": 20},
+            {"type": "ema", "period": 20},
+            {"type": "rsi", "period": 14},
+            {"type": "macd"},
+            {"type": "bollinger_bands", "period": 20},
+        ]
+    }),
+    ("strategies_execute", "/api/strategies/execute", {"strategy_id": "trend_follow_ema"}),
+    ("backtest_run", "/api/backtest/run", {"strategy_id": "trend_follow_ema"}),
+)
+
+
+def mock_series(size: int, seed: int) -> OHLCVSeries:
+    """
+    Reproducible mock candles: the values depend only on ``seed``
+    """
+    return MarketService.generate_mock_series("BENCH", num_candles=size, seed=seed)
+
+
+def indicator_cases(series: OHLCVSeries) -> Iterator[BenchmarkCase]:
+    for backend, module in (("pandas", technical_indicators), ("numpy", fast_indicators)):
+        for function, columns, arguments in INDICATOR_CALLS:
+            fn = getattr(module, function)
+            inputs = tuple(getattr(series, column) for column in columns)
+            yield BenchmarkCase(
+                "indicators",
+                f"{backend}.{function}",
+                len(series),
+                lambda fn=fn, inputs=inputs, arguments=arguments: fn(*inputs, *arguments)
+            )
+
+
+def strategy_cases(series: OHLCVSeries) -> Iterator[BenchmarkCase]:
+    # A fresh memo per call: indicators are computed, not served from a cache
+    for strategy in StrategyService.get_predefined_strategies():
+        strategy_id, parameters = strategy["id"], strategy["parameters"]
+        yield BenchmarkCase(
+            "strategies",
+            f"{strategy_id}.generate_signals",
+            len(series),
+            lambda strategy_id=strategy_id, parameters=parameters: StrategyService.generate_signals(
+                strategy_id, series, parameters, {}
+            )
+        )
+        yield BenchmarkCase(
+            "strategies",
+            f"{strategy_id}.execute_strategy",
+            len(series),
+            lambda strategy_id=strategy_id, parameters=parameters: StrategyService.execute_strategy(
+                strategy_id, series, parameters, {}
+            )
+        )
+
+
+def backtest_cases(series: OHLCVSeries) -> Iterator[BenchmarkCase]:
+    for strategy in StrategyService.get_predefined_strategies():
+        strategy_id, parameters = strategy["id"], strategy["parameters"]
+        yield BenchmarkCase(
+            "backtest",
+            f"{strategy_id}.run_backtest",
+            len(series),
+            lambda strategy_id=strategy_id, parameters=parameters: BacktestService.run_backtest(
+                strategy_id, series, parameters=parameters, indicator_cache={}
+            )
+        )
+        yield BenchmarkCase(
+            "backtest",
+            f"{strategy_id}.run_backtest_execution",
+            len(series),
+            lambda strategy_id=strategy_id, parameters=parameters: BacktestService.run_backtest(
+                strategy_id, series, parameters=parameters, indicator_cache={}, execution=EXECUTION
+            )
+        )
+
+
+def create_app():
+    """
+    The API routers in an app of their own. The database client connects
+    lazily and inline market data never reaches it, so no MongoDB server or
+    startup hooks are needed.
+    """
+    from fastapi import FastAPI
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from routes import market_router, indicators_router, strategies_router, backtest_router
+    from services.market_data_store import MarketDataStore
+    from utils.json_codec import FastJSONResponse
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    for router in (market_router, indicators_router, strategies_router, backtest_router):
+        app.include_router(router, prefix="/api")
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    app.state.market_store = MarketDataStore(client[os.environ.get("DB_NAME", "benchmarks")])
+    return app
+
+
+def http_cases(client, series: OHLCVSeries) -> Iterator[BenchmarkCase]:
+    # The request body is the MarketData JSON; its models are only needed
+    # while the payloads are encoded
+    size = len(series)
+    candles = json.loads(series.to_market_data().model_dump_json())
+    for name, path, body in HTTP_CALLS:
+        payload = json.dumps({**body, "market_data": candles}).encode()
+
+        def call(path=path, payload=payload):
+            response = client.post(path, content=payload, headers={"Content-Type": "application/json"})
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.text[:200]}")
+
+        # The shared indicator cache is cleared so each request computes
+        yield BenchmarkCase("http", name, size, call, setup=indicator_cache.clear)
+
+
+def build_cases(groups: List[str], series: OHLCVSeries, client=None) -> List[BenchmarkCase]:
+    """
+    Cases of the selected groups; HTTP cases only run with a ``client``
+    """
+    cases = []
+    if "indicators" in groups:
+        cases += indicator_cases(series)
+    if "strategies" in groups:
+        cases += strategy_cases(series)
+    if "backtest" in groups:
+        cases += backtest_cases(series)
+    if "http" in groups and client is not None:
+        cases += http_cases(client, series)
+    return cases
@@ -0,0 +1,204 @@
+"""
+Benchmark Harness
+Times benchmark cases, records the results to a JSON history file and flags
+runs that regress against the recent history of the same case
+"""
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+
+class BenchmarkCase:
+    """
+    One timed operation over a series of ``size`` candles. ``setup`` runs
+    untimed before every call, e.g. to clear a cache.
+    """
+    __slots__ = ("group", "name", "size", "fn", "setup")
+
+    def __init__(self, group: str, name: str, size: int, fn: Callable, setup: Optional[Callable] = None):
+        self.group = group
+        self.name = name
+        self.size = size
+        self.fn = fn
+        self.setup = setup
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}/{self.name}@{self.size}"
+
+
+def measure(
+    case: BenchmarkCase,
+    min_repeat: int = 3,
+    max_repeat: int = 50,
+    min_time: float = 1.0,
+    trace_memory: bool = True
+) -> Dict:
+    """
+    Latency percentiles and throughput over at least ``min_repeat`` calls
+    (more, up to ``max_repeat``, until ``min_time`` seconds are spent), plus
+    the peak traced memory of one separate call. One untimed warm-up call
+    runs first.
+    """
+    if case.setup:
+        case.setup()
+    case.fn()
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_repeat and (
+        len(latencies) < min_repeat or time.perf_counter() - started < min_time
+    ):
+        if case.setup:
+            case.setup()
+        gc.collect()
+        start = time.perf_counter()
+        case.fn()
+        latencies.append(time.perf_counter() - start)
+
+    peak_bytes = None
+    if trace_memory:
+        # Traced separately: tracemalloc slows allocation-heavy code down
+        if case.setup:
+            case.setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            case.fn()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) * 1000
+    p50 = float(np.percentile(latencies_ms, 50))
+    return {
+        "group": case.group,
+        "name": case.name,
+        "size": case.size,
+        "repeat": len(latencies),
+        "min_ms": round(float(latencies_ms.min()), 4),
+        "mean_ms": round(float(latencies_ms.mean()), 4),
+        "p50_ms": round(p50, 4),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "max_ms": round(float(latencies_ms.max()), 4),
+        "candles_per_second": round(case.size / (p50 / 1000), 1) if p50 > 0 else None,
+        "peak_memory_mb": round(peak_bytes / 2**20, 3) if peak_bytes is not None else None,
+    }
+
+
+def environment() -> Dict:
+    """
+    Details that make timings comparable between runs
+    """
+    import pandas as pd
+    from services.indicator_service import IndicatorService
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "indicator_backend": IndicatorService.backend,
+    }
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: List[Dict]):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(temporary, path)
+
+
+def find_regressions(
+    results: List[Dict],
+    history: List[Dict],
+    threshold: float = 0.25,
+    memory_threshold: float = 0.25,
+    window: int = 5
+) -> List[Dict]:
+    """
+    Cases whose median latency (or peak memory) exceeds the median of the
+    same case over the last ``window`` recorded runs by more than
+    ``threshold`` (``memory_threshold``). Only runs recorded with the same
+    indicator backend are compared.
+    """
+    backend = environment()["indicator_backend"]
+    previous = {}
+    for run in history:
+        if run.get("environment", {}).get("indicator_backend") != backend:
+            continue
+        for result in run["results"]:
+            key = f"{result['group']}/{result['name']}@{result['size']}"
+            previous.setdefault(key, []).append(result)
+
+    regressions = []
+    for result in results:
+        key = f"{result['group']}/{result['name']}@{result['size']}"
+        recent = previous.get(key, [])[-window:]
+        if not recent:
+            continue
+        baseline = float(np.median([r["p50_ms"] for r in recent]))
+        if result["p50_ms"] > baseline * (1 + threshold):
+            regressions.append({
+                "case": key,
+                "metric": "p50_ms",
+                "baseline": round(baseline, 4),
+                "value": result["p50_ms"],
+                "change_percent": round((result["p50_ms"] / baseline - 1) * 100, 1),
+            })
+        peaks = [r["peak_memory_mb"] for r in recent if r.get("peak_memory_mb") is not None]
+        if result.get("peak_memory_mb") is not None and peaks:
+            baseline = float(np.median(peaks))
+            # Ignore sub-megabyte noise
+            if result["peak_memory_mb"] > baseline * (1 + memory_threshold) + 1.0:
+                regressions.append({
+                    "case": key,
+                    "metric": "peak_memory_mb",
+                    "baseline": round(baseline, 3),
+                    "value": result["peak_memory_mb"],
+                    "change_percent": round((result["peak_memory_mb"] / baseline - 1) * 100, 1) if baseline else None,
+                })
+    return regressions
+
+
+def run_cases(
+    cases: List[BenchmarkCase],
+    min_repeat: int = 3,
+    max_repeat: int = 50,
+    min_time: float = 1.0,
+    trace_memory: bool = True,
+    report: Optional[Callable[[Dict], None]] = None
+) -> List[Dict]:
+    results = []
+    for case in cases:
+        result = measure(case, min_repeat, max_repeat, min_time, trace_memory)
+        results.append(result)
+        if report:
+            report(result)
+    return results
+
+
+def record_run(results: List[Dict], regressions: List[Dict], label: Optional[str] = None) -> Dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "label": label,
+        "environment": environment(),
+        "results": results,
+        "regressions": regressions,
+    }
@@ -1,17 +1,31 @@
-from .market_data import MarketData, MarketDataCreate, OHLCV
+from .market_data import MarketData, MarketDataCreate, MarketDataQuery, MarketDataSource, MockMarketModel, OHLCV
+from .ohlcv_series import OHLCVSeries
 from .indicator import Indicator, IndicatorConfig
 from .strategy import Strategy, StrategyConfig, StrategyResult
+from .execution import ExecutionModel, SlippageModel
+from .monte_carlo import MonteCarloConfig, MonteCarloMode
+from .equity_chart import DownsampleMethod, EquityChartConfig
 from .signal import Signal, SignalType
 
 __all__ = [
     "MarketData",
     "MarketDataCreate",
+    "MarketDataQuery",
+    "MarketDataSource",
+    "MockMarketModel",
     "OHLCV",
+    "OHLCVSeries",
     "Indicator",
     "IndicatorConfig",
     "Strategy",
     "StrategyConfig",
     "StrategyResult",
+    "ExecutionModel",
+    "SlippageModel",
+    "MonteCarloConfig",
+    "MonteCarloMode",
+    "DownsampleMethod",
+    "EquityChartConfig",
     "Signal",
     "SignalType",
 ]
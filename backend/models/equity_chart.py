@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from enum import Enum
+
+class DownsampleMethod(str, Enum):
+    LTTB = "lttb"  # largest-triangle-three-buckets: keeps the line's shape
+    MIN_MAX = "minmax"  # each bucket's lowest and highest point: keeps extremes
+
+class EquityChartConfig(BaseModel):
+    """
+    The equity and drawdown curves of a backtest reduced to at most
+    ``points`` candles for plotting
+    """
+    points: int = Field(500, ge=3, le=100000)
+    method: DownsampleMethod = DownsampleMethod.LTTB
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from enum import Enum
+
+class SlippageModel(str, Enum):
+    PERCENT = "percent"  # fraction of the fill price
+    FIXED = "fixed"  # price units
+    RANGE = "range"  # fraction of the fill candle's high - low
+
+class ExecutionModel(BaseModel):
+    """
+    How a backtest fills orders. Signals fill at the signal candle's close;
+    stop-loss and take-profit levels are checked against each later
+    candle's high and low. Market orders (signals, stops, the final exit)
+    pay slippage, take-profit limit orders do not; every order pays fees.
+    """
+    stop_loss: Optional[float] = Field(None, gt=0)  # fraction of the average entry price
+    take_profit: Optional[float] = Field(None, gt=0)
+    fee_rate: float = Field(0.0, ge=0)  # fraction of each order's notional
+    fee_per_order: float = Field(0.0, ge=0)
+    slippage_model: SlippageModel = SlippageModel.PERCENT
+    slippage: float = Field(0.0, ge=0)
+    allow_short: bool = False  # SELL signals open (or reverse into) shorts
+    max_entries: int = Field(1, ge=1)  # pyramiding: entries per position
+
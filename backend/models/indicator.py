@@ -11,13 +11,27 @@ class IndicatorType(str, Enum):
     ATR = "atr"
     STOCHASTIC = "stochastic"
 
+# Output lines of each indicator; the first is returned as ``values``
+INDICATOR_LINES = {
+    IndicatorType.SMA: ("value",),
+    IndicatorType.EMA: ("value",),
+    IndicatorType.RSI: ("value",),
+    IndicatorType.MACD: ("macd", "signal", "histogram"),
+    IndicatorType.BOLLINGER_BANDS: ("middle", "upper", "lower"),
+    IndicatorType.ATR: ("value",),
+    IndicatorType.STOCHASTIC: ("k", "d"),
+}
+
 class IndicatorConfig(BaseModel):
     type: IndicatorType
     period: int = 14
     params: Optional[Dict[str, Any]] = None
+    outputs: Optional[List[str]] = None  # line names, or ["all"], to fill Indicator.lines
+    fill_warmup: bool = True  # False: warm-up candles stay NaN (null in JSON) instead of 0/50
 
 class Indicator(BaseModel):
     name: str
     type: IndicatorType
     values: List[float]
     config: IndicatorConfig
+    lines: Optional[Dict[str, List[float]]] = None
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
 class TimeFrame(str, Enum):
@@ -12,6 +12,16 @@ class TimeFrame(str, Enum):
     H4 = "4h"
     D1 = "1d"
 
+TIMEFRAME_DELTAS = {
+    TimeFrame.M1: timedelta(minutes=1),
+    TimeFrame.M5: timedelta(minutes=5),
+    TimeFrame.M15: timedelta(minutes=15),
+    TimeFrame.M30: timedelta(minutes=30),
+    TimeFrame.H1: timedelta(hours=1),
+    TimeFrame.H4: timedelta(hours=4),
+    TimeFrame.D1: timedelta(days=1),
+}
+
 class OHLCV(BaseModel):
     timestamp: datetime
     open: float
@@ -26,7 +36,58 @@ class MarketData(BaseModel):
     data: List[OHLCV]
     last_updated: datetime = Field(default_factory=datetime.utcnow)
 
+class VolatilityModel(str, Enum):
+    CONSTANT = "constant"
+    GARCH = "garch"
+
+class MockMarketModel(BaseModel):
+    """
+    Price process of generated mock candles: geometric Brownian motion with
+    optional GARCH(1,1) volatility clustering, a calm/turbulent Markov
+    regime and Poisson jumps. Rates and volatilities are per candle.
+    """
+    drift: float = 0.0
+    volatility: float = Field(0.02, gt=0)  # long-run level under GARCH
+    volatility_model: VolatilityModel = VolatilityModel.CONSTANT
+    garch_alpha: float = Field(0.08, ge=0)
+    garch_beta: float = Field(0.9, ge=0)
+    regime_switching: bool = False
+    turbulent_multiplier: float = Field(3.0, gt=0)  # volatility scale in the turbulent regime
+    calm_to_turbulent: float = Field(0.002, gt=0, le=1)  # switch probabilities per candle
+    turbulent_to_calm: float = Field(0.02, gt=0, le=1)
+    jump_intensity: float = Field(0.0, ge=0)  # expected jumps per candle
+    jump_mean: float = 0.0  # log size of one jump
+    jump_std: float = Field(0.03, ge=0)
+    base_volume: float = Field(3000000.0, gt=0)
+
+    @model_validator(mode="after")
+    def check_garch(self):
+        if self.volatility_model == VolatilityModel.GARCH and self.garch_alpha + self.garch_beta >= 1:
+            raise ValueError("garch_alpha + garch_beta must be below 1")
+        return self
+
 class MarketDataCreate(BaseModel):
     symbol: str
     timeframe: TimeFrame = TimeFrame.M5
-    num_candles: int = 100
+    num_candles: int = Field(100, ge=0)
+    base_price: float = Field(50000.0, gt=0)
+    seed: Optional[int] = None  # same seed and model, same candles
+    model: MockMarketModel = Field(default_factory=MockMarketModel)
+
+class MarketDataQuery(BaseModel):
+    """Candles to load from the OHLCV store instead of sending them inline"""
+    symbol: str
+    timeframe: TimeFrame
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+class MarketDataSource(BaseModel):
+    """Base for requests taking either inline ``market_data`` or a stored ``query``"""
+    market_data: Optional[MarketData] = None
+    query: Optional[MarketDataQuery] = None
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.market_data is None) == (self.query is None):
+            raise ValueError("Provide exactly one of market_data or query")
+        return self
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from enum import Enum
+
+class MonteCarloMode(str, Enum):
+    BOOTSTRAP = "bootstrap"  # draw trades with replacement
+    RESHUFFLE = "reshuffle"  # same trades in a random order
+    SKIP = "skip"  # drop each trade with skip_probability
+
+class MonteCarloConfig(BaseModel):
+    """
+    Resampling of a backtest's trade returns: each resample is a new trade
+    sequence compounded from the initial capital
+    """
+    mode: MonteCarloMode = MonteCarloMode.BOOTSTRAP
+    resamples: int = Field(10000, ge=1, le=1000000)
+    skip_probability: float = Field(0.1, ge=0, lt=1)
+    ruin_drawdown: float = Field(0.5, gt=0, le=1)  # ruined below (1 - this) x initial capital
+    percentiles: List[float] = Field(default_factory=lambda: [5.0, 25.0, 50.0, 75.0, 95.0])
+    bins: int = Field(50, ge=1, le=1000)  # histogram bins of each distribution
+    seed: Optional[int] = None
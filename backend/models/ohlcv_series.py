@@ -0,0 +1,194 @@
+"""Columnar, NumPy-backed OHLCV container for the compute hot path"""
+from datetime import datetime, timezone, tzinfo
+from typing import List, Optional, Union
+import hashlib
+import numpy as np
+from models.market_data import OHLCV, MarketData, TimeFrame
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_epoch_ns(value: datetime) -> int:
+    """
+    Nanoseconds since the Unix epoch, treating naive datetimes as UTC
+    """
+    return int(np.datetime64(_to_naive_utc(value), "ns").astype(np.int64))
+
+
+def to_datetimes(timestamps: np.ndarray, tz: Optional[tzinfo] = None) -> List[datetime]:
+    """
+    Epoch-nanosecond timestamps as naive UTC datetimes, or as aware
+    datetimes in ``tz`` when one is given
+    """
+    values = np.asarray(timestamps, dtype=np.int64).astype("datetime64[ns]").astype("datetime64[us]").tolist()
+    if tz is None:
+        return values
+    return [value.replace(tzinfo=timezone.utc).astimezone(tz) for value in values]
+
+
+class OHLCVSeries:
+    """
+    Market series stored as contiguous columns instead of ``List[OHLCV]``.
+
+    Prices and volume are float64 arrays and ``timestamp`` is an int64 array
+    of nanoseconds since the Unix epoch (UTC). Slicing returns a view that
+    shares the underlying buffers, so ``series[:i+1]`` costs O(1).
+
+    ``tzinfo`` is the zone of the caller's timestamps: datetimes handed
+    back (candles, trade logs) are converted to it, or are naive UTC when
+    the input was naive.
+    """
+    __slots__ = (
+        "symbol", "timeframe", "timestamp",
+        "open", "high", "low", "close", "volume",
+        "last_updated", "tzinfo",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        timeframe: TimeFrame,
+        timestamp: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        last_updated: Optional[datetime] = None,
+        tzinfo: Optional[tzinfo] = None
+    ):
+        self.symbol = symbol
+        self.timeframe = TimeFrame(timeframe)
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.last_updated = last_updated or datetime.utcnow()
+        self.tzinfo = tzinfo
+
+        n = len(self.timestamp)
+        for column in (self.open, self.high, self.low, self.close, self.volume):
+            if column.ndim != 1 or len(column) != n:
+                raise ValueError("OHLCV columns must be 1-D arrays of equal length")
+
+    @classmethod
+    def from_market_data(cls, market_data: MarketData) -> "OHLCVSeries":
+        """
+        Build a series from the API's ``MarketData`` model
+        """
+        candles = market_data.data
+        n = len(candles)
+        timestamps = np.array(
+            [_to_naive_utc(c.timestamp) for c in candles], dtype="datetime64[us]"
+        ).astype("datetime64[ns]").view(np.int64)
+
+        return cls(
+            symbol=market_data.symbol,
+            timeframe=market_data.timeframe,
+            timestamp=timestamps,
+            open=np.fromiter((c.open for c in candles), dtype=np.float64, count=n),
+            high=np.fromiter((c.high for c in candles), dtype=np.float64, count=n),
+            low=np.fromiter((c.low for c in candles), dtype=np.float64, count=n),
+            close=np.fromiter((c.close for c in candles), dtype=np.float64, count=n),
+            volume=np.fromiter((c.volume for c in candles), dtype=np.float64, count=n),
+            last_updated=market_data.last_updated,
+            tzinfo=candles[0].timestamp.tzinfo if candles else None
+        )
+
+    @classmethod
+    def coerce(cls, data: Union[MarketData, "OHLCVSeries"]) -> "OHLCVSeries":
+        """
+        Return ``data`` as a series, converting ``MarketData`` if needed
+        """
+        if isinstance(data, cls):
+            return data
+        return cls.from_market_data(data)
+
+    def to_market_data(self) -> MarketData:
+        """
+        Convert back to the API's ``MarketData`` model
+        """
+        timestamps = self.datetimes()
+        candles = [
+            OHLCV.model_construct(
+                timestamp=ts, open=o, high=h, low=l, close=c, volume=v
+            )
+            for ts, o, h, l, c, v in zip(
+                timestamps,
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+            )
+        ]
+        return MarketData(
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            data=candles,
+            last_updated=self.last_updated
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[OHLCV, "OHLCVSeries"]:
+        if isinstance(index, slice):
+            return OHLCVSeries(
+                symbol=self.symbol,
+                timeframe=self.timeframe,
+                timestamp=self.timestamp[index],
+                open=self.open[index],
+                high=self.high[index],
+                low=self.low[index],
+                close=self.close[index],
+                volume=self.volume[index],
+                last_updated=self.last_updated,
+                tzinfo=self.tzinfo
+            )
+        return OHLCV.model_construct(
+            timestamp=self.datetime_at(index),
+            open=float(self.open[index]),
+            high=float(self.high[index]),
+            low=float(self.low[index]),
+            close=float(self.close[index]),
+            volume=float(self.volume[index])
+        )
+
+    def datetime_at(self, index: int) -> datetime:
+        """
+        Timestamp of one candle as a datetime in the series' zone
+        """
+        return to_datetimes(self.timestamp[[index]], self.tzinfo)[0]
+
+    def datetimes(self) -> List[datetime]:
+        """
+        Timestamps of every candle as datetimes in the series' zone
+        """
+        return to_datetimes(self.timestamp, self.tzinfo)
+
+    def content_hash(self) -> str:
+        """
+        Hex digest identifying the symbol, timeframe and candle values
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.symbol}|{self.timeframe.value}|{len(self)}".encode())
+        if self.tzinfo is not None:
+            # Results carry datetimes in this zone
+            digest.update(f"|{self.tzinfo}".encode())
+        for column in (self.timestamp, self.open, self.high, self.low, self.close, self.volume):
+            digest.update(np.ascontiguousarray(column).data)
+        return digest.hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            column.nbytes
+            for column in (self.timestamp, self.open, self.high, self.low, self.close, self.volume)
+        )
@@ -1,36 +1,373 @@
 """Backtest API Routes"""
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Optional
-from models.market_data import MarketData
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel, Field, model_validator
+from models.execution import ExecutionModel
+from models.monte_carlo import MonteCarloConfig
+from models.equity_chart import EquityChartConfig
+from models.market_data import MarketData, MarketDataQuery, MarketDataSource
+from models.ohlcv_series import to_epoch_ns
+from services.strategy_service import StrategyNotFoundError
 from services.backtest_service import BacktestService
+from services.optimizer_service import OptimizerService
+from services.walk_forward_service import WalkForwardService
+from services.portfolio_backtest_service import PortfolioBacktestService
+from services.backtest_job_service import BacktestJobService
+from services.compute_executor import compute_executor, ComputeSaturatedError, ComputeTimeoutError
+from services.market_data_store import MarketDataStore, MarketDataNotFoundError
+from routes.market import get_market_store, columnar_response
+from utils import monte_carlo
+from utils.json_codec import FastJSONResponse
+from utils.monte_carlo import trade_returns
 
 router = APIRouter(prefix="/backtest", tags=["backtest"])
 
 
-class BacktestRequest(BaseModel):
+class BacktestRequest(MarketDataSource):
     strategy_id: str
-    market_data: MarketData
     initial_capital: float = 10000.0
     position_size: float = 0.1
     parameters: Optional[Dict] = None
+    vectorized: bool = True
+    execution: Optional[ExecutionModel] = None
+    monte_carlo: Optional[MonteCarloConfig] = None
+    equity_chart: Optional[EquityChartConfig] = None  # downsampled equity and drawdown
+
+
+class BacktestJobRequest(MarketDataSource):
+    strategy_id: str
+    initial_capital: float = 10000.0
+    position_size: float = 0.1
+    parameters: Optional[Dict] = None
+    execution: Optional[ExecutionModel] = None
+
+
+class PortfolioBacktestRequest(BaseModel):
+    strategy_id: str
+    market_data: Optional[List[MarketData]] = None
+    queries: Optional[List[MarketDataQuery]] = None
+    initial_capital: float = 10000.0
+    position_size: float = 0.1
+    max_positions: Optional[int] = None
+    parameters: Optional[Dict] = None
+    include_details: bool = False
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.market_data is None) == (self.queries is None):
+            raise ValueError("Provide exactly one of market_data or queries")
+        return self
+
+
+def get_backtest_jobs(request: Request) -> BacktestJobService:
+    return request.app.state.backtest_jobs
+
+
+class OptimizeRequest(MarketDataSource):
+    strategy_id: str
+    parameter_grid: Dict[str, List[Any]]
+    method: str = "grid"  # "grid" or "random"
+    max_evaluations: Optional[int] = None
+    seed: Optional[int] = None
+    rank_by: str = "roi_percent"
+    initial_capital: float = 10000.0
+    position_size: float = 0.1
+    parameters: Optional[Dict] = None  # fixed parameters shared by every run
+    max_workers: Optional[int] = None
+    top_n: Optional[int] = None
+    execution: Optional[ExecutionModel] = None
+
+
+class MonteCarloRequest(MonteCarloConfig):
+    profits: List[float]  # closed trades' profits in the order they settled
+    initial_capital: float = Field(10000.0, gt=0)
+
+
+class WalkForwardRequest(MarketDataSource):
+    strategy_id: str
+    parameter_grid: Dict[str, List[Any]]
+    train_size: int = Field(..., gt=0)  # candles per training window
+    test_size: int = Field(..., gt=0)  # candles per test window, also the step
+    anchored: bool = False  # training windows all start at the first candle
+    method: str = "grid"
+    max_evaluations: Optional[int] = None
+    seed: Optional[int] = None
+    rank_by: str = "roi_percent"
+    initial_capital: float = 10000.0
+    position_size: float = 0.1
+    parameters: Optional[Dict] = None
+    max_workers: Optional[int] = None
+    top_n: Optional[int] = None  # training results listed per fold
+    execution: Optional[ExecutionModel] = None
+    include_details: bool = False
 
 
 @router.post("/run")
-async def run_backtest(request: BacktestRequest):
+async def run_backtest(
+    request: BacktestRequest,
+    store: MarketDataStore = Depends(get_market_store)
+):
     """
     Run a backtest on historical data
     """
     try:
-        result = BacktestService.run_backtest(
+        market_data = await store.resolve(request.market_data, request.query)
+        result = await compute_executor.run_process(
+            BacktestService.run_backtest,
+            strategy_id=request.strategy_id,
+            market_data=market_data,
+            initial_capital=request.initial_capital,
+            position_size=request.position_size,
+            parameters=request.parameters,
+            vectorized=request.vectorized,
+            execution=request.execution,
+            monte_carlo=request.monte_carlo,
+            equity_chart=request.equity_chart
+        )
+        return FastJSONResponse(result)
+    except (MarketDataNotFoundError, StrategyNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/portfolio")
+async def run_portfolio_backtest(
+    request: PortfolioBacktestRequest,
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Backtest one strategy over many symbols sharing a single capital pool
+    """
+    try:
+        if request.queries is not None:
+            market_data = [await store.resolve(query=query) for query in request.queries]
+        else:
+            market_data = request.market_data
+        result = await compute_executor.run_process(
+            PortfolioBacktestService.run_portfolio_backtest,
+            strategy_id=request.strategy_id,
+            market_data=market_data,
+            initial_capital=request.initial_capital,
+            position_size=request.position_size,
+            max_positions=request.max_positions,
+            parameters=request.parameters,
+            include_details=request.include_details
+        )
+        return result
+    except (MarketDataNotFoundError, StrategyNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/optimize")
+async def optimize_strategy(
+    request: OptimizeRequest,
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Sweep strategy parameters and rank the backtest results
+    """
+    try:
+        market_data = await store.resolve(request.market_data, request.query)
+        # The sweep fans out over its own process pool; the thread only waits
+        result = await compute_executor.run_thread(
+            OptimizerService.optimize,
             strategy_id=request.strategy_id,
-            market_data=request.market_data,
+            market_data=market_data,
+            parameter_grid=request.parameter_grid,
+            method=request.method,
+            max_evaluations=request.max_evaluations,
+            seed=request.seed,
+            rank_by=request.rank_by,
             initial_capital=request.initial_capital,
             position_size=request.position_size,
-            parameters=request.parameters
+            base_parameters=request.parameters,
+            max_workers=request.max_workers,
+            top_n=request.top_n,
+            execution=request.execution
         )
         return result
+    except (MarketDataNotFoundError, StrategyNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/monte-carlo")
+async def run_monte_carlo(request: MonteCarloRequest):
+    """
+    Resample a trade sequence (e.g. a backtest job's trade log) and return
+    the distributions of final capital and maximum drawdown
+    """
+    try:
+        config = MonteCarloConfig(**request.model_dump(exclude={"profits", "initial_capital"}))
+        result = await compute_executor.run_thread(
+            monte_carlo.run_monte_carlo,
+            trade_returns(np.array(request.profits), request.initial_capital),
+            request.initial_capital,
+            config
+        )
+        return FastJSONResponse(result)
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/walk-forward")
+async def run_walk_forward(
+    request: WalkForwardRequest,
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Optimize on rolling training windows and report each fold's test window
+    and the stitched out-of-sample result
+    """
+    try:
+        market_data = await store.resolve(request.market_data, request.query)
+        # The folds fan out over their own process pool; the thread only waits
+        result = await compute_executor.run_thread(
+            WalkForwardService.run_walk_forward,
+            strategy_id=request.strategy_id,
+            market_data=market_data,
+            parameter_grid=request.parameter_grid,
+            train_size=request.train_size,
+            test_size=request.test_size,
+            anchored=request.anchored,
+            method=request.method,
+            max_evaluations=request.max_evaluations,
+            seed=request.seed,
+            rank_by=request.rank_by,
+            initial_capital=request.initial_capital,
+            position_size=request.position_size,
+            base_parameters=request.parameters,
+            max_workers=request.max_workers,
+            top_n=request.top_n,
+            execution=request.execution,
+            include_details=request.include_details
+        )
+        return FastJSONResponse(result)
+    except (MarketDataNotFoundError, StrategyNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/jobs")
+async def submit_backtest_job(
+    request: BacktestJobRequest,
+    jobs: BacktestJobService = Depends(get_backtest_jobs),
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Queue a backtest and return its job id immediately
+    """
+    try:
+        market_data = await store.resolve(request.market_data, request.query)
+        job = await jobs.submit(
+            strategy_id=request.strategy_id,
+            market_data=market_data,
+            initial_capital=request.initial_capital,
+            position_size=request.position_size,
+            parameters=request.parameters,
+            execution=request.execution
+        )
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "deduplicated": job["deduplicated"]
+        }
+    except (MarketDataNotFoundError, StrategyNotFoundError) as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}")
+async def get_backtest_job(job_id: str, jobs: BacktestJobService = Depends(get_backtest_jobs)):
+    """
+    Get a backtest job's status, progress and summary metrics
+    """
+    job = await jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@router.get("/jobs/{job_id}/trades")
+async def get_backtest_job_trades(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=5000),
+    jobs: BacktestJobService = Depends(get_backtest_jobs)
+):
+    """
+    Page through a backtest job's full trade log
+    """
+    try:
+        return await jobs.get_trades(job_id, offset, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+
+@router.get("/jobs/{job_id}/equity")
+async def get_backtest_job_equity(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=50000),
+    output_format: Optional[str] = Query(None, alias="format"),
+    jobs: BacktestJobService = Depends(get_backtest_jobs)
+):
+    """
+    Page through a backtest job's equity curve, as JSON or as columns in
+    ``format`` (raw, npy, csv, arrow, json)
+    """
+    try:
+        page = await jobs.get_equity(job_id, offset, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if output_format is None:
+        return page
+    return columnar_response({
+        # Stored timestamps carry the input's UTC offset when it had one
+        "timestamp": np.array(
+            [to_epoch_ns(datetime.fromisoformat(ts)) for ts in page["timestamp"]], dtype=np.int64
+        ),
+        "equity": np.array(page["equity"], dtype=np.float64),
+    }, output_format)
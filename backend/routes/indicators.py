@@ -1,54 +1,112 @@
 """Indicators API Routes"""
-from fastapi import APIRouter, HTTPException
-from typing import List
-from pydantic import BaseModel
-from models.market_data import MarketData
-from models.indicator import Indicator, IndicatorConfig, IndicatorType
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+import numpy as np
+from models.market_data import MarketDataSource
+from models.ohlcv_series import OHLCVSeries
+from models.indicator import Indicator, IndicatorConfig, IndicatorType, INDICATOR_LINES
 from services.indicator_service import IndicatorService
+from services.indicator_cache import indicator_cache
+from services.compute_executor import compute_executor, ComputeSaturatedError, ComputeTimeoutError
+from services.market_data_store import MarketDataStore, MarketDataNotFoundError
+from routes.market import get_market_store, columnar_response
+from utils.json_codec import FastJSONResponse
 
 router = APIRouter(prefix="/indicators", tags=["indicators"])
 
 
-class CalculateIndicatorRequest(BaseModel):
-    market_data: MarketData
+class CalculateIndicatorRequest(MarketDataSource):
     indicator_config: IndicatorConfig
 
 
-class CalculateMultipleRequest(BaseModel):
-    market_data: MarketData
+class CalculateMultipleRequest(MarketDataSource):
     configs: List[IndicatorConfig]
 
 
 @router.post("/calculate", response_model=Indicator)
-async def calculate_indicator(request: CalculateIndicatorRequest):
+async def calculate_indicator(
+    request: CalculateIndicatorRequest,
+    store: MarketDataStore = Depends(get_market_store)
+):
     """
-    Calculate a single technical indicator
+    Calculate a single technical indicator. Set ``indicator_config.outputs``
+    (line names or ["all"]) to also receive ``lines``, e.g. the MACD signal
+    and histogram or the upper and lower Bollinger Bands.
     """
     try:
-        indicator = IndicatorService.calculate_indicator(
-            request.market_data,
+        market_data = await store.resolve(request.market_data, request.query)
+        indicator = await compute_executor.run_thread(
+            indicator_cache.calculate,
+            market_data,
             request.indicator_config
         )
-        return indicator
+        return FastJSONResponse(indicator)
+    except MarketDataNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/calculate-multiple")
-async def calculate_multiple_indicators(request: CalculateMultipleRequest):
+async def calculate_multiple_indicators(
+    request: CalculateMultipleRequest,
+    output_format: Optional[str] = Query(None, alias="format"),
+    store: MarketDataStore = Depends(get_market_store)
+):
     """
-    Calculate multiple indicators at once
+    Calculate multiple indicators at once. With ``format`` (raw, npy, csv,
+    arrow, json) the values come back as columns next to the candle timestamps.
     """
     try:
-        indicators = IndicatorService.calculate_multiple_indicators(
-            request.market_data,
+        market_data = await store.resolve(request.market_data, request.query)
+        if output_format is not None:
+            series = await compute_executor.run_thread(OHLCVSeries.coerce, market_data)
+            columns = {"timestamp": series.timestamp}
+            for config in request.configs:
+                name, lines = await compute_executor.run_thread(
+                    indicator_cache.calculate_lines, series, config
+                )
+                selected = IndicatorService.selected_lines(config)
+                if not config.fill_warmup:
+                    lines = IndicatorService.mask_warmup(config, lines)
+                if selected:
+                    for line in selected:
+                        columns[f"{name}_{line}"] = lines[line]
+                else:
+                    columns[name] = lines[INDICATOR_LINES[config.type][0]]
+            return columnar_response(columns, output_format)
+        indicators = await compute_executor.run_thread(
+            indicator_cache.calculate_multiple,
+            market_data,
             request.configs
         )
-        return {"indicators": indicators}
+        return FastJSONResponse({"indicators": indicators})
+    except MarketDataNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get indicator cache size and hit/miss counters
+    """
+    return indicator_cache.stats()
+
+
 @router.get("/types")
 async def get_indicator_types():
     """
@@ -1,25 +1,254 @@
 """Market Data API Routes"""
-from fastapi import APIRouter, HTTPException
-from models.market_data import MarketData, MarketDataCreate, TimeFrame
+from datetime import datetime
+from typing import Dict, Optional
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from models.market_data import MarketData, MarketDataCreate, MarketDataSource, TimeFrame
+from models.ohlcv_series import OHLCVSeries
 from services.market_service import MarketService
+from services.market_data_store import MarketDataStore, MarketDataConflictError, MarketDataNotFoundError
+from services.resample_service import ResampleService, rollup_cache
+from utils.columnar_codec import (
+    MEDIA_TYPES,
+    OHLCV_COLUMNS,
+    CSVColumnParser,
+    decode_ohlcv,
+    encode_columns,
+    format_from_media_type,
+    iter_csv,
+)
+from utils.json_codec import FastJSONResponse, compact_columns, market_data_content
+from services.compute_executor import compute_executor, ComputeSaturatedError, ComputeTimeoutError
 
 router = APIRouter(prefix="/market", tags=["market"])
 
 
+class ResampleRequest(MarketDataSource):
+    timeframe: TimeFrame
+    fill_gaps: bool = False  # flat zero-volume bars where no candle falls
+
+
+def get_market_store(request: Request) -> MarketDataStore:
+    return request.app.state.market_store
+
+
+def columnar_response(columns: Dict[str, np.ndarray], fmt: str) -> Response:
+    """
+    Encode equal-length columns as a ``raw``/``npy``/``arrow`` body, a
+    streamed CSV body or compact ``json`` ({"t": [...], "o": [...], ...})
+    """
+    headers = {
+        "X-Columns": ",".join(columns),
+        "X-Rows": str(len(next(iter(columns.values()))) if columns else 0),
+    }
+    if fmt == "json":
+        compact = compact_columns(columns)
+        headers["X-Columns"] = ",".join(compact)
+        return FastJSONResponse(compact, headers=headers)
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {fmt}")
+    if fmt == "csv":
+        return StreamingResponse(iter_csv(columns), media_type=MEDIA_TYPES["csv"], headers=headers)
+    try:
+        body = encode_columns(columns, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
 @router.post("/generate", response_model=MarketData)
-async def generate_market_data(request: MarketDataCreate):
+async def generate_market_data(
+    request: MarketDataCreate,
+    output_format: Optional[str] = Query(None, alias="format")
+):
     """
-    Generate mock market data for testing
+    Generate mock market data for testing. Pass ``seed`` for reproducible
+    candles and ``model`` to pick the price process; with ``format`` (raw,
+    npy, csv, arrow, json) the candles come back as columns.
     """
     try:
-        market_data = MarketService.generate_mock_data(
+        series = await compute_executor.run_thread(
+            MarketService.generate_mock_series,
             symbol=request.symbol,
             timeframe=request.timeframe,
-            num_candles=request.num_candles
+            num_candles=request.num_candles,
+            base_price=request.base_price,
+            seed=request.seed,
+            model=request.model
+        )
+        if output_format is not None:
+            return columnar_response(
+                {column: getattr(series, column) for column in OHLCV_COLUMNS},
+                output_format
+            )
+        return FastJSONResponse(market_data_content(series))
+    except HTTPException:
+        raise
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/ohlcv")
+async def ingest_market_data(
+    market_data: MarketData,
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Store candles, replacing any stored candles with the same timestamps
+    """
+    try:
+        return await store.ingest(market_data)
+    except MarketDataConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/ohlcv", response_model=MarketData)
+async def get_stored_market_data(
+    symbol: str,
+    timeframe: TimeFrame,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Load stored candles between start and end (inclusive)
+    """
+    series = await store.load(symbol, timeframe, start, end)
+    if len(series) == 0:
+        raise HTTPException(status_code=404, detail=f"No stored candles for {symbol} {timeframe.value}")
+    return FastJSONResponse(market_data_content(series))
+
+
+@router.post("/ohlcv/import")
+async def import_market_data(
+    request: Request,
+    symbol: str,
+    timeframe: TimeFrame,
+    input_format: Optional[str] = Query(None, alias="format"),
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Store candles sent as a binary or CSV body. The format is taken from
+    the ``format`` query parameter or the Content-Type (raw, npy, csv, arrow).
+    """
+    fmt = input_format or format_from_media_type(request.headers.get("content-type"))
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {fmt}")
+    try:
+        if fmt == "csv":
+            parser = CSVColumnParser()
+            pending, size = [], 0
+            async for chunk in request.stream():
+                pending.append(chunk)
+                size += len(chunk)
+                if size >= parser.block_bytes:
+                    await compute_executor.run_thread(parser.feed, b"".join(pending))
+                    pending, size = [], 0
+            await compute_executor.run_thread(parser.feed, b"".join(pending))
+            columns = await compute_executor.run_thread(parser.finish)
+        else:
+            columns = await compute_executor.run_thread(decode_ohlcv, await request.body(), fmt)
+        series = OHLCVSeries(symbol, timeframe, **columns)
+        return await store.ingest(series)
+    except MarketDataConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/ohlcv/export")
+async def export_market_data(
+    symbol: str,
+    timeframe: TimeFrame,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    output_format: str = Query("raw", alias="format"),
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Download stored candles as raw little-endian columns, .npy, Arrow IPC,
+    streamed CSV or compact JSON
+    """
+    series = await store.load(symbol, timeframe, start, end)
+    if len(series) == 0:
+        raise HTTPException(status_code=404, detail=f"No stored candles for {symbol} {timeframe.value}")
+    return columnar_response({name: getattr(series, name) for name in OHLCV_COLUMNS}, output_format)
+
+
+@router.post("/resample")
+async def resample_market_data(
+    request: ResampleRequest,
+    output_format: Optional[str] = Query(None, alias="format"),
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Roll candles up into a coarser ``timeframe``. ``counts`` holds the
+    number of candles in each bar; the last bar may be unfinished. With
+    ``format`` (raw, npy, csv, arrow, json) the bars come back as columns.
+    """
+    try:
+        market_data = await store.resolve(request.market_data, request.query)
+        series = await compute_executor.run_thread(OHLCVSeries.coerce, market_data)
+        bars, counts = await compute_executor.run_thread(
+            ResampleService.resample, series, request.timeframe, request.fill_gaps
         )
-        return market_data
+    except MarketDataNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if output_format is not None:
+        columns = {name: getattr(bars, name) for name in OHLCV_COLUMNS}
+        columns["count"] = counts
+        return columnar_response(columns, output_format)
+    return FastJSONResponse({**market_data_content(bars), "counts": counts})
+
+
+@router.get("/resample/cache/stats")
+async def get_rollup_cache_stats():
+    """
+    Get rollup cache size and hit/miss/extension counters
+    """
+    return rollup_cache.stats()
+
+
+@router.get("/ohlcv/catalog")
+async def get_stored_catalog(store: MarketDataStore = Depends(get_market_store)):
+    """
+    List stored symbols and timeframes with their time ranges
+    """
+    return {"series": await store.catalog()}
+
+
+@router.delete("/ohlcv")
+async def delete_stored_market_data(
+    symbol: str,
+    timeframe: TimeFrame,
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Delete all stored candles of a symbol and timeframe
+    """
+    deleted = await store.delete(symbol, timeframe)
+    return {"symbol": symbol, "timeframe": timeframe.value, "buckets_deleted": deleted}
 
 
 @router.get("/symbols")
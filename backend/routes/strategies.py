@@ -1,45 +1,247 @@
 """Strategy API Routes"""
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Optional
-from models.market_data import MarketData
+import logging
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import Dict, List, Optional
+from models.market_data import MarketData, MarketDataQuery, MarketDataSource, OHLCV, TimeFrame
 from models.signal import Signal
-from services.strategy_service import StrategyService
+from models.strategy import StrategyConfig
+from services.strategy_service import StrategyService, StrategyNotFoundError
+from services.live_signal_service import LiveSignalService
+from services.scan_service import ScanService, SCAN_COLUMNS
+from services.compute_executor import compute_executor, ComputeSaturatedError, ComputeTimeoutError
+from services.market_data_store import MarketDataStore, MarketDataNotFoundError
+from routes.market import get_market_store
+from utils.json_codec import FastJSONResponse, dumps
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/strategies", tags=["strategies"])
 
 
-class ExecuteStrategyRequest(BaseModel):
+class ExecuteStrategyRequest(MarketDataSource):
+    strategy_id: str
+    parameters: Optional[Dict] = None
+
+
+class ScanStrategy(BaseModel):
     strategy_id: str
-    market_data: MarketData
     parameters: Optional[Dict] = None
 
 
+class ScanRequest(BaseModel):
+    market_data: Optional[List[MarketData]] = None
+    queries: Optional[List[MarketDataQuery]] = None
+    strategies: List[ScanStrategy]
+    stream: bool = True  # NDJSON rows as batches finish, else one table
+    batch_size: int = Field(16, ge=1, le=500)
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.market_data is None) == (self.queries is None):
+            raise ValueError("Provide exactly one of market_data or queries")
+        return self
+
+
+class StreamSubscribeMessage(BaseModel):
+    strategy_id: str
+    symbol: str
+    timeframe: TimeFrame
+    parameters: Optional[Dict] = None
+    history: List[OHLCV] = []
+
+
+class StreamCandleMessage(BaseModel):
+    subscription_id: str
+    candles: List[OHLCV]
+
+
 @router.get("/list")
 async def list_strategies():
     """
-    Get list of available trading strategies
+    Get list of available trading strategies; ``streamable`` marks the ones
+    ``/stream`` can evaluate live
     """
     try:
-        strategies = StrategyService.get_predefined_strategies()
+        streamable = set(LiveSignalService.streamable_strategies())
+        strategies = [
+            {**strategy, "streamable": strategy["id"] in streamable}
+            for strategy in StrategyService.get_predefined_strategies()
+        ]
         return {"strategies": strategies}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/rules/compile")
+async def compile_rule_strategy(config: StrategyConfig):
+    """
+    Check a rule strategy (``config.rules`` holds ``buy``, ``sell`` and an
+    optional ``confidence`` expression) and return the ``strategy_id`` and
+    ``parameters`` that run it with execute, scan, backtest or optimize
+    """
+    try:
+        return StrategyService.compile_rule_strategy(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/execute", response_model=Signal)
-async def execute_strategy(request: ExecuteStrategyRequest):
+async def execute_strategy(
+    request: ExecuteStrategyRequest,
+    store: MarketDataStore = Depends(get_market_store)
+):
     """
     Execute a trading strategy and get signal
     """
     try:
-        signal = StrategyService.execute_strategy(
+        market_data = await store.resolve(request.market_data, request.query)
+        signal = await compute_executor.run_thread(
+            StrategyService.execute_strategy,
             request.strategy_id,
-            request.market_data,
+            market_data,
             request.parameters
         )
-        return signal
-    except ValueError as e:
+        return FastJSONResponse(signal)
+    except (MarketDataNotFoundError, StrategyNotFoundError) as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ComputeSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/scan")
+async def scan_strategies(
+    request: ScanRequest,
+    store: MarketDataStore = Depends(get_market_store)
+):
+    """
+    Latest signal of every strategy for every symbol. Streams one JSON row
+    per line (application/x-ndjson) as batches of symbols complete, or with
+    ``stream: false`` returns {"columns": [...], "rows": [[...], ...]}.
+    """
+    strategies = [strategy.model_dump() for strategy in request.strategies]
+    if request.queries is not None:
+        loaders = [
+            (
+                query.symbol,
+                query.timeframe.value,
+                lambda query=query: store.resolve(query=query)
+            )
+            for query in request.queries
+        ]
+    else:
+        async def inline(data):
+            return data
+        loaders = [
+            (data.symbol, data.timeframe.value, lambda data=data: inline(data))
+            for data in request.market_data
+        ]
+    
+    batches = ScanService.stream(loaders, strategies, request.batch_size)
+    
+    if request.stream:
+        async def ndjson():
+            async for rows in batches:
+                yield b"".join(dumps(row) + b"\n" for row in rows)
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    try:
+        rows = [
+            [row[column] for column in SCAN_COLUMNS]
+            async for batch in batches
+            for row in batch
+        ]
+        return {"columns": list(SCAN_COLUMNS), "rows": rows}
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.websocket("/stream")
+async def stream_signals(websocket: WebSocket):
+    """
+    Stream strategy signals for pushed candles.
+
+    Client messages (JSON, keyed by ``action``):
+      - ``subscribe``: strategy_id, symbol, timeframe, optional parameters and
+        history (candles used only to warm up the indicators)
+      - ``candle``: subscription_id and ``candle`` (or ``candles``)
+      - ``unsubscribe``: subscription_id
+    The server answers ``subscribed``/``unsubscribed`` and sends a ``signal``
+    message only when a subscription's signal type changes.
+    """
+    await websocket.accept()
+    subscriptions = {}
+    
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                action = message.get("action") if isinstance(message, dict) else None
+                
+                if action == "subscribe":
+                    request = StreamSubscribeMessage(**message)
+                    subscription = LiveSignalService.create_subscription(
+                        request.strategy_id,
+                        request.symbol,
+                        request.timeframe.value,
+                        request.parameters
+                    )
+                    for candle in request.history:
+                        subscription.push(candle)
+                    subscriptions[subscription.id] = subscription
+                    await websocket.send_json({
+                        "type": "subscribed",
+                        "subscription_id": subscription.id,
+                        "signal_type": subscription.last_signal_type.value
+                    })
+                
+                elif action == "candle":
+                    if "candle" in message:
+                        message = {**message, "candles": [message["candle"]]}
+                    request = StreamCandleMessage(**message)
+                    subscription = subscriptions.get(request.subscription_id)
+                    if subscription is None:
+                        raise ValueError(f"Unknown subscription: {request.subscription_id}")
+                    for candle in request.candles:
+                        signal = subscription.push(candle)
+                        if signal is not None:
+                            await websocket.send_json({
+                                "type": "signal",
+                                "subscription_id": subscription.id,
+                                "signal": signal.model_dump(mode="json")
+                            })
+                
+                elif action == "unsubscribe":
+                    subscription_id = message.get("subscription_id")
+                    if subscriptions.pop(subscription_id, None) is None:
+                        raise ValueError(f"Unknown subscription: {subscription_id}")
+                    await websocket.send_json({
+                        "type": "unsubscribed",
+                        "subscription_id": subscription_id
+                    })
+                
+                else:
+                    raise ValueError(f"Unknown action: {action}")
+            
+            except (ValueError, ValidationError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                # One bad message must not drop the socket's other subscriptions
+                logger.exception("Stream message failed")
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    
+    except WebSocketDisconnect:
+        pass
@@ -12,6 +12,10 @@ from datetime import datetime, timezone
 
 # Import routes
 from routes import market_router, indicators_router, strategies_router, backtest_router
+from services.compute_executor import compute_executor
+from services.backtest_job_service import BacktestJobService
+from services.market_data_store import MarketDataStore
+from utils.json_codec import FastJSONResponse
 
 
 ROOT_DIR = Path(__file__).parent
@@ -22,13 +26,27 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Stored OHLCV history, loaded by symbol/timeframe/range queries
+market_store = MarketDataStore(db)
+
+# Background backtest jobs, persisted through the same connection
+backtest_jobs = BacktestJobService(
+    db,
+    max_concurrent_jobs=int(os.environ.get('BACKTEST_JOB_WORKERS', 2)),
+    job_timeout=float(os.environ.get('BACKTEST_JOB_TIMEOUT_SECONDS', 3600))
+)
+
 # Create the main app without a prefix
 app = FastAPI(
     title="MoonLight AI Trading System",
     description="Advanced AI-powered trading system with technical analysis and backtesting",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
+app.state.backtest_jobs = backtest_jobs
+app.state.market_store = market_store
+
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
@@ -97,6 +115,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_market_store():
+    await market_store.ensure_indexes()
+
+@app.on_event("startup")
+async def startup_backtest_jobs():
+    await backtest_jobs.ensure_indexes()
+    await backtest_jobs.recover_interrupted()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+@app.on_event("shutdown")
+async def shutdown_compute_executor():
+    compute_executor.shutdown()
\ No newline at end of file
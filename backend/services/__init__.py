@@ -1,11 +1,27 @@
 from .market_service import MarketService
 from .indicator_service import IndicatorService
+from .indicator_cache import IndicatorCache
 from .strategy_service import StrategyService
 from .backtest_service import BacktestService
+from .live_signal_service import LiveSignalService
+from .optimizer_service import OptimizerService
+from .walk_forward_service import WalkForwardService
+from .portfolio_backtest_service import PortfolioBacktestService
+from .scan_service import ScanService
+from .market_data_store import MarketDataStore
+from .resample_service import ResampleService
 
 __all__ = [
     "MarketService",
     "IndicatorService",
+    "IndicatorCache",
     "StrategyService",
     "BacktestService",
+    "LiveSignalService",
+    "OptimizerService",
+    "WalkForwardService",
+    "PortfolioBacktestService",
+    "ScanService",
+    "MarketDataStore",
+    "ResampleService",
 ]
@@ -0,0 +1,270 @@
+"""Backtest Job Service - Queue backtests and persist their results in MongoDB"""
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
+from pymongo.errors import DuplicateKeyError
+from models.execution import ExecutionModel
+from models.market_data import MarketData
+from models.ohlcv_series import OHLCVSeries
+from services.backtest_service import BacktestService
+from services.compute_executor import compute_executor, ComputeSaturatedError
+from services.strategy_service import StrategyService
+
+logger = logging.getLogger(__name__)
+
+# Trades and equity points stored per chunk document
+CHUNK_SIZE = 1000
+
+
+def _prepare_series(market_data: Union[MarketData, OHLCVSeries]) -> Tuple[OHLCVSeries, str]:
+    series = OHLCVSeries.coerce(market_data)
+    return series, series.content_hash()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BacktestJobService:
+    """
+    Runs backtests as background jobs. A job document in ``backtest_jobs``
+    tracks status and progress; the full trade log and equity curve are
+    stored in fixed-size chunk documents so they can be paged through.
+    """
+    def __init__(self, db, max_concurrent_jobs: int = 2, job_timeout: float = 3600.0):
+        self.db = db
+        self.job_timeout = job_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._tasks = set()
+
+    async def ensure_indexes(self):
+        await self.db.backtest_jobs.create_index("id", unique=True)
+        # Sparse, so failed jobs can drop their key and be resubmitted
+        await self.db.backtest_jobs.create_index("dedupe_key", unique=True, sparse=True)
+        await self.db.backtest_job_trades.create_index([("job_id", 1), ("chunk", 1)], unique=True)
+        await self.db.backtest_job_equity.create_index([("job_id", 1), ("chunk", 1)], unique=True)
+
+    async def recover_interrupted(self):
+        """
+        Mark jobs left queued or running by a previous process as failed
+        """
+        await self.db.backtest_jobs.update_many(
+            {"status": {"$in": ["queued", "running"]}},
+            {
+                "$set": {"status": "failed", "error": "Interrupted by server restart", "finished_at": _now()},
+                "$unset": {"dedupe_key": ""}
+            }
+        )
+
+    @staticmethod
+    def dedupe_key(
+        strategy_id: str,
+        data_hash: str,
+        initial_capital: float,
+        position_size: float,
+        parameters: Optional[Dict],
+        execution: Optional[ExecutionModel] = None
+    ) -> str:
+        fields = [strategy_id, data_hash, initial_capital, position_size, parameters or {}]
+        if execution is not None:
+            # Jobs without an execution model keep their earlier keys
+            fields.append(execution.model_dump(mode="json"))
+        payload = json.dumps(fields, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def submit(
+        self,
+        strategy_id: str,
+        market_data: Union[MarketData, OHLCVSeries],
+        initial_capital: float = 10000.0,
+        position_size: float = 0.1,
+        parameters: Dict = None,
+        execution: Optional[ExecutionModel] = None
+    ) -> Dict:
+        """
+        Queue a backtest and return its job document at once. An identical
+        submission that is queued, running or completed is returned instead
+        of starting a new job. Raises ``StrategyNotFoundError`` for an
+        unknown strategy before anything is queued.
+        """
+        StrategyService.get_strategy(strategy_id)
+        series, data_hash = await compute_executor.run_thread(_prepare_series, market_data)
+        key = self.dedupe_key(strategy_id, data_hash, initial_capital, position_size, parameters, execution)
+
+        job = {
+            "id": str(uuid.uuid4()),
+            "dedupe_key": key,
+            "status": "queued",
+            "progress": 0.0,
+            "strategy_id": strategy_id,
+            "symbol": series.symbol,
+            "timeframe": series.timeframe.value,
+            "parameters": parameters,
+            "initial_capital": initial_capital,
+            "position_size": position_size,
+            "execution": execution.model_dump(mode="json") if execution is not None else None,
+            "data_hash": data_hash,
+            "candles": len(series),
+            "created_at": _now(),
+        }
+        try:
+            await self.db.backtest_jobs.insert_one(dict(job))
+        except DuplicateKeyError:
+            existing = await self.db.backtest_jobs.find_one({"dedupe_key": key}, {"_id": 0})
+            if existing is not None:
+                return {**existing, "deduplicated": True}
+            raise
+
+        task = asyncio.create_task(
+            self._run(job["id"], strategy_id, series, initial_capital, position_size, parameters, execution)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return {**job, "deduplicated": False}
+
+    async def _update(self, job_id: str, fields: Dict, unset: Optional[List[str]] = None):
+        update = {"$set": fields}
+        if unset:
+            update["$unset"] = {name: "" for name in unset}
+        await self.db.backtest_jobs.update_one({"id": job_id}, update)
+
+    async def _run(
+        self,
+        job_id: str,
+        strategy_id: str,
+        series: OHLCVSeries,
+        initial_capital: float,
+        position_size: float,
+        parameters: Optional[Dict],
+        execution: Optional[ExecutionModel] = None
+    ):
+        try:
+            async with self._semaphore:
+                await self._update(job_id, {"status": "running", "progress": 0.1, "started_at": _now()})
+
+                while True:
+                    try:
+                        result = await compute_executor.run_process(
+                            BacktestService.run_backtest,
+                            strategy_id=strategy_id,
+                            market_data=series,
+                            initial_capital=initial_capital,
+                            position_size=position_size,
+                            parameters=parameters,
+                            include_details=True,
+                            execution=execution,
+                            timeout=self.job_timeout
+                        )
+                        break
+                    except ComputeSaturatedError:
+                        # Interactive requests have priority; wait for a slot
+                        await asyncio.sleep(1.0)
+
+                trades = result.pop("trades")
+                equity_curve = result.pop("equity_curve")
+                await self._update(job_id, {"progress": 0.8})
+                await self._store_chunks(job_id, trades, equity_curve)
+
+                await self._update(job_id, {
+                    "status": "completed",
+                    "progress": 1.0,
+                    "result": result,
+                    "trade_count": len(trades),
+                    "equity_points": len(equity_curve["equity"]),
+                    "finished_at": _now(),
+                })
+        except Exception as e:
+            logger.exception("Backtest job %s failed", job_id)
+            await self._update(
+                job_id,
+                {"status": "failed", "error": str(e), "finished_at": _now()},
+                unset=["dedupe_key"]
+            )
+
+    async def _store_chunks(self, job_id: str, trades: List[Dict], equity_curve: Dict):
+        trade_docs = [
+            {
+                "job_id": job_id,
+                "chunk": chunk,
+                "items": [
+                    {**trade, "timestamp": trade["timestamp"].isoformat()}
+                    for trade in trades[start:start + CHUNK_SIZE]
+                ]
+            }
+            for chunk, start in enumerate(range(0, len(trades), CHUNK_SIZE))
+        ]
+        if trade_docs:
+            await self.db.backtest_job_trades.insert_many(trade_docs)
+
+        timestamps = equity_curve["timestamp"]
+        equity = equity_curve["equity"]
+        equity_docs = [
+            {
+                "job_id": job_id,
+                "chunk": chunk,
+                "timestamp": [ts.isoformat() for ts in timestamps[start:start + CHUNK_SIZE]],
+                "equity": equity[start:start + CHUNK_SIZE]
+            }
+            for chunk, start in enumerate(range(0, len(equity), CHUNK_SIZE))
+        ]
+        # Insert in batches so a long curve reports progress as it goes
+        batch = 100
+        for start in range(0, len(equity_docs), batch):
+            await self.db.backtest_job_equity.insert_many(equity_docs[start:start + batch])
+            done = min(start + batch, len(equity_docs)) / len(equity_docs)
+            await self._update(job_id, {"progress": round(0.8 + 0.19 * done, 3)})
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        return await self.db.backtest_jobs.find_one({"id": job_id}, {"_id": 0, "dedupe_key": 0})
+
+    async def _chunk_range(self, collection, job_id: str, offset: int, limit: int) -> List[Dict]:
+        first = offset // CHUNK_SIZE
+        last = (offset + limit - 1) // CHUNK_SIZE
+        cursor = collection.find(
+            {"job_id": job_id, "chunk": {"$gte": first, "$lte": last}},
+            {"_id": 0}
+        ).sort("chunk", 1)
+        return await cursor.to_list(last - first + 1)
+
+    async def get_trades(self, job_id: str, offset: int = 0, limit: int = 100) -> Dict:
+        """
+        Page through a completed job's trade log
+        """
+        job = await self.get_job(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        total = job.get("trade_count", 0)
+        items = []
+        if limit > 0 and offset < total:
+            chunks = await self._chunk_range(self.db.backtest_job_trades, job_id, offset, limit)
+            merged = [trade for chunk in chunks for trade in chunk["items"]]
+            start = offset - (offset // CHUNK_SIZE) * CHUNK_SIZE
+            items = merged[start:start + limit]
+        return {"job_id": job_id, "total": total, "offset": offset, "limit": limit, "items": items}
+
+    async def get_equity(self, job_id: str, offset: int = 0, limit: int = 1000) -> Dict:
+        """
+        Page through a completed job's equity curve
+        """
+        job = await self.get_job(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        total = job.get("equity_points", 0)
+        timestamps, equity = [], []
+        if limit > 0 and offset < total:
+            chunks = await self._chunk_range(self.db.backtest_job_equity, job_id, offset, limit)
+            start = offset - (offset // CHUNK_SIZE) * CHUNK_SIZE
+            timestamps = [ts for chunk in chunks for ts in chunk["timestamp"]][start:start + limit]
+            equity = [value for chunk in chunks for value in chunk["equity"]][start:start + limit]
+        return {
+            "job_id": job_id,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "timestamp": timestamps,
+            "equity": equity
+        }
@@ -1,8 +1,27 @@
 """Backtest Service - Test strategies on historical data"""
-from typing import Dict, List
-from models.market_data import MarketData
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from models.market_data import MarketData, TIMEFRAME_DELTAS
+from models.ohlcv_series import OHLCVSeries
+from models.execution import ExecutionModel
+from models.monte_carlo import MonteCarloConfig
+from models.equity_chart import DownsampleMethod, EquityChartConfig
 from models.signal import Signal, SignalType
-from services.strategy_service import StrategyService
+from services.indicator_cache import IndicatorCache
+from services.strategy_service import IndicatorMemo, StrategyService
+from utils.fill_simulator import EXIT_END, EXIT_REASONS, Fills, simulate_fills
+from utils.monte_carlo import run_monte_carlo, trade_returns
+from utils.risk_metrics import drawdown, risk_metrics
+from utils.downsampling import lttb, min_max
+from utils.json_codec import compact_columns
+
+# Candles skipped before the first signal is acted upon
+WARMUP_CANDLES = 20
+
+# Bound of the per-call indicator cache of per-candle backtests; it only
+# needs the latest prefix of each indicator to extend
+PER_CANDLE_CACHE_BYTES = 32 * 1024 * 1024
 
 
 class BacktestResult:
@@ -21,94 +40,208 @@ class BacktestResult:
 
 
 class BacktestService:
+    @staticmethod
+    def _per_candle_signals(
+        strategy_id: str,
+        series: OHLCVSeries,
+        parameters: Dict = None
+    ) -> Iterator[Tuple[int, SignalType, float]]:
+        """
+        Yield (index, signal type, confidence) by re-executing the strategy
+        on every growing slice of the history. Cost is O(n^2).
+        
+        Every slice is a new series, so indicators go through a cache of the
+        call's own, where each slice extends the previous one's values,
+        rather than filling the process-wide cache with prefixes.
+        """
+        indicator_cache = IndicatorCache(max_bytes=PER_CANDLE_CACHE_BYTES)
+        for i in range(WARMUP_CANDLES, len(series)):
+            # View of the series up to current point
+            historical_data = series[:i+1]
+            
+            signal = StrategyService.execute_strategy(strategy_id, historical_data, parameters, indicator_cache)
+            yield i, signal.signal_type, signal.confidence
+    
+    @staticmethod
+    def _vectorized_signals(
+        strategy_id: str,
+        series: OHLCVSeries,
+        parameters: Dict = None,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> Iterator[Tuple[int, SignalType, float]]:
+        """
+        Yield (index, signal type, confidence) for the non-HOLD candles of a
+        signal series computed once over the full history. Cost is O(n).
+        """
+        signal_series = StrategyService.generate_signals(strategy_id, series, parameters, indicator_cache)
+        active = np.flatnonzero(signal_series.signals[WARMUP_CANDLES:]) + WARMUP_CANDLES
+        for i in active.tolist():
+            yield i, signal_series.signal_type(i), round(float(signal_series.confidence[i]), 3)
+    
+    @staticmethod
+    def _signal_arrays(signals: Iterator[Tuple[int, SignalType, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Candle indices, sides (+1 BUY, -1 SELL) and confidences of the
+        BUY/SELL signals
+        """
+        index, side, confidence = [], [], []
+        for i, signal_type, signal_confidence in signals:
+            if signal_type == SignalType.HOLD:
+                continue
+            index.append(i)
+            side.append(1 if signal_type == SignalType.BUY else -1)
+            confidence.append(signal_confidence)
+        return (
+            np.array(index, dtype=np.int64),
+            np.array(side, dtype=np.int8),
+            np.array(confidence, dtype=np.float64)
+        )
+    
+    @staticmethod
+    def signal_arrays(
+        strategy_id: str,
+        series: OHLCVSeries,
+        parameters: Dict = None,
+        vectorized: bool = True,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Candle indices, sides (+1 BUY, -1 SELL) and confidences of the
+        strategy's BUY/SELL signals after the warm-up. A signal depends only
+        on the candles up to it, so the arrays of a series also hold the
+        signals of every window of it, with the earlier candles as history.
+        """
+        if vectorized:
+            signals = BacktestService._vectorized_signals(strategy_id, series, parameters, indicator_cache)
+        else:
+            signals = BacktestService._per_candle_signals(strategy_id, series, parameters)
+        return BacktestService._signal_arrays(signals)
+    
     @staticmethod
     def run_backtest(
         strategy_id: str,
-        market_data: MarketData,
+        market_data: Union[MarketData, OHLCVSeries],
         initial_capital: float = 10000.0,
         position_size: float = 0.1,  # 10% of capital per trade
-        parameters: Dict = None
+        parameters: Dict = None,
+        vectorized: bool = True,
+        indicator_cache: Optional[IndicatorMemo] = None,
+        include_details: bool = False,
+        execution: Optional[ExecutionModel] = None,
+        monte_carlo: Optional[MonteCarloConfig] = None,
+        equity_chart: Optional[EquityChartConfig] = None
     ) -> Dict:
         """
-        Run a simple backtest on historical data
+        Run a backtest on historical data
+
+        With ``vectorized`` the strategy's signals are derived in a single pass
+        over the full history; otherwise the strategy is re-executed on every
+        candle. Both modes produce identical trades and metrics.
+        ``indicator_cache`` memoizes indicator series across runs on the same
+        series (see ``StrategyService.generate_signals``).
+        ``include_details`` returns the full trade log and the per-candle
+        equity curve instead of only the last 10 trades; ``equity_chart``
+        returns the equity and drawdown curves downsampled for plotting.
+        The risk metrics (drawdown, Sharpe, Sortino, Calmar, exposure) are
+        always computed over the per-candle equity.
+        
+        ``execution`` adds stop-loss and take-profit exits, fees, slippage,
+        shorts and pyramiding (see ``utils.fill_simulator``), each pyramided
+        entry counting as a trade; the log then also records the exit at the
+        last candle and every order's side, units, fee and reason. Without
+        it, a long position is opened on BUY and closed on SELL at closing
+        prices.
+        
+        ``monte_carlo`` adds the distributions of final capital and maximum
+        drawdown, and the ruin probability, over resampled sequences of the
+        trades' returns (see ``utils.monte_carlo``).
         """
-        result = BacktestResult()
-        result.initial_capital = initial_capital
+        series = OHLCVSeries.coerce(market_data)
+        signal_index, signal_side, signal_confidence = BacktestService.signal_arrays(
+            strategy_id, series, parameters, vectorized, indicator_cache
+        )
+        return BacktestService.backtest_signals(
+            strategy_id, series, signal_index, signal_side, signal_confidence,
+            initial_capital=initial_capital,
+            position_size=position_size,
+            include_details=include_details,
+            execution=execution,
+            monte_carlo=monte_carlo,
+            equity_chart=equity_chart
+        )
+    
+    @staticmethod
+    def backtest_signals(
+        strategy_id: str,
+        series: OHLCVSeries,
+        signal_index: np.ndarray,
+        signal_side: np.ndarray,
+        signal_confidence: np.ndarray,
+        initial_capital: float = 10000.0,
+        position_size: float = 0.1,
+        include_details: bool = False,
+        execution: Optional[ExecutionModel] = None,
+        monte_carlo: Optional[MonteCarloConfig] = None,
+        equity_chart: Optional[EquityChartConfig] = None
+    ) -> Dict:
+        """
+        ``run_backtest`` on signals already computed (see ``signal_arrays``),
+        indexed by the candles of ``series``
+        """
+        fills = simulate_fills(
+            series.open, series.high, series.low, series.close,
+            signal_index, signal_side, signal_confidence,
+            initial_capital=initial_capital,
+            position_size=position_size,
+            execution=execution
+        )
         
-        capital = initial_capital
-        position = None
-        entry_price = 0.0
+        detailed = execution is not None
+        orders = fills.orders if detailed else [
+            order for order in fills.orders if order[7] != EXIT_END
+        ]
+        equity, open_lots = BacktestService._equity(series, initial_capital, fills)
+        response = {
+            "strategy_id": strategy_id,
+            "symbol": series.symbol,
+            "timeframe": series.timeframe.value,
+            **BacktestService._summary(initial_capital, fills.final_capital, fills.profit.tolist()),
+            **risk_metrics(equity, open_lots > 0, BacktestService._periods_per_year(series)),
+            # The last 10 unless include_details
+            "trades": BacktestService._trade_log(
+                series, orders if include_details else orders[-10:], detailed
+            )
+        }
         
-        # Process each candle
-        for i in range(20, len(market_data.data)):  # Start after warm-up period
-            # Create a slice of market data up to current point
-            historical_data = MarketData(
-                symbol=market_data.symbol,
-                timeframe=market_data.timeframe,
-                data=market_data.data[:i+1],
-                last_updated=market_data.last_updated
+        if detailed:
+            response.update(BacktestService._execution_summary([fills]))
+        if monte_carlo is not None:
+            response["monte_carlo"] = run_monte_carlo(
+                trade_returns(fills.profit, initial_capital), initial_capital, monte_carlo
             )
-            
-            # Get signal from strategy
-            signal = StrategyService.execute_strategy(strategy_id, historical_data, parameters)
-            current_price = market_data.data[i].close
-            
-            # Execute trades based on signals
-            if signal.signal_type == SignalType.BUY and position is None:
-                # Enter long position
-                position_value = capital * position_size
-                position = position_value / current_price
-                entry_price = current_price
-                
-                result.trades.append({
-                    "type": "BUY",
-                    "price": current_price,
-                    "timestamp": market_data.data[i].timestamp,
-                    "confidence": signal.confidence
-                })
-                
-            elif signal.signal_type == SignalType.SELL and position is not None:
-                # Exit long position
-                exit_value = position * current_price
-                profit = exit_value - (position * entry_price)
-                capital += profit
-                
-                result.total_trades += 1
-                if profit > 0:
-                    result.winning_trades += 1
-                    result.total_profit += profit
-                else:
-                    result.losing_trades += 1
-                    result.total_loss += abs(profit)
-                
-                result.trades.append({
-                    "type": "SELL",
-                    "price": current_price,
-                    "timestamp": market_data.data[i].timestamp,
-                    "profit": profit,
-                    "confidence": signal.confidence
-                })
-                
-                position = None
+        if include_details:
+            response["equity_curve"] = BacktestService._equity_curve(series, equity)
+        if equity_chart is not None:
+            response["equity_chart"] = BacktestService._equity_chart(series, equity, equity_chart)
         
-        # Close any open position at the end
-        if position is not None:
-            final_price = market_data.data[-1].close
-            exit_value = position * final_price
-            profit = exit_value - (position * entry_price)
-            capital += profit
-            result.total_trades += 1
-            
-            if profit > 0:
-                result.winning_trades += 1
-                result.total_profit += profit
-            else:
-                result.losing_trades += 1
-                result.total_loss += abs(profit)
+        return response
+    
+    @staticmethod
+    def _summary(initial_capital: float, final_capital: float, profits: List[float]) -> Dict:
+        """
+        Capital and trade metrics of closed trades' profits, in trade order
+        """
+        result = BacktestResult()
+        result.initial_capital = initial_capital
+        result.final_capital = final_capital
+        result.roi_percent = ((final_capital - initial_capital) / initial_capital) * 100
         
-        # Calculate metrics
-        result.final_capital = capital
-        result.roi_percent = ((capital - initial_capital) / initial_capital) * 100
+        # Summed in trade order, as the capital was
+        result.total_trades = len(profits)
+        result.winning_trades = sum(1 for profit in profits if profit > 0)
+        result.losing_trades = result.total_trades - result.winning_trades
+        result.total_profit = sum((profit for profit in profits if profit > 0), 0.0)
+        result.total_loss = sum((abs(profit) for profit in profits if profit <= 0), 0.0)
         
         if result.total_trades > 0:
             result.win_rate = (result.winning_trades / result.total_trades) * 100
@@ -119,9 +252,6 @@ class BacktestService:
             result.profit_factor = result.total_profit if result.total_profit > 0 else 0
         
         return {
-            "strategy_id": strategy_id,
-            "symbol": market_data.symbol,
-            "timeframe": market_data.timeframe.value,
             "initial_capital": result.initial_capital,
             "final_capital": round(result.final_capital, 2),
             "roi_percent": round(result.roi_percent, 2),
@@ -132,5 +262,105 @@ class BacktestService:
             "total_profit": round(result.total_profit, 2),
             "total_loss": round(result.total_loss, 2),
             "profit_factor": round(result.profit_factor, 2),
-            "trades": result.trades[-10:]  # Return last 10 trades
         }
+    
+    @staticmethod
+    def _execution_summary(fills: List[Fills]) -> Dict:
+        """
+        Fees paid and exits by reason over simulator runs
+        """
+        return {
+            "total_fees": round(sum(float(part.fees.sum()) for part in fills), 2),
+            "exit_reasons": {
+                reason: sum(int(np.count_nonzero(part.exit_reason == code)) for part in fills)
+                for code, reason in enumerate(EXIT_REASONS)
+            }
+        }
+    
+    @staticmethod
+    def _trade_log(series: OHLCVSeries, orders: List[Tuple], detailed: bool) -> List[Dict]:
+        """
+        Trade log entries of simulator orders; ``detailed`` adds the
+        execution fields
+        """
+        trades = []
+        for index, order_side, price, units, fee, profit, side, reason, confidence in orders:
+            trade = {
+                "type": "BUY" if order_side > 0 else "SELL",
+                "price": price,
+                "timestamp": series.datetime_at(index),
+            }
+            if profit is not None:
+                trade["profit"] = profit
+            if confidence is not None:
+                trade["confidence"] = confidence
+            if detailed:
+                trade["side"] = "long" if side > 0 else "short"
+                trade["units"] = units
+                trade["fee"] = fee
+                trade["reason"] = "entry" if reason is None else EXIT_REASONS[reason]
+            trades.append(trade)
+        return trades
+    
+    @staticmethod
+    def _equity(series: OHLCVSeries, initial_capital: float, fills: Fills) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mark-to-market equity at every candle (realized capital plus the open
+        lots valued at that candle's close) and the number of lots open.
+        
+        A lot is held over candles [entry, exit); the signed units and entry
+        cost of every candle's position are cumulative sums of the lots'
+        changes at their entry and exit candles, so the open profit is
+        ``units * close - cost`` without visiting lots one by one.
+        """
+        n = len(series)
+        units = fills.side * fills.units
+        changes = np.zeros((3, n + 1))
+        for row, values in enumerate((units, units * fills.entry_price, np.ones(len(units)))):
+            np.add.at(changes[row], fills.entry_index, values)
+            np.subtract.at(changes[row], fills.exit_index, values)
+        position, cost, open_lots = np.cumsum(changes[:, :n], axis=1)
+        open_lots = np.rint(open_lots).astype(np.int64)
+        
+        realized = np.zeros(n)
+        np.add.at(realized, fills.exit_index, fills.profit)
+        # Flat candles are exactly flat, whatever rounding the sums carried
+        open_profit = np.where(open_lots > 0, position * series.close - cost, 0.0)
+        return initial_capital + np.cumsum(realized) + open_profit, open_lots
+    
+    @staticmethod
+    def _equity_curve(series: OHLCVSeries, equity: np.ndarray) -> Dict:
+        """
+        Timestamps and mark-to-market equity of every candle
+        """
+        return {
+            "timestamp": series.datetimes(),
+            "equity": equity.tolist()
+        }
+    
+    @staticmethod
+    def _equity_chart(series: OHLCVSeries, equity: np.ndarray, config: EquityChartConfig) -> Dict:
+        """
+        Equity and drawdown at the candles picked by the downsampling method,
+        in the compact columnar shape (epoch-millisecond ``t``)
+        """
+        sample = lttb if config.method == DownsampleMethod.LTTB else min_max
+        index = sample(equity, config.points)
+        return {
+            "method": config.method.value,
+            "candles": len(series),
+            "points": len(index),
+            **compact_columns({
+                "timestamp": series.timestamp[index],
+                "equity": np.round(equity[index], 2),
+                "drawdown_percent": np.round(drawdown(equity)[index] * 100, 3),
+            })
+        }
+    
+    @staticmethod
+    def _periods_per_year(series: OHLCVSeries) -> float:
+        """
+        Candles per year of the series' timeframe; markets are assumed to
+        trade around the clock, as crypto pairs do
+        """
+        return timedelta(days=365) / TIMEFRAME_DELTAS[series.timeframe]
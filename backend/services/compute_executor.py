@@ -0,0 +1,217 @@
+"""Compute Executor - Run CPU-bound work off the event loop"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+
+class ComputeSaturatedError(Exception):
+    """Raised when a pool already holds its maximum number of jobs"""
+
+
+class ComputeTimeoutError(Exception):
+    """Raised when a job does not finish within its timeout"""
+
+
+class _BoundedPool:
+    """
+    A pool executor plus a count of its queued and running jobs
+    """
+    def __init__(self, name: str, factory: Callable[[], Executor], max_pending: int):
+        self.name = name
+        self.max_pending = max_pending
+        self._factory = factory
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ComputeSaturatedError(
+                    f"The {self.name} pool is saturated ({self._pending} jobs pending)"
+                )
+            self._pending += 1
+        try:
+            executor = self._current()
+            try:
+                future = executor.submit(fn, *args, **kwargs)
+            except BrokenExecutor:
+                # A worker died since the last job; start a fresh executor
+                self._discard(executor)
+                executor = self._current()
+                future = executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        # The slot is freed when the job really ends, not when a caller
+        # gives up waiting, so a timed-out job still counts as load
+        future.add_done_callback(lambda done: self._finished(executor, done))
+        return future
+
+    def _current(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    def _discard(self, executor: Executor):
+        """
+        Forget a broken executor so the next job builds a new one. A broken
+        process pool has already stopped its workers, and shutting it down
+        from its own callback thread could deadlock, so it is only dropped.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def _finished(self, executor: Executor, future: Future):
+        self._release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenExecutor):
+            self._discard(executor)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ComputeExecutor:
+    """
+    Bounded thread and process pools for route handlers.
+
+    Short jobs (single indicators, strategy signals) go to the thread pool;
+    backtests go to the process pool so they cannot hold the GIL against the
+    event loop. Each pool rejects new work with ``ComputeSaturatedError`` once
+    ``max_pending`` jobs are queued or running, and callers stop waiting
+    after ``timeout`` seconds with ``ComputeTimeoutError``.
+
+    Jobs that fan out over many processes of their own (parameter sweeps,
+    walk-forward folds) take one of ``max_worker_pools`` slots for their
+    dedicated pool (see ``worker_pool``).
+    """
+    def __init__(
+        self,
+        thread_workers: int = 4,
+        process_workers: int = 2,
+        max_pending: int = 32,
+        timeout: float = 60.0,
+        max_worker_pools: int = 1
+    ):
+        self.timeout = timeout
+        self.max_worker_pools = max_worker_pools
+        self._worker_pools = threading.BoundedSemaphore(max_worker_pools)
+        self._threads = _BoundedPool(
+            "thread",
+            lambda: ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="compute"),
+            max_pending
+        )
+        # Spawned workers avoid forking a process that is running threads
+        self._processes = _BoundedPool(
+            "process",
+            lambda: ProcessPoolExecutor(
+                max_workers=process_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            ),
+            max_pending
+        )
+
+    @classmethod
+    def from_env(cls) -> "ComputeExecutor":
+        """
+        Build an executor configured by COMPUTE_* environment variables
+        """
+        cpu_count = os.cpu_count() or 1
+        return cls(
+            thread_workers=int(os.environ.get("COMPUTE_THREAD_WORKERS", min(4, cpu_count))),
+            process_workers=int(os.environ.get("COMPUTE_PROCESS_WORKERS", max(1, cpu_count - 1))),
+            max_pending=int(os.environ.get("COMPUTE_MAX_PENDING", 32)),
+            timeout=float(os.environ.get("COMPUTE_TIMEOUT_SECONDS", 60)),
+            max_worker_pools=int(os.environ.get("COMPUTE_MAX_WORKER_POOLS", 1))
+        )
+
+    async def _run(self, pool: _BoundedPool, fn: Callable, args, kwargs, timeout: Optional[float]) -> Any:
+        future = pool.submit(fn, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise ComputeTimeoutError(f"Job did not finish within {timeout or self.timeout} seconds")
+
+    async def run_thread(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in the thread pool
+        """
+        return await self._run(self._threads, fn, args, kwargs, timeout)
+
+    async def run_process(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in the process pool; ``fn`` and its
+        arguments must be picklable
+        """
+        return await self._run(self._processes, fn, args, kwargs, timeout)
+
+    @staticmethod
+    def worker_count(requested: Optional[int], tasks: int) -> int:
+        """
+        Processes for a dedicated pool: as requested, but no more than the
+        CPUs or the tasks to spread
+        """
+        cpu_count = os.cpu_count() or 1
+        return max(1, min(requested or cpu_count, cpu_count, tasks))
+
+    @contextmanager
+    def worker_pool(
+        self,
+        max_workers: int,
+        initializer: Optional[Callable] = None,
+        initargs: Tuple = ()
+    ) -> Iterator[ProcessPoolExecutor]:
+        """
+        A dedicated spawn-context process pool for one fanned-out job, shut
+        down on exit. Raises ``ComputeSaturatedError`` when
+        ``max_worker_pools`` such pools already exist; the slot is held
+        until the pool's work is done, even if the caller timed out.
+        """
+        if not self._worker_pools.acquire(blocking=False):
+            raise ComputeSaturatedError(
+                f"{self.max_worker_pools} worker pools are already running"
+            )
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs
+            ) as pool:
+                yield pool
+        finally:
+            self._worker_pools.release()
+
+    def stats(self) -> dict:
+        return {
+            "thread_pending": self._threads.pending,
+            "process_pending": self._processes.pending,
+            "max_pending": self._threads.max_pending,
+            "max_worker_pools": self.max_worker_pools,
+            "timeout": self.timeout,
+        }
+
+    def shutdown(self):
+        self._threads.shutdown()
+        self._processes.shutdown()
+
+
+compute_executor = ComputeExecutor.from_env()
@@ -0,0 +1,303 @@
+"""Indicator Cache - Content-addressed LRU cache in front of IndicatorService"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from models.market_data import MarketData
+from models.ohlcv_series import OHLCVSeries
+from models.indicator import Indicator, IndicatorType, IndicatorConfig, INDICATOR_LINES
+from services.indicator_service import IndicatorService
+from utils.incremental_indicators import IncrementalEMA
+
+# Order of the values returned by the multi-line incremental calculators
+_INCREMENTAL_LINES = {
+    IndicatorType.BOLLINGER_BANDS: ("upper", "middle", "lower"),
+    IndicatorType.STOCHASTIC: ("k", "d"),
+}
+
+# Fixed bookkeeping cost charged per entry on top of its value array
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+def normalize_config(indicator_config: IndicatorConfig) -> Tuple:
+    """
+    The parameters that actually determine an indicator's values, so that
+    e.g. MACD configs differing only in the unused ``period`` share a key
+    """
+    indicator_type = indicator_config.type
+    period = indicator_config.period
+    params = indicator_config.params or {}
+
+    if indicator_type == IndicatorType.MACD:
+        return (
+            indicator_type.value,
+            params.get("fast_period", 12),
+            params.get("slow_period", 26),
+            params.get("signal_period", 9)
+        )
+    if indicator_type == IndicatorType.BOLLINGER_BANDS:
+        return (indicator_type.value, period, float(params.get("std_dev", 2.0)))
+    if indicator_type == IndicatorType.STOCHASTIC:
+        return (indicator_type.value, params.get("k_period", 14), params.get("d_period", 3))
+    return (indicator_type.value, period)
+
+
+def _input_columns(series: OHLCVSeries, indicator_type: IndicatorType) -> List[np.ndarray]:
+    if indicator_type in (IndicatorType.ATR, IndicatorType.STOCHASTIC):
+        return [series.high, series.low, series.close]
+    return [series.close]
+
+
+def hash_columns(columns: List[np.ndarray], length: int) -> str:
+    """
+    Hex digest of the first ``length`` values of each column, the content
+    key of the indicator and rollup caches
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(length).encode())
+    for column in columns:
+        digest.update(np.ascontiguousarray(column[:length]).data)
+    return digest.hexdigest()
+
+
+def _warmup_candles(normalized: Tuple) -> Optional[int]:
+    """
+    Candles of history needed to resume an indicator, or None when it
+    cannot be extended and must be recomputed
+    """
+    indicator_type = IndicatorType(normalized[0])
+    if indicator_type in (IndicatorType.SMA, IndicatorType.EMA, IndicatorType.BOLLINGER_BANDS):
+        return normalized[1]
+    if indicator_type in (IndicatorType.RSI, IndicatorType.ATR):
+        return normalized[1] + 1
+    if indicator_type == IndicatorType.STOCHASTIC:
+        return normalized[1] + normalized[2] - 1
+    # MACD's line does not expose the two EMAs needed to resume it
+    return None
+
+
+class _Entry:
+    __slots__ = ("key", "normalized", "length", "name", "lines", "nbytes")
+
+    def __init__(self, key: Tuple, normalized: Tuple, length: int, name: str, lines: Dict[str, np.ndarray]):
+        self.key = key
+        self.normalized = normalized
+        self.length = length
+        self.name = name
+        self.lines = lines
+        self.nbytes = sum(values.nbytes for values in lines.values()) + _ENTRY_OVERHEAD_BYTES
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator series keyed by a hash of the input price columns
+    and the normalized ``IndicatorConfig``, bounded by total bytes. Every
+    output line of an indicator is cached together.
+
+    When a series is a cached series plus new candles, only the new tail is
+    computed by resuming an incremental calculator from the cached prefix.
+    Extended values agree with a full recomputation to within floating-point
+    rounding; MACD is always recomputed.
+    """
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024, extend_prefixes: bool = True):
+        self.max_bytes = max_bytes
+        self.extend_prefixes = extend_prefixes
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        # normalized config -> {length -> {key}} for prefix lookups
+        self._by_config = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "IndicatorCache":
+        return cls(
+            max_bytes=int(os.environ.get("INDICATOR_CACHE_MAX_BYTES", 128 * 1024 * 1024)),
+            extend_prefixes=os.environ.get("INDICATOR_CACHE_EXTEND_PREFIXES", "1") != "0"
+        )
+
+    def calculate(
+        self,
+        market_data: Union[MarketData, OHLCVSeries],
+        indicator_config: IndicatorConfig
+    ) -> Indicator:
+        """
+        Cached ``IndicatorService.calculate_indicator``
+        """
+        series = OHLCVSeries.coerce(market_data)
+        name, lines = self.calculate_lines(series, indicator_config)
+        return IndicatorService.build_indicator(name, indicator_config, lines)
+
+    def calculate_multiple(
+        self,
+        market_data: Union[MarketData, OHLCVSeries],
+        configs: List[IndicatorConfig]
+    ) -> Dict[str, Indicator]:
+        """
+        Cached ``IndicatorService.calculate_multiple_indicators``
+        """
+        series = OHLCVSeries.coerce(market_data)
+        found = {}
+        misses = []
+        for config in configs:
+            cached = self._lookup(series, config)
+            if cached is None:
+                misses.append(config)
+            else:
+                found[id(config)] = cached
+        
+        # Misses are computed together so they share primitives
+        if misses:
+            for config, name, lines in IndicatorService.calculate_multiple_lines(series, misses):
+                found[id(config)] = self._store(series, config, name, lines, extended=False)
+        
+        indicators = {}
+        for config in configs:
+            name, lines = found[id(config)]
+            indicators[name] = IndicatorService.build_indicator(name, config, lines)
+        return indicators
+
+    def calculate_values(self, series: OHLCVSeries, indicator_config: IndicatorConfig) -> Tuple[str, np.ndarray]:
+        """
+        Indicator name and main line (``Indicator.values``) as a read-only array
+        """
+        name, lines = self.calculate_lines(series, indicator_config)
+        return name, lines[INDICATOR_LINES[indicator_config.type][0]]
+
+    def calculate_lines(self, series: OHLCVSeries, indicator_config: IndicatorConfig) -> Tuple[str, Dict[str, np.ndarray]]:
+        """
+        Indicator name and every output line as read-only arrays
+        """
+        cached = self._lookup(series, indicator_config)
+        if cached is not None:
+            return cached
+        name, lines = IndicatorService.calculate_lines(series, indicator_config)
+        return self._store(series, indicator_config, name, lines, extended=False)
+
+    def _lookup(self, series: OHLCVSeries, indicator_config: IndicatorConfig) -> Optional[Tuple[str, Dict[str, np.ndarray]]]:
+        """
+        A cached result, or one extended from a cached prefix; None on a miss
+        """
+        normalized = normalize_config(indicator_config)
+        columns = _input_columns(series, indicator_config.type)
+        key = (hash_columns(columns, len(series)), normalized)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.name, entry.lines
+            prefix = self._find_prefix(normalized, columns, len(series)) if self.extend_prefixes else None
+
+        if prefix is None:
+            return None
+        lines = self._extend(prefix, series, indicator_config)
+        return self._store(series, indicator_config, prefix.name, lines, extended=True)
+
+    def _store(
+        self,
+        series: OHLCVSeries,
+        indicator_config: IndicatorConfig,
+        name: str,
+        lines: Dict,
+        extended: bool
+    ) -> Tuple[str, Dict[str, np.ndarray]]:
+        normalized = normalize_config(indicator_config)
+        key = (hash_columns(_input_columns(series, indicator_config.type), len(series)), normalized)
+        lines = {line: np.asarray(values, dtype=np.float64) for line, values in lines.items()}
+        for values in lines.values():
+            values.setflags(write=False)
+        with self._lock:
+            if extended:
+                self.extensions += 1
+            else:
+                self.misses += 1
+            self._insert(_Entry(key, normalized, len(series), name, lines))
+        return name, lines
+
+    def _find_prefix(self, normalized: Tuple, columns: List[np.ndarray], length: int) -> Optional[_Entry]:
+        warmup = _warmup_candles(normalized)
+        if warmup is None:
+            return None
+        by_length = self._by_config.get(normalized, {})
+        # Longest cached prefix first: it leaves the shortest tail
+        for cached_length in sorted(by_length, reverse=True):
+            if cached_length >= length or cached_length < warmup:
+                continue
+            prefix_hash = hash_columns(columns, cached_length)
+            for key in by_length[cached_length]:
+                if key[0] == prefix_hash:
+                    return self._entries[key]
+        return None
+
+    def _extend(self, prefix: _Entry, series: OHLCVSeries, indicator_config: IndicatorConfig) -> Dict[str, np.ndarray]:
+        n = prefix.length
+        if indicator_config.type == IndicatorType.EMA:
+            calculator = IncrementalEMA(indicator_config.period).resume(float(prefix.lines["value"][-1]), n)
+        else:
+            # Window indicators only remember their last few candles
+            calculator = IndicatorService.create_incremental(indicator_config)
+            start = n - _warmup_candles(prefix.normalized)
+            for i in range(start, n):
+                calculator.update(series[i])
+
+        names = _INCREMENTAL_LINES.get(indicator_config.type, ("value",))
+        tail = np.empty((len(series) - n, len(names)))
+        for offset, i in enumerate(range(n, len(series))):
+            tail[offset] = calculator.update(series[i])
+        return {
+            line: np.concatenate((prefix.lines[line], tail[:, column]))
+            for column, line in enumerate(names)
+        }
+
+    def _insert(self, entry: _Entry):
+        if entry.key in self._entries:
+            return
+        if entry.nbytes > self.max_bytes:
+            return
+        self._entries[entry.key] = entry
+        self._by_config.setdefault(entry.normalized, {}).setdefault(entry.length, set()).add(entry.key)
+        self._bytes += entry.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+            lengths = self._by_config[evicted.normalized]
+            lengths[evicted.length].discard(evicted.key)
+            if not lengths[evicted.length]:
+                del lengths[evicted.length]
+            if not lengths:
+                del self._by_config[evicted.normalized]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_config.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.extensions = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.extensions
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "extensions": self.extensions,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+indicator_cache = IndicatorCache.from_env()
@@ -1,96 +1,315 @@
 """Indicator Service - Calculate technical indicators"""
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Tuple, Union
+import numpy as np
 from models.market_data import MarketData, OHLCV
-from models.indicator import Indicator, IndicatorType, IndicatorConfig
-from utils.technical_indicators import (
-    calculate_sma,
-    calculate_ema,
-    calculate_rsi,
-    calculate_macd,
-    calculate_bollinger_bands,
-    calculate_atr,
-    calculate_stochastic,
+from models.ohlcv_series import OHLCVSeries
+from models.indicator import Indicator, IndicatorType, IndicatorConfig, INDICATOR_LINES
+from utils import technical_indicators, fast_indicators
+from utils.indicator_graph import (
+    IndicatorGraph,
+    IndicatorOutputs,
+    plan_sma,
+    plan_ema,
+    plan_rsi,
+    plan_macd,
+    plan_bollinger_bands,
+    plan_atr,
+    plan_stochastic,
 )
+from utils.incremental_indicators import (
+    IncrementalSMA,
+    IncrementalEMA,
+    IncrementalRSI,
+    IncrementalMACD,
+    IncrementalBollingerBands,
+    IncrementalATR,
+    IncrementalStochastic,
+)
+
+# Indicator kernels: pandas (the reference) or NumPy arrays end to end
+INDICATOR_BACKENDS = {
+    "pandas": technical_indicators,
+    "numpy": fast_indicators,
+}
 
 
 class IndicatorService:
+    # Backend used by calculate_lines and the indicator graph; set from
+    # INDICATOR_BACKEND. Cached values are not keyed by backend, so clear
+    # the shared cache after switching at runtime.
+    backend = os.environ.get("INDICATOR_BACKEND", "pandas")
+    
     @staticmethod
     def calculate_indicator(
-        market_data: MarketData,
+        market_data: Union[MarketData, OHLCVSeries],
         indicator_config: IndicatorConfig
     ) -> Indicator:
         """
         Calculate a single indicator based on configuration
         """
-        close_prices = [candle.close for candle in market_data.data]
-        high_prices = [candle.high for candle in market_data.data]
-        low_prices = [candle.low for candle in market_data.data]
+        name, lines = IndicatorService.calculate_lines(market_data, indicator_config)
+        return IndicatorService.build_indicator(name, indicator_config, lines)
+    
+    @staticmethod
+    def calculate_lines(
+        market_data: Union[MarketData, OHLCVSeries],
+        indicator_config: IndicatorConfig
+    ) -> Tuple[str, Dict[str, List[float]]]:
+        """
+        Indicator name and every output line (see ``INDICATOR_LINES``); lines
+        are lists from the pandas backend and arrays from numpy
+        """
+        series = OHLCVSeries.coerce(market_data)
+        close_prices = series.close
+        high_prices = series.high
+        low_prices = series.low
+        kernels = IndicatorService.kernels()
         
         indicator_type = indicator_config.type
         period = indicator_config.period
         params = indicator_config.params or {}
         
         if indicator_type == IndicatorType.SMA:
-            values = calculate_sma(close_prices, period)
+            lines = {"value": kernels.calculate_sma(close_prices, period)}
             name = f"SMA_{period}"
             
         elif indicator_type == IndicatorType.EMA:
-            values = calculate_ema(close_prices, period)
+            lines = {"value": kernels.calculate_ema(close_prices, period)}
             name = f"EMA_{period}"
             
         elif indicator_type == IndicatorType.RSI:
-            values = calculate_rsi(close_prices, period)
+            lines = {"value": kernels.calculate_rsi(close_prices, period)}
             name = f"RSI_{period}"
             
         elif indicator_type == IndicatorType.MACD:
             fast = params.get("fast_period", 12)
             slow = params.get("slow_period", 26)
             signal = params.get("signal_period", 9)
-            macd_line, signal_line, histogram = calculate_macd(close_prices, fast, slow, signal)
-            values = macd_line  # Return MACD line as main value
+            macd_line, signal_line, histogram = kernels.calculate_macd(close_prices, fast, slow, signal)
+            lines = {"macd": macd_line, "signal": signal_line, "histogram": histogram}
             name = f"MACD_{fast}_{slow}_{signal}"
             
         elif indicator_type == IndicatorType.BOLLINGER_BANDS:
             std_dev = params.get("std_dev", 2.0)
-            upper, middle, lower = calculate_bollinger_bands(close_prices, period, std_dev)
-            values = middle  # Return middle band as main value
+            upper, middle, lower = kernels.calculate_bollinger_bands(close_prices, period, std_dev)
+            lines = {"middle": middle, "upper": upper, "lower": lower}
             name = f"BB_{period}_{std_dev}"
             
         elif indicator_type == IndicatorType.ATR:
-            values = calculate_atr(high_prices, low_prices, close_prices, period)
+            lines = {"value": kernels.calculate_atr(high_prices, low_prices, close_prices, period)}
             name = f"ATR_{period}"
             
         elif indicator_type == IndicatorType.STOCHASTIC:
             k_period = params.get("k_period", 14)
             d_period = params.get("d_period", 3)
-            k_values, d_values = calculate_stochastic(high_prices, low_prices, close_prices, k_period, d_period)
-            values = k_values  # Return %K as main value
+            k_values, d_values = kernels.calculate_stochastic(high_prices, low_prices, close_prices, k_period, d_period)
+            lines = {"k": k_values, "d": d_values}
             name = f"STOCH_{k_period}_{d_period}"
             
         else:
             raise ValueError(f"Unknown indicator type: {indicator_type}")
         
-        return Indicator(
+        return name, lines
+    
+    @staticmethod
+    def kernels():
+        """
+        Module with the ``calculate_*`` functions of the configured backend
+        """
+        kernels = INDICATOR_BACKENDS.get(IndicatorService.backend)
+        if kernels is None:
+            raise ValueError(f"Unknown indicator backend: {IndicatorService.backend}")
+        return kernels
+    
+    @staticmethod
+    def selected_lines(indicator_config: IndicatorConfig) -> List[str]:
+        """
+        Line names requested by ``indicator_config.outputs``
+        """
+        available = INDICATOR_LINES[indicator_config.type]
+        outputs = indicator_config.outputs
+        if not outputs:
+            return []
+        if "all" in outputs:
+            return list(available)
+        unknown = [line for line in outputs if line not in available]
+        if unknown:
+            raise ValueError(
+                f"Unknown outputs for {indicator_config.type.value}: {', '.join(unknown)} "
+                f"(available: {', '.join(available)})"
+            )
+        return list(outputs)
+    
+    @staticmethod
+    def build_indicator(name: str, indicator_config: IndicatorConfig, lines: Dict) -> Indicator:
+        """
+        ``Indicator`` with the main line as ``values`` and the requested
+        lines in ``lines``; line values may be lists or arrays
+        """
+        def as_list(values):
+            return values.tolist() if hasattr(values, "tolist") else values
+        
+        selected = IndicatorService.selected_lines(indicator_config)
+        if not indicator_config.fill_warmup:
+            lines = IndicatorService.mask_warmup(indicator_config, lines)
+        return Indicator.model_construct(
             name=name,
-            type=indicator_type,
-            values=values,
-            config=indicator_config
+            type=indicator_config.type,
+            values=as_list(lines[INDICATOR_LINES[indicator_config.type][0]]),
+            config=indicator_config,
+            lines={line: as_list(lines[line]) for line in selected} if selected else None
         )
     
+    @staticmethod
+    def warmup_lengths(indicator_config: IndicatorConfig) -> Dict[str, int]:
+        """
+        Leading candles of each line that the kernels fill with 0 or 50
+        because the indicator is not defined there yet
+        """
+        indicator_type = indicator_config.type
+        period = indicator_config.period
+        params = indicator_config.params or {}
+        
+        if indicator_type in (
+            IndicatorType.SMA, IndicatorType.RSI, IndicatorType.BOLLINGER_BANDS, IndicatorType.ATR
+        ):
+            warmup = max(period - 1, 0)
+            return {line: warmup for line in INDICATOR_LINES[indicator_type]}
+        if indicator_type == IndicatorType.STOCHASTIC:
+            k_period = params.get("k_period", 14)
+            d_period = params.get("d_period", 3)
+            return {"k": k_period - 1, "d": k_period + d_period - 2}
+        # EMAs (and so MACD) are defined from the first candle
+        return {line: 0 for line in INDICATOR_LINES[indicator_type]}
+    
+    @staticmethod
+    def minimum_length(indicator_config: IndicatorConfig) -> int:
+        """
+        Fewest candles the kernels need; shorter inputs give only NaN
+        """
+        indicator_type = indicator_config.type
+        params = indicator_config.params or {}
+        
+        if indicator_type == IndicatorType.RSI:
+            return indicator_config.period + 1
+        if indicator_type == IndicatorType.MACD:
+            return params.get("slow_period", 26)
+        if indicator_type == IndicatorType.STOCHASTIC:
+            return params.get("k_period", 14)
+        return indicator_config.period
+    
+    @staticmethod
+    def mask_warmup(indicator_config: IndicatorConfig, lines: Dict) -> Dict[str, np.ndarray]:
+        """
+        Copies of ``lines`` with the warm-up candles set to NaN
+        """
+        masked = {}
+        for line, warmup in IndicatorService.warmup_lengths(indicator_config).items():
+            values = np.array(lines[line], dtype=np.float64)
+            values[:warmup] = np.nan
+            masked[line] = values
+        return masked
+    
+    @staticmethod
+    def create_incremental(indicator_config: IndicatorConfig):
+        """
+        Create a streaming calculator for an indicator configuration.
+        Its ``update(candle)`` returns the indicator value(s) at that candle.
+        """
+        indicator_type = indicator_config.type
+        period = indicator_config.period
+        params = indicator_config.params or {}
+        
+        if indicator_type == IndicatorType.SMA:
+            return IncrementalSMA(period)
+        elif indicator_type == IndicatorType.EMA:
+            return IncrementalEMA(period)
+        elif indicator_type == IndicatorType.RSI:
+            return IncrementalRSI(period)
+        elif indicator_type == IndicatorType.MACD:
+            return IncrementalMACD(
+                params.get("fast_period", 12),
+                params.get("slow_period", 26),
+                params.get("signal_period", 9)
+            )
+        elif indicator_type == IndicatorType.BOLLINGER_BANDS:
+            return IncrementalBollingerBands(period, params.get("std_dev", 2.0))
+        elif indicator_type == IndicatorType.ATR:
+            return IncrementalATR(period)
+        elif indicator_type == IndicatorType.STOCHASTIC:
+            return IncrementalStochastic(params.get("k_period", 14), params.get("d_period", 3))
+        else:
+            raise ValueError(f"Unknown indicator type: {indicator_type}")
+    
+    @staticmethod
+    def plan_indicator(graph: IndicatorGraph, indicator_config: IndicatorConfig) -> Tuple[str, IndicatorOutputs]:
+        """
+        Add an indicator's primitives to ``graph``. Returns its name and the
+        nodes of its output lines.
+        """
+        indicator_type = indicator_config.type
+        period = indicator_config.period
+        params = indicator_config.params or {}
+        
+        if indicator_type == IndicatorType.SMA:
+            return f"SMA_{period}", plan_sma(graph, period)
+        elif indicator_type == IndicatorType.EMA:
+            return f"EMA_{period}", plan_ema(graph, period)
+        elif indicator_type == IndicatorType.RSI:
+            return f"RSI_{period}", plan_rsi(graph, period)
+        elif indicator_type == IndicatorType.MACD:
+            fast = params.get("fast_period", 12)
+            slow = params.get("slow_period", 26)
+            signal = params.get("signal_period", 9)
+            return f"MACD_{fast}_{slow}_{signal}", plan_macd(graph, fast, slow, signal)
+        elif indicator_type == IndicatorType.BOLLINGER_BANDS:
+            std_dev = params.get("std_dev", 2.0)
+            return f"BB_{period}_{std_dev}", plan_bollinger_bands(graph, period, std_dev)
+        elif indicator_type == IndicatorType.ATR:
+            return f"ATR_{period}", plan_atr(graph, period)
+        elif indicator_type == IndicatorType.STOCHASTIC:
+            k_period = params.get("k_period", 14)
+            d_period = params.get("d_period", 3)
+            return f"STOCH_{k_period}_{d_period}", plan_stochastic(graph, k_period, d_period)
+        else:
+            raise ValueError(f"Unknown indicator type: {indicator_type}")
+    
     @staticmethod
     def calculate_multiple_indicators(
-        market_data: MarketData,
+        market_data: Union[MarketData, OHLCVSeries],
         configs: List[IndicatorConfig]
     ) -> Dict[str, Indicator]:
         """
-        Calculate multiple indicators at once
+        Calculate multiple indicators at once.
+
+        All configs are planned into one ``IndicatorGraph`` so primitives they
+        share (an EMA inside MACD, the rolling mean behind SMA and Bollinger
+        Bands, ...) are computed once. Values equal ``calculate_indicator``'s.
         """
         indicators = {}
-        for config in configs:
-            indicator = IndicatorService.calculate_indicator(market_data, config)
-            indicators[indicator.name] = indicator
+        for config, name, lines in IndicatorService.calculate_multiple_lines(market_data, configs):
+            indicators[name] = IndicatorService.build_indicator(name, config, lines)
         return indicators
     
+    @staticmethod
+    def calculate_multiple_lines(
+        market_data: Union[MarketData, OHLCVSeries],
+        configs: List[IndicatorConfig]
+    ) -> List[Tuple[IndicatorConfig, str, Dict[str, List[float]]]]:
+        """
+        (config, name, every output line) for each config, from one shared
+        ``IndicatorGraph``
+        """
+        series = OHLCVSeries.coerce(market_data)
+        graph = IndicatorGraph(IndicatorService.backend)
+        planned = [(config, *IndicatorService.plan_indicator(graph, config)) for config in configs]
+        results = graph.evaluate({"close": series.close, "high": series.high, "low": series.low})
+        return [
+            (config, name, IndicatorGraph.assemble(outputs, results, len(series)))
+            for config, name, outputs in planned
+        ]
+    
     @staticmethod
     def get_latest_value(indicator: Indicator) -> float:
         """
@@ -0,0 +1,292 @@
+"""Live Signal Service - Evaluate strategies incrementally on streamed candles"""
+from typing import Callable, Dict, List, Optional
+import math
+import uuid
+from models.market_data import OHLCV
+from models.signal import Signal, SignalType, SignalStrength
+from services.strategy_service import StrategyService
+from utils.incremental_indicators import (
+    IncrementalEMA,
+    IncrementalRSI,
+    IncrementalMACD,
+    IncrementalBollingerBands,
+)
+
+
+class LiveEMACrossover:
+    """
+    Streaming counterpart of ``StrategyService.execute_ema_crossover``
+    """
+    strategy_name = "EMA Crossover"
+
+    def __init__(self, fast_period: int = 9, slow_period: int = 21):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self._fast = IncrementalEMA(fast_period)
+        self._slow = IncrementalEMA(slow_period)
+        self._prev_fast = None
+        self._prev_slow = None
+
+    def update(self, candle: OHLCV):
+        fast_val = self._fast.update(candle)
+        slow_val = self._slow.update(candle)
+        prev_fast = fast_val if self._prev_fast is None else self._prev_fast
+        prev_slow = slow_val if self._prev_slow is None else self._prev_slow
+        self._prev_fast, self._prev_slow = fast_val, slow_val
+
+        signal_type = SignalType.HOLD
+        confidence = 0.5
+        strength = SignalStrength.WEAK
+
+        # The batch EMAs are NaN (no signal) until both periods are covered
+        if self._fast.count >= max(self.fast_period, self.slow_period):
+            if prev_fast <= prev_slow and fast_val > slow_val:
+                signal_type = SignalType.BUY
+                diff_percent = ((fast_val - slow_val) / slow_val) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+
+            elif prev_fast >= prev_slow and fast_val < slow_val:
+                signal_type = SignalType.SELL
+                diff_percent = ((slow_val - fast_val) / fast_val) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+
+        return signal_type, strength, confidence, {
+            f"EMA_{self.fast_period}": fast_val,
+            f"EMA_{self.slow_period}": slow_val
+        }
+
+
+class LiveRSIStrategy:
+    """
+    Streaming counterpart of ``StrategyService.execute_rsi_strategy``
+    """
+    strategy_name = "RSI Strategy"
+
+    def __init__(self, period: int = 14, oversold: float = 30, overbought: float = 70):
+        self.period = period
+        self.oversold = oversold
+        self.overbought = overbought
+        self._rsi = IncrementalRSI(period)
+
+    def update(self, candle: OHLCV):
+        rsi_val = self._rsi.update(candle)
+
+        signal_type = SignalType.HOLD
+        confidence = 0.5
+        strength = SignalStrength.WEAK
+
+        # The batch RSI is NaN (no signal) until period + 1 candles are seen
+        if self._rsi.count >= self.period + 1:
+            if rsi_val < self.oversold:
+                signal_type = SignalType.BUY
+                confidence = 0.5 + ((self.oversold - rsi_val) / self.oversold) * 0.4
+                strength = SignalStrength.STRONG if rsi_val < 20 else SignalStrength.MODERATE
+
+            elif rsi_val > self.overbought:
+                signal_type = SignalType.SELL
+                confidence = 0.5 + ((rsi_val - self.overbought) / (100 - self.overbought)) * 0.4
+                strength = SignalStrength.STRONG if rsi_val > 80 else SignalStrength.MODERATE
+
+        return signal_type, strength, confidence, {
+            f"RSI_{self.period}": rsi_val
+        }
+
+
+class LiveMACDSignal:
+    """
+    Streaming counterpart of ``StrategyService.execute_macd_signal``
+    """
+    strategy_name = "MACD Signal Cross"
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.name = f"MACD_{fast_period}_{slow_period}_{signal_period}"
+        self._macd = IncrementalMACD(fast_period, slow_period, signal_period)
+        self._prev_macd = None
+        self._prev_signal = None
+
+    def update(self, candle: OHLCV):
+        macd_val, signal_val, histogram = self._macd.update(candle)
+        prev_macd = macd_val if self._prev_macd is None else self._prev_macd
+        prev_signal = signal_val if self._prev_signal is None else self._prev_signal
+        self._prev_macd, self._prev_signal = macd_val, signal_val
+
+        signal_type = SignalType.HOLD
+        confidence = 0.5
+        strength = SignalStrength.WEAK
+
+        # The batch lines are all zero (no signal) until the slow period is covered
+        if self._macd.count >= self._macd.slow_period:
+            if prev_macd <= prev_signal and macd_val > signal_val:
+                signal_type = SignalType.BUY
+                diff_percent = ((macd_val - signal_val) / candle.close) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+
+            elif prev_macd >= prev_signal and macd_val < signal_val:
+                signal_type = SignalType.SELL
+                diff_percent = ((signal_val - macd_val) / candle.close) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+
+        return signal_type, strength, confidence, {
+            self.name: macd_val,
+            f"{self.name}_signal": signal_val,
+            f"{self.name}_histogram": histogram
+        }
+
+
+class LiveBollingerBreakout:
+    """
+    Streaming counterpart of ``StrategyService.execute_bollinger_breakout``
+    """
+    strategy_name = "Bollinger Band Breakout"
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.name = f"BB_{period}_{std_dev}"
+        self._bands = IncrementalBollingerBands(period, std_dev)
+
+    def update(self, candle: OHLCV):
+        upper, middle, lower = self._bands.update(candle)
+        price = candle.close
+
+        signal_type = SignalType.HOLD
+        confidence = 0.5
+        strength = SignalStrength.WEAK
+
+        # The batch bands are zero (no signal) until period candles are seen
+        if self._bands.count >= self._bands.period:
+            if price > upper:
+                signal_type = SignalType.BUY
+                diff_percent = ((price - upper) / upper) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+
+            elif price < lower:
+                signal_type = SignalType.SELL
+                diff_percent = ((lower - price) / lower) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+
+        return signal_type, strength, confidence, {
+            f"{self.name}_upper": upper,
+            f"{self.name}_middle": middle,
+            f"{self.name}_lower": lower
+        }
+
+
+class SignalSubscription:
+    """
+    Per-subscription strategy state. ``push`` returns a ``Signal`` only when
+    the signal type differs from the one at the previous candle.
+    """
+    def __init__(self, strategy_id: str, symbol: str, timeframe: str, evaluator):
+        self.id = str(uuid.uuid4())
+        self.strategy_id = strategy_id
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.evaluator = evaluator
+        self.last_signal_type = SignalType.HOLD
+        self.candles_seen = 0
+
+    def push(self, candle: OHLCV) -> Optional[Signal]:
+        signal_type, strength, confidence, indicators = self.evaluator.update(candle)
+        self.candles_seen += 1
+
+        if signal_type == self.last_signal_type:
+            return None
+        self.last_signal_type = signal_type
+
+        return Signal(
+            id=str(uuid.uuid4()),
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            signal_type=signal_type,
+            strength=strength,
+            confidence=round(confidence, 3),
+            price=candle.close,
+            strategy_name=self.evaluator.strategy_name,
+            indicators=indicators
+        )
+
+
+def _period(params: Dict, name: str, default: int) -> int:
+    value = params.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value) or value < 1:
+        raise ValueError(f"Parameter {name} must be a positive whole number, got {value!r}")
+    return int(value)
+
+
+def _number(params: Dict, name: str, default: float) -> float:
+    value = params.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"Parameter {name} must be a number, got {value!r}")
+    return value
+
+
+# strategy id -> factory(parameters) returning a streaming evaluator; bad
+# parameters raise ValueError
+_evaluators: Dict[str, Callable[[Dict], object]] = {
+    "trend_follow_ema": lambda params: LiveEMACrossover(
+        _period(params, "fast_period", 9),
+        _period(params, "slow_period", 21)
+    ),
+    "rsi_oversold": lambda params: LiveRSIStrategy(
+        _period(params, "period", 14),
+        _number(params, "oversold", 30),
+        _number(params, "overbought", 70)
+    ),
+    "macd_signal": lambda params: LiveMACDSignal(
+        _period(params, "fast_period", 12),
+        _period(params, "slow_period", 26),
+        _period(params, "signal_period", 9)
+    ),
+    "bollinger_breakout": lambda params: LiveBollingerBreakout(
+        _period(params, "period", 20),
+        _number(params, "std_dev", 2.0)
+    ),
+}
+
+
+class LiveSignalService:
+    @staticmethod
+    def register_evaluator(strategy_id: str, factory: Callable[[Dict], object]):
+        """
+        Make a strategy streamable. ``factory(parameters)`` returns an object
+        whose ``update(candle)`` gives (signal type, strength, confidence,
+        indicators) and which has a ``strategy_name``, and raises
+        ``ValueError`` for parameters it cannot run with.
+        """
+        _evaluators[strategy_id] = factory
+
+    @staticmethod
+    def streamable_strategies() -> List[str]:
+        """
+        Ids of the strategies with a streaming evaluator
+        """
+        return list(_evaluators)
+
+    @staticmethod
+    def create_subscription(
+        strategy_id: str,
+        symbol: str,
+        timeframe: str,
+        parameters: Dict = None
+    ) -> SignalSubscription:
+        """
+        Create incremental strategy state for a streamed symbol/timeframe.
+        Raises ``ValueError`` for an unknown or unstreamable strategy or bad
+        parameters.
+        """
+        factory = _evaluators.get(strategy_id)
+        if factory is None:
+            # Raises StrategyNotFoundError (a ValueError) for unknown ids
+            StrategyService.get_strategy(strategy_id)
+            raise ValueError(
+                f"Strategy {strategy_id} cannot be streamed; streamable strategies: "
+                f"{', '.join(LiveSignalService.streamable_strategies())}"
+            )
+
+        evaluator = factory(parameters or {})
+        return SignalSubscription(strategy_id, symbol, timeframe, evaluator)
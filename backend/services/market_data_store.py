@@ -0,0 +1,277 @@
+"""Market Data Store - Time-bucketed OHLCV history in MongoDB"""
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+import numpy as np
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from models.market_data import MarketData, MarketDataQuery, TimeFrame
+from models.ohlcv_series import OHLCVSeries, to_epoch_ns
+
+_NS_PER_DAY = 86_400 * 10**9
+
+# Time span covered by one bucket document per timeframe, chosen so a
+# bucket holds roughly 300-1500 candles
+BUCKET_SPANS = {
+    TimeFrame.M1: _NS_PER_DAY,
+    TimeFrame.M5: _NS_PER_DAY,
+    TimeFrame.M15: 7 * _NS_PER_DAY,
+    TimeFrame.M30: 7 * _NS_PER_DAY,
+    TimeFrame.H1: 30 * _NS_PER_DAY,
+    TimeFrame.H4: 180 * _NS_PER_DAY,
+    TimeFrame.D1: 1800 * _NS_PER_DAY,
+}
+
+_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+_DUPLICATE_KEY = 11000
+
+# Rounds of re-reading and merging buckets that overlapping ingests keep
+# rewriting before giving up
+MAX_INGEST_ATTEMPTS = 5
+
+
+class MarketDataNotFoundError(LookupError):
+    """Raised when a query matches no stored candles"""
+
+
+class MarketDataConflictError(Exception):
+    """Raised when concurrent ingests keep rewriting the same buckets"""
+
+
+def _pack(series: OHLCVSeries, start: int, stop: int, symbol: str, timeframe: TimeFrame, bucket: int) -> Dict:
+    # Columns are stored as packed little-endian bytes, not BSON arrays
+    doc = {
+        "symbol": symbol,
+        "timeframe": timeframe.value,
+        "bucket": bucket,
+        "count": int(stop - start),
+        "first": int(series.timestamp[start]),
+        "last": int(series.timestamp[stop - 1]),
+    }
+    for name in _COLUMNS:
+        column = getattr(series, name)[start:stop]
+        doc[name] = column.astype(column.dtype.newbyteorder("<"), copy=False).tobytes()
+    return doc
+
+
+def _unpack(doc: Dict) -> Dict[str, np.ndarray]:
+    return {
+        name: np.frombuffer(doc[name], dtype="<i8" if name == "timestamp" else "<f8")
+        for name in _COLUMNS
+    }
+
+
+def _merge(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Union of two bucket contents by timestamp; new candles replace old ones
+    """
+    timestamps = np.concatenate((old["timestamp"], new["timestamp"]))
+    order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[order]
+    # After a stable sort a new candle follows the old one it replaces
+    keep = np.ones(len(timestamps), dtype=bool)
+    keep[:-1] = timestamps[:-1] != timestamps[1:]
+    return {
+        name: np.concatenate((old[name], new[name]))[order][keep]
+        for name in _COLUMNS
+    }
+
+
+class MarketDataStore:
+    """
+    Persists candles as one document per symbol, timeframe and time bucket
+    (see ``BUCKET_SPANS``) in the ``ohlcv_buckets`` collection. Each document
+    holds its candles as packed column arrays, so a range read touches a
+    handful of documents and decodes them with ``np.frombuffer``.
+    """
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.ohlcv_buckets
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("symbol", 1), ("timeframe", 1), ("bucket", 1)], unique=True
+        )
+
+    @staticmethod
+    def _bucket_of(timestamps: Union[int, np.ndarray], timeframe: TimeFrame):
+        span = BUCKET_SPANS[timeframe]
+        return (timestamps // span) * span
+
+    async def ingest(self, market_data: Union[MarketData, OHLCVSeries]) -> Dict:
+        """
+        Store a series, merging with candles already stored for the same
+        buckets. Every bucket is written in one bulk upsert keyed by symbol,
+        timeframe and bucket start, guarded by the ``version`` it had when
+        read; a bucket changed by an overlapping ingest in between fails on
+        the unique index and is re-read and merged again.
+        """
+        series = OHLCVSeries.coerce(market_data)
+        symbol, timeframe = series.symbol, series.timeframe
+        if len(series) == 0:
+            return {"symbol": symbol, "timeframe": timeframe.value, "candles": 0,
+                    "buckets_inserted": 0, "buckets_updated": 0}
+
+        timestamps = series.timestamp
+        if np.any(timestamps[1:] <= timestamps[:-1]):
+            # Sort, keeping the last of any repeated timestamp
+            empty = {name: getattr(series, name)[:0] for name in _COLUMNS}
+            columns = _merge(empty, {name: getattr(series, name) for name in _COLUMNS})
+            series = OHLCVSeries(symbol, timeframe, **columns)
+        buckets = self._bucket_of(series.timestamp, timeframe)
+        # Boundaries of runs of equal bucket in the sorted series
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        stops = np.r_[starts[1:], len(series)]
+        pending = {
+            int(buckets[start]): (start, stop)
+            for start, stop in zip(starts, stops)
+        }
+
+        inserted, updated = 0, 0
+        for _ in range(MAX_INGEST_ATTEMPTS):
+            existing = {}
+            cursor = self.collection.find(
+                {"symbol": symbol, "timeframe": timeframe.value, "bucket": {"$in": list(pending)}},
+                {"_id": 0}
+            )
+            async for doc in cursor:
+                existing[doc["bucket"]] = doc
+
+            writes = []
+            for bucket, (start, stop) in pending.items():
+                key = {"symbol": symbol, "timeframe": timeframe.value, "bucket": bucket}
+                stored = existing.get(bucket)
+                if stored is None:
+                    doc = _pack(series, start, stop, symbol, timeframe, bucket)
+                    version = None
+                else:
+                    incoming = {name: getattr(series, name)[start:stop] for name in _COLUMNS}
+                    merged = OHLCVSeries(symbol, timeframe, **_merge(_unpack(stored), incoming))
+                    doc = _pack(merged, 0, len(merged), symbol, timeframe, bucket)
+                    # Buckets written before versioning match a null version
+                    version = stored.get("version")
+                doc["version"] = (version or 0) + 1
+                # No document matches a stale version, so the upsert tries a
+                # second insert of the bucket and hits the unique index
+                writes.append(ReplaceOne({**key, "version": version}, doc, upsert=True))
+
+            try:
+                await self.collection.bulk_write(writes, ordered=False)
+                conflicts = set()
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != _DUPLICATE_KEY for error in errors):
+                    raise
+                conflicts = {error["index"] for error in errors}
+
+            for index, bucket in enumerate(list(pending)):
+                if index in conflicts:
+                    continue
+                del pending[bucket]
+                if bucket in existing:
+                    updated += 1
+                else:
+                    inserted += 1
+            if not pending:
+                break
+        else:
+            raise MarketDataConflictError(
+                f"{len(pending)} buckets of {symbol} {timeframe.value} kept changing during ingest; retry"
+            )
+
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe.value,
+            "candles": len(series),
+            "buckets_inserted": inserted,
+            "buckets_updated": updated,
+        }
+
+    async def load(
+        self,
+        symbol: str,
+        timeframe: TimeFrame,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> OHLCVSeries:
+        """
+        Candles with ``start <= timestamp <= end`` as a series; either bound
+        may be omitted
+        """
+        timeframe = TimeFrame(timeframe)
+        start_ns = to_epoch_ns(start) if start is not None else None
+        end_ns = to_epoch_ns(end) if end is not None else None
+
+        query = {"symbol": symbol, "timeframe": timeframe.value}
+        bucket_range = {}
+        if start_ns is not None:
+            bucket_range["$gte"] = int(self._bucket_of(start_ns, timeframe))
+        if end_ns is not None:
+            bucket_range["$lte"] = int(self._bucket_of(end_ns, timeframe))
+        if bucket_range:
+            query["bucket"] = bucket_range
+
+        parts = []
+        async for doc in self.collection.find(query, {"_id": 0}).sort("bucket", 1):
+            parts.append(_unpack(doc))
+
+        columns = {
+            name: np.concatenate([part[name] for part in parts]) if parts
+            else np.empty(0, dtype=np.int64 if name == "timestamp" else np.float64)
+            for name in _COLUMNS
+        }
+        timestamps = columns["timestamp"]
+        lo = 0 if start_ns is None else int(np.searchsorted(timestamps, start_ns, side="left"))
+        hi = len(timestamps) if end_ns is None else int(np.searchsorted(timestamps, end_ns, side="right"))
+        return OHLCVSeries(symbol, timeframe, **{name: column[lo:hi] for name, column in columns.items()})
+
+    async def resolve(
+        self,
+        market_data: Optional[MarketData] = None,
+        query: Optional[MarketDataQuery] = None
+    ) -> Union[MarketData, OHLCVSeries]:
+        """
+        The inline ``market_data`` of a request, or the stored candles its
+        ``query`` selects
+        """
+        if market_data is not None:
+            return market_data
+        series = await self.load(query.symbol, query.timeframe, query.start, query.end)
+        if len(series) == 0:
+            raise MarketDataNotFoundError(
+                f"No stored candles for {query.symbol} {query.timeframe.value} in the requested range"
+            )
+        return series
+
+    async def catalog(self) -> List[Dict]:
+        """
+        Stored symbol/timeframe pairs with their candle count and time range
+        """
+        pipeline = [
+            {"$group": {
+                "_id": {"symbol": "$symbol", "timeframe": "$timeframe"},
+                "candles": {"$sum": "$count"},
+                "buckets": {"$sum": 1},
+                "first": {"$min": "$first"},
+                "last": {"$max": "$last"},
+            }},
+            {"$sort": {"_id.symbol": 1, "_id.timeframe": 1}},
+        ]
+        entries = []
+        async for row in self.collection.aggregate(pipeline):
+            entries.append({
+                "symbol": row["_id"]["symbol"],
+                "timeframe": row["_id"]["timeframe"],
+                "candles": row["candles"],
+                "buckets": row["buckets"],
+                "start": np.datetime64(row["first"], "ns").astype("datetime64[us]").item().isoformat(),
+                "end": np.datetime64(row["last"], "ns").astype("datetime64[us]").item().isoformat(),
+            })
+        return entries
+
+    async def delete(self, symbol: str, timeframe: TimeFrame) -> int:
+        """
+        Remove all stored candles of a symbol and timeframe
+        """
+        result = await self.collection.delete_many({"symbol": symbol, "timeframe": TimeFrame(timeframe).value})
+        return result.deleted_count
@@ -1,79 +1,108 @@
 """Market Data Service - Mock data generator for testing"""
-import random
-from datetime import datetime, timedelta
-from typing import List
-from models.market_data import OHLCV, MarketData, TimeFrame
+from datetime import datetime
+from typing import Iterator, Optional, Union
+from models.market_data import MarketData, MockMarketModel, TimeFrame, TIMEFRAME_DELTAS
+from models.ohlcv_series import OHLCVSeries, to_epoch_ns
+from utils.market_simulator import MarketSimulator
 
 
 class MarketService:
+    @staticmethod
+    def create_simulator(
+        timeframe: TimeFrame = TimeFrame.M5,
+        num_candles: Optional[int] = None,
+        base_price: float = 50000.0,
+        volatility: float = 0.02,
+        seed: Optional[int] = None,
+        model: Optional[MockMarketModel] = None,
+        start: Optional[datetime] = None
+    ) -> MarketSimulator:
+        """
+        Simulator for mock candles of ``timeframe``. Without ``start``, a
+        series of ``num_candles`` ends one candle before the current time
+        (aligned to the timeframe) and an endless one starts there.
+        """
+        step_ns = int(TIMEFRAME_DELTAS[TimeFrame(timeframe)].total_seconds()) * 10**9
+        if start is None:
+            now_ns = to_epoch_ns(datetime.utcnow()) // step_ns * step_ns
+            start_ns = now_ns - step_ns * (num_candles or 0)
+        else:
+            start_ns = to_epoch_ns(start)
+        return MarketSimulator(
+            model=model or MockMarketModel(volatility=volatility),
+            seed=seed,
+            base_price=base_price,
+            start_ns=start_ns,
+            step_ns=step_ns
+        )
+
+    @staticmethod
+    def generate_mock_series(
+        symbol: str,
+        timeframe: TimeFrame = TimeFrame.M5,
+        num_candles: int = 100,
+        base_price: float = 50000.0,
+        volatility: float = 0.02,
+        seed: Optional[int] = None,
+        model: Optional[MockMarketModel] = None,
+        start: Optional[datetime] = None
+    ) -> OHLCVSeries:
+        """
+        Generate mock OHLCV columns; the same ``seed`` and ``model`` give the
+        same prices and volumes
+        """
+        simulator = MarketService.create_simulator(
+            timeframe, num_candles, base_price, volatility, seed, model, start
+        )
+        return OHLCVSeries(symbol=symbol, timeframe=timeframe, **simulator.take(num_candles))
+
+    @staticmethod
+    def stream_mock_series(
+        symbol: str,
+        timeframe: TimeFrame = TimeFrame.M5,
+        num_candles: Optional[int] = None,
+        chunk_size: int = 100_000,
+        base_price: float = 50000.0,
+        volatility: float = 0.02,
+        seed: Optional[int] = None,
+        model: Optional[MockMarketModel] = None,
+        start: Optional[datetime] = None
+    ) -> Iterator[OHLCVSeries]:
+        """
+        Generate mock candles in chunks of at most ``chunk_size``, without
+        end when ``num_candles`` is None. The chunks concatenate to the
+        series ``generate_mock_series`` returns for the same arguments.
+        """
+        simulator = MarketService.create_simulator(
+            timeframe, num_candles, base_price, volatility, seed, model, start
+        )
+        for columns in simulator.chunks(num_candles, chunk_size):
+            yield OHLCVSeries(symbol=symbol, timeframe=timeframe, **columns)
+
     @staticmethod
     def generate_mock_data(
         symbol: str,
         timeframe: TimeFrame = TimeFrame.M5,
         num_candles: int = 100,
         base_price: float = 50000.0,
-        volatility: float = 0.02
+        volatility: float = 0.02,
+        seed: Optional[int] = None,
+        model: Optional[MockMarketModel] = None
     ) -> MarketData:
         """
         Generate realistic mock OHLCV data for testing
         """
-        candles = []
-        current_time = datetime.utcnow()
-        current_price = base_price
-        
-        # Determine time delta based on timeframe
-        time_deltas = {
-            TimeFrame.M1: timedelta(minutes=1),
-            TimeFrame.M5: timedelta(minutes=5),
-            TimeFrame.M15: timedelta(minutes=15),
-            TimeFrame.M30: timedelta(minutes=30),
-            TimeFrame.H1: timedelta(hours=1),
-            TimeFrame.H4: timedelta(hours=4),
-            TimeFrame.D1: timedelta(days=1),
-        }
-        
-        time_delta = time_deltas.get(timeframe, timedelta(minutes=5))
-        
-        for i in range(num_candles):
-            timestamp = current_time - (time_delta * (num_candles - i))
-            
-            # Generate realistic price movements
-            price_change = current_price * volatility * random.uniform(-1, 1)
-            current_price += price_change
-            
-            # Generate OHLC from current price
-            candle_volatility = current_price * volatility * 0.5
-            open_price = current_price + random.uniform(-candle_volatility, candle_volatility)
-            close_price = current_price + random.uniform(-candle_volatility, candle_volatility)
-            
-            high_price = max(open_price, close_price) + abs(random.uniform(0, candle_volatility))
-            low_price = min(open_price, close_price) - abs(random.uniform(0, candle_volatility))
-            
-            # Generate volume
-            volume = random.uniform(1000000, 5000000)
-            
-            candle = OHLCV(
-                timestamp=timestamp,
-                open=round(open_price, 2),
-                high=round(high_price, 2),
-                low=round(low_price, 2),
-                close=round(close_price, 2),
-                volume=round(volume, 2)
-            )
-            candles.append(candle)
-        
-        return MarketData(
-            symbol=symbol,
-            timeframe=timeframe,
-            data=candles,
-            last_updated=datetime.utcnow()
-        )
-    
+        return MarketService.generate_mock_series(
+            symbol, timeframe, num_candles, base_price, volatility, seed, model
+        ).to_market_data()
+
     @staticmethod
-    def get_latest_price(market_data: MarketData) -> float:
+    def get_latest_price(market_data: Union[MarketData, OHLCVSeries]) -> float:
         """
         Get the latest closing price from market data
         """
+        if isinstance(market_data, OHLCVSeries):
+            return float(market_data.close[-1]) if len(market_data) else 0.0
         if not market_data.data:
             return 0.0
         return market_data.data[-1].close
@@ -0,0 +1,263 @@
+"""Optimizer Service - Parameter sweeps over strategy backtests"""
+import math
+import os
+import random
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from models.execution import ExecutionModel
+from models.market_data import MarketData
+from models.ohlcv_series import OHLCVSeries
+from services.backtest_service import BacktestService
+from services.compute_executor import compute_executor
+from services.indicator_cache import IndicatorCache
+from services.strategy_service import IndicatorMemo
+
+RANKABLE_METRICS = (
+    "roi_percent",
+    "profit_factor",
+    "win_rate",
+    "final_capital",
+    "total_profit",
+    "total_trades",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "calmar_ratio",
+)
+
+# Largest number of combinations one sweep may evaluate
+MAX_EVALUATIONS = int(os.environ.get("OPTIMIZER_MAX_EVALUATIONS", 10000))
+
+# Per-process state, set up once by _init_worker; the indicator cache is
+# bounded like the process-wide one (INDICATOR_CACHE_MAX_BYTES)
+_worker_shm = None
+_worker_series = None
+_worker_indicator_cache = IndicatorCache.from_env()
+
+
+def _share_series(series: OHLCVSeries) -> shared_memory.SharedMemory:
+    """
+    Copy a series into one shared memory block of six float64 rows
+    (timestamp bits, open, high, low, close, volume)
+    """
+    n = len(series)
+    shm = shared_memory.SharedMemory(create=True, size=max(6 * n * 8, 1))
+    block = np.ndarray((6, n), dtype=np.float64, buffer=shm.buf)
+    block[0] = series.timestamp.view(np.float64)
+    block[1] = series.open
+    block[2] = series.high
+    block[3] = series.low
+    block[4] = series.close
+    block[5] = series.volume
+    return shm
+
+
+def _attach_series(shm: shared_memory.SharedMemory, n: int, symbol: str, timeframe: str) -> OHLCVSeries:
+    block = np.ndarray((6, n), dtype=np.float64, buffer=shm.buf)
+    return OHLCVSeries(
+        symbol=symbol,
+        timeframe=timeframe,
+        timestamp=block[0].view(np.int64),
+        open=block[1],
+        high=block[2],
+        low=block[3],
+        close=block[4],
+        volume=block[5]
+    )
+
+
+def _init_worker(shm_name: str, n: int, symbol: str, timeframe: str):
+    global _worker_shm, _worker_series
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_series = _attach_series(_worker_shm, n, symbol, timeframe)
+    _worker_indicator_cache.clear()
+
+
+def _evaluate(
+    strategy_id: str,
+    series: OHLCVSeries,
+    combinations: List[Dict],
+    initial_capital: float,
+    position_size: float,
+    indicator_cache: IndicatorMemo,
+    execution: Optional[ExecutionModel] = None
+) -> List[Dict]:
+    rows = []
+    for parameters in combinations:
+        result = BacktestService.run_backtest(
+            strategy_id=strategy_id,
+            market_data=series,
+            initial_capital=initial_capital,
+            position_size=position_size,
+            parameters=parameters,
+            indicator_cache=indicator_cache,
+            execution=execution
+        )
+        rows.append({
+            "parameters": parameters,
+            "roi_percent": result["roi_percent"],
+            "profit_factor": result["profit_factor"],
+            "win_rate": result["win_rate"],
+            "final_capital": result["final_capital"],
+            "total_profit": result["total_profit"],
+            "total_loss": result["total_loss"],
+            "total_trades": result["total_trades"],
+            "max_drawdown_percent": result["max_drawdown_percent"],
+            "sharpe_ratio": result["sharpe_ratio"],
+            "sortino_ratio": result["sortino_ratio"],
+            "calmar_ratio": result["calmar_ratio"],
+        })
+    return rows
+
+
+def _evaluate_in_worker(
+    strategy_id: str,
+    combinations: List[Dict],
+    initial_capital: float,
+    position_size: float,
+    execution: Optional[ExecutionModel] = None
+) -> List[Dict]:
+    return _evaluate(
+        strategy_id, _worker_series, combinations,
+        initial_capital, position_size, _worker_indicator_cache, execution
+    )
+
+
+class OptimizerService:
+    @staticmethod
+    def build_combinations(
+        parameter_grid: Dict[str, List[Any]],
+        method: str = "grid",
+        max_evaluations: Optional[int] = None,
+        seed: Optional[int] = None,
+        base_parameters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Expand a parameter grid into the combinations to evaluate.
+
+        ``grid`` walks the full cartesian product (truncated to
+        ``max_evaluations``); ``random`` draws ``max_evaluations`` distinct
+        combinations with a seeded generator. Combinations are returned in
+        grid order so runs sharing indicator periods stay adjacent.
+
+        Sweeps of more than ``MAX_EVALUATIONS`` combinations (set by
+        ``OPTIMIZER_MAX_EVALUATIONS``) are rejected with ``ValueError``
+        before any combination is built.
+        """
+        names = list(parameter_grid)
+        values = [list(parameter_grid[name]) for name in names]
+        if any(not options for options in values):
+            raise ValueError("Every parameter in the grid needs at least one value")
+        if max_evaluations is not None and max_evaluations < 1:
+            raise ValueError("max_evaluations must be at least 1")
+        if method == "random" and max_evaluations is None:
+            raise ValueError("Random search needs max_evaluations")
+
+        total = math.prod(len(options) for options in values)
+        count = total if max_evaluations is None else min(max_evaluations, total)
+        if count > MAX_EVALUATIONS:
+            raise ValueError(
+                f"The sweep has {count} combinations, more than the limit of {MAX_EVALUATIONS}; "
+                f"narrow the grid or set max_evaluations"
+            )
+
+        if method == "grid":
+            indices = range(count)
+        elif method == "random":
+            indices = sorted(random.Random(seed).sample(range(total), count))
+        else:
+            raise ValueError(f"Unknown optimization method: {method}")
+
+        combinations = []
+        for index in indices:
+            # Decode the mixed-radix index, last parameter varying fastest
+            positions = []
+            for options in reversed(values):
+                index, position = divmod(index, len(options))
+                positions.append(position)
+            combination = dict(base_parameters or {})
+            for name, options, position in zip(names, values, reversed(positions)):
+                combination[name] = options[position]
+            combinations.append(combination)
+        return combinations
+
+    @staticmethod
+    def optimize(
+        strategy_id: str,
+        market_data: Union[MarketData, OHLCVSeries],
+        parameter_grid: Dict[str, List[Any]],
+        method: str = "grid",
+        max_evaluations: Optional[int] = None,
+        seed: Optional[int] = None,
+        rank_by: str = "roi_percent",
+        initial_capital: float = 10000.0,
+        position_size: float = 0.1,
+        base_parameters: Optional[Dict] = None,
+        max_workers: Optional[int] = None,
+        top_n: Optional[int] = None,
+        execution: Optional[ExecutionModel] = None
+    ) -> Dict:
+        """
+        Backtest every parameter combination and rank them by a metric.
+
+        Combinations are fanned out over a process pool whose workers read the
+        series from shared memory. Each worker memoizes indicator series, so an
+        EMA or RSI period that repeats across the grid is computed once per
+        worker instead of once per backtest. The pool is one of the compute
+        executor's worker pools (see ``ComputeExecutor.worker_pool``): when
+        they are all busy the sweep fails with ``ComputeSaturatedError``.
+        """
+        if rank_by not in RANKABLE_METRICS:
+            raise ValueError(f"Cannot rank by: {rank_by}")
+
+        series = OHLCVSeries.coerce(market_data)
+        combinations = OptimizerService.build_combinations(
+            parameter_grid, method, max_evaluations, seed, base_parameters
+        )
+        workers = compute_executor.worker_count(max_workers, len(combinations))
+
+        if workers == 1:
+            rows = _evaluate(
+                strategy_id, series, combinations, initial_capital, position_size,
+                IndicatorCache.from_env(), execution
+            )
+        else:
+            # A few contiguous chunks per worker balance load while keeping
+            # combinations that share indicators on the same worker
+            chunk_size = math.ceil(len(combinations) / (workers * 2))
+            chunks = [
+                combinations[start:start + chunk_size]
+                for start in range(0, len(combinations), chunk_size)
+            ]
+            shm = _share_series(series)
+            try:
+                with compute_executor.worker_pool(
+                    workers,
+                    initializer=_init_worker,
+                    initargs=(shm.name, len(series), series.symbol, series.timeframe.value)
+                ) as pool:
+                    futures = [
+                        pool.submit(
+                            _evaluate_in_worker, strategy_id, chunk, initial_capital, position_size, execution
+                        )
+                        for chunk in chunks
+                    ]
+                    rows = [row for future in futures for row in future.result()]
+            finally:
+                shm.close()
+                shm.unlink()
+
+        rows.sort(key=lambda row: row[rank_by], reverse=True)
+        for rank, row in enumerate(rows, start=1):
+            row["rank"] = rank
+
+        return {
+            "strategy_id": strategy_id,
+            "symbol": series.symbol,
+            "timeframe": series.timeframe.value,
+            "method": method,
+            "rank_by": rank_by,
+            "evaluated": len(rows),
+            "workers": workers,
+            "results": rows[:top_n] if top_n else rows
+        }
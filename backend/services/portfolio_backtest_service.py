@@ -0,0 +1,223 @@
+"""Portfolio Backtest Service - Test a strategy across many symbols with shared capital"""
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+import numpy as np
+from models.market_data import MarketData
+from models.ohlcv_series import OHLCVSeries, to_datetimes
+from services.strategy_service import StrategyService, SignalSeries
+from services.backtest_service import WARMUP_CANDLES
+
+
+def _align(series_list: List[OHLCVSeries]):
+    """
+    Common timestamp index and a (symbols x time) close matrix, NaN where a
+    symbol has no candle, plus each symbol's column positions
+    """
+    timestamps = np.unique(np.concatenate([series.timestamp for series in series_list]))
+    close = np.full((len(series_list), len(timestamps)), np.nan)
+    positions = []
+    for row, series in enumerate(series_list):
+        columns = np.searchsorted(timestamps, series.timestamp)
+        close[row, columns] = series.close
+        positions.append(columns)
+    return timestamps, close, positions
+
+
+def _forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """
+    Carry each row's last known value across NaN gaps
+    """
+    n = matrix.shape[1]
+    index = np.where(np.isnan(matrix), 0, np.arange(n))
+    np.maximum.accumulate(index, axis=1, out=index)
+    return matrix[np.arange(matrix.shape[0])[:, None], index]
+
+
+def _metrics(profits: np.ndarray) -> Dict:
+    wins = profits[profits > 0]
+    losses = profits[profits <= 0]
+    # Summed in trade order, as run_backtest accumulates them
+    total_profit = sum(wins.tolist(), 0.0)
+    total_loss = sum(np.abs(losses).tolist(), 0.0)
+    if total_loss > 0:
+        profit_factor = total_profit / total_loss
+    else:
+        profit_factor = total_profit if total_profit > 0 else 0
+    return {
+        "total_trades": len(profits),
+        "winning_trades": len(wins),
+        "losing_trades": len(losses),
+        "win_rate": round(len(wins) / len(profits) * 100, 2) if len(profits) else 0.0,
+        "total_profit": round(total_profit, 2),
+        "total_loss": round(total_loss, 2),
+        "profit_factor": round(profit_factor, 2),
+    }
+
+
+class PortfolioBacktestService:
+    @staticmethod
+    def run_portfolio_backtest(
+        strategy_id: str,
+        market_data: List[Union[MarketData, OHLCVSeries]],
+        initial_capital: float = 10000.0,
+        position_size: float = 0.1,  # fraction of capital per position
+        max_positions: Optional[int] = None,
+        parameters: Dict = None,
+        include_details: bool = False
+    ) -> Dict:
+        """
+        Run one strategy over many symbols sharing a single capital pool.
+
+        Series are aligned on the union of their timestamps and the strategy's
+        signals form a (symbols x time) matrix; a symbol without a candle at a
+        timestamp holds. At each timestamp with any signal, exits are settled
+        first, then entries are opened in order of confidence, each costing
+        ``position_size`` of realized capital, while cash and
+        ``max_positions`` allow. Open positions are closed at each symbol's
+        last candle. With a single symbol the trades and metrics match
+        ``BacktestService.run_backtest``.
+        """
+        series_list = [OHLCVSeries.coerce(data) for data in market_data]
+        if not series_list:
+            raise ValueError("At least one market series is required")
+        timeframes = {series.timeframe for series in series_list}
+        if len(timeframes) > 1:
+            raise ValueError("All series must share one timeframe")
+        symbols = [series.symbol for series in series_list]
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("Each symbol may appear only once")
+
+        timestamps, close, positions = _align(series_list)
+        n_symbols, n_steps = close.shape
+        signals = np.zeros((n_symbols, n_steps), dtype=np.int8)
+        confidence = np.zeros((n_symbols, n_steps))
+        last_step = np.empty(n_symbols, dtype=np.int64)
+        for row, series in enumerate(series_list):
+            signal_series = StrategyService.generate_signals(strategy_id, series, parameters, {})
+            columns = positions[row]
+            signals[row, columns[WARMUP_CANDLES:]] = signal_series.signals[WARMUP_CANDLES:]
+            confidence[row, columns] = signal_series.confidence
+            last_step[row] = columns[-1] if len(columns) else -1
+
+        capital = initial_capital  # realized capital
+        cash = initial_capital
+        units = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        entry_step = np.zeros(n_symbols, dtype=np.int64)
+        holding = np.zeros(n_symbols, dtype=bool)
+        closed = []  # (symbol row, entry step, exit step, units, entry price, exit price, profit)
+        trades = []
+        limit = max_positions if max_positions is not None else n_symbols
+
+        for t in np.flatnonzero(signals.any(axis=0)).tolist():
+            column = signals[:, t]
+            prices = close[:, t]
+
+            exits = np.flatnonzero((column == SignalSeries.SELL) & holding)
+            if len(exits):
+                profits = units[exits] * prices[exits] - units[exits] * entry_price[exits]
+                for row, profit in zip(exits.tolist(), profits.tolist()):
+                    capital += profit
+                    cash += units[row] * prices[row]
+                    closed.append((row, int(entry_step[row]), t, units[row], entry_price[row], prices[row], profit))
+                    trades.append({
+                        "symbol": symbols[row],
+                        "type": "SELL",
+                        "price": float(prices[row]),
+                        "timestamp": t,
+                        "profit": profit,
+                        "confidence": round(float(confidence[row, t]), 3),
+                    })
+                holding[exits] = False
+                units[exits] = 0.0
+
+            entries = np.flatnonzero((column == SignalSeries.BUY) & ~holding)
+            if len(entries):
+                # Highest confidence first, ties by symbol order
+                entries = entries[np.argsort(-confidence[entries, t], kind="stable")]
+                position_value = capital * position_size
+                slots = limit - int(holding.sum())
+                if position_value > 0:
+                    slots = min(slots, int((cash + 1e-9 * capital) // position_value))
+                entries = entries[:max(slots, 0)]
+                units[entries] = position_value / prices[entries]
+                entry_price[entries] = prices[entries]
+                entry_step[entries] = t
+                holding[entries] = True
+                cash -= position_value * len(entries)
+                for row in entries.tolist():
+                    trades.append({
+                        "symbol": symbols[row],
+                        "type": "BUY",
+                        "price": float(prices[row]),
+                        "timestamp": t,
+                        "confidence": round(float(confidence[row, t]), 3),
+                    })
+
+        # Close anything still open at the symbol's last candle
+        for row in np.flatnonzero(holding).tolist():
+            t = int(last_step[row])
+            price = close[row, t]
+            profit = units[row] * price - units[row] * entry_price[row]
+            capital += profit
+            closed.append((row, int(entry_step[row]), t, units[row], entry_price[row], price, profit))
+
+        datetimes = to_datetimes(timestamps, series_list[0].tzinfo)
+        for trade in trades:
+            trade["timestamp"] = datetimes[trade["timestamp"]]
+
+        closed_rows = np.array([trade[0] for trade in closed], dtype=np.int64)
+        closed_profits = np.array([trade[6] for trade in closed], dtype=np.float64)
+
+        per_symbol = []
+        for row, symbol in enumerate(symbols):
+            profits = closed_profits[closed_rows == row]
+            per_symbol.append({
+                "symbol": symbol,
+                "candles": len(series_list[row]),
+                "net_profit": round(float(profits.sum()), 2),
+                **_metrics(profits),
+            })
+
+        response = {
+            "strategy_id": strategy_id,
+            "symbols": symbols,
+            "timeframe": series_list[0].timeframe.value,
+            "timestamps": n_steps,
+            "initial_capital": initial_capital,
+            "final_capital": round(capital, 2),
+            "roi_percent": round(((capital - initial_capital) / initial_capital) * 100, 2),
+            **_metrics(closed_profits),
+            "per_symbol": per_symbol,
+            "trades": trades[-10:]
+        }
+
+        if include_details:
+            response["trades"] = trades
+            response["equity_curve"] = PortfolioBacktestService._equity_curve(
+                datetimes, close, initial_capital, closed
+            )
+        return response
+
+    @staticmethod
+    def _equity_curve(datetimes: List[datetime], close: np.ndarray, initial_capital: float, closed: List) -> Dict:
+        """
+        Realized capital plus every open position marked at its symbol's
+        latest close
+        """
+        n_symbols, n_steps = close.shape
+        realized = np.zeros(n_steps)
+        units = np.zeros((n_symbols, n_steps))
+        entry_prices = np.zeros((n_symbols, n_steps))
+        for row, entry, exit, position, entry_price, _, profit in closed:
+            realized[exit] += profit
+            units[row, entry:exit] = position
+            entry_prices[row, entry:exit] = entry_price
+
+        marks = np.nan_to_num(_forward_fill(close))
+        open_pnl = (units * (marks - entry_prices)).sum(axis=0)
+        equity = initial_capital + np.cumsum(realized) + open_pnl
+        return {
+            "timestamp": datetimes,
+            "equity": equity.tolist()
+        }
@@ -0,0 +1,225 @@
+"""Resample Service - Higher-timeframe rollups of base candles"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+from models.market_data import MarketData, TimeFrame, TIMEFRAME_DELTAS
+from models.ohlcv_series import OHLCVSeries
+from services.indicator_cache import hash_columns
+from utils.resampling import BAR_COLUMNS, align, completed_bar_index, resample_columns
+
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+def timeframe_ns(timeframe: TimeFrame) -> int:
+    return int(TIMEFRAME_DELTAS[TimeFrame(timeframe)].total_seconds()) * 10**9
+
+
+def _base_columns(series: OHLCVSeries):
+    return [series.timestamp, series.open, series.high, series.low, series.close, series.volume]
+
+
+def _check_timeframes(base: TimeFrame, target: TimeFrame):
+    base_ns, target_ns = timeframe_ns(base), timeframe_ns(target)
+    if target_ns < base_ns or target_ns % base_ns:
+        raise ValueError(
+            f"Cannot resample {base.value} candles to {target.value}: "
+            f"the target must be a whole multiple of the base timeframe"
+        )
+
+
+class _Rollup:
+    __slots__ = ("key", "target", "length", "columns", "last_start", "nbytes")
+
+    def __init__(self, key: Tuple, target: Tuple, length: int, columns: Dict[str, np.ndarray], last_start: int):
+        self.key = key
+        self.target = target
+        self.length = length
+        self.columns = columns
+        # Base index of the first candle of the last (possibly unfinished) bar
+        self.last_start = last_start
+        self.nbytes = sum(column.nbytes for column in columns.values()) + _ENTRY_OVERHEAD_BYTES
+
+
+class RollupCache:
+    """
+    LRU cache of resampled bars keyed by a hash of the base candles, the
+    target timeframe and the gap mode, bounded by total bytes.
+
+    When a base series is a cached series plus new candles, only the bars
+    from the cached series' last (possibly unfinished) bar onwards are
+    rebuilt. Extended rollups equal a full resample exactly.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, extend_prefixes: bool = True):
+        self.max_bytes = max_bytes
+        self.extend_prefixes = extend_prefixes
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        # (timeframe, fill_gaps) -> {length -> {key}} for prefix lookups
+        self._by_target = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RollupCache":
+        return cls(
+            max_bytes=int(os.environ.get("ROLLUP_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            extend_prefixes=os.environ.get("ROLLUP_CACHE_EXTEND_PREFIXES", "1") != "0"
+        )
+
+    def rollup(self, series: OHLCVSeries, timeframe: TimeFrame, fill_gaps: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Bar columns (see ``utils.resampling.BAR_COLUMNS``) of ``series``
+        resampled to ``timeframe``, as read-only arrays
+        """
+        timeframe = TimeFrame(timeframe)
+        target = (timeframe.value, bool(fill_gaps))
+        columns = _base_columns(series)
+        key = (hash_columns(columns, len(series)), target)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.columns
+            prefix = self._find_prefix(target, columns, len(series)) if self.extend_prefixes else None
+
+        bar_ns = timeframe_ns(timeframe)
+        if prefix is None:
+            bars = resample_columns(*columns, bar_ns, fill_gaps)
+        else:
+            tail = resample_columns(*(column[prefix.last_start:] for column in columns), bar_ns, fill_gaps)
+            bars = {
+                name: np.concatenate((prefix.columns[name][:-1], tail[name]))
+                for name in BAR_COLUMNS
+            }
+
+        for column in bars.values():
+            column.setflags(write=False)
+        last_start = int(np.searchsorted(series.timestamp, bars["timestamp"][-1])) if len(series) else 0
+        with self._lock:
+            if prefix is None:
+                self.misses += 1
+            else:
+                self.extensions += 1
+            self._insert(_Rollup(key, target, len(series), bars, last_start))
+        return bars
+
+    def _find_prefix(self, target: Tuple, columns, length: int) -> Optional[_Rollup]:
+        by_length = self._by_target.get(target, {})
+        # Longest cached prefix first: it leaves the fewest bars to rebuild
+        for cached_length in sorted(by_length, reverse=True):
+            if cached_length >= length or cached_length == 0:
+                continue
+            prefix_hash = hash_columns(columns, cached_length)
+            for key in by_length[cached_length]:
+                if key[0] == prefix_hash:
+                    return self._entries[key]
+        return None
+
+    def _insert(self, entry: _Rollup):
+        if entry.key in self._entries or entry.nbytes > self.max_bytes:
+            return
+        self._entries[entry.key] = entry
+        self._by_target.setdefault(entry.target, {}).setdefault(entry.length, set()).add(entry.key)
+        self._bytes += entry.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+            lengths = self._by_target[evicted.target]
+            lengths[evicted.length].discard(evicted.key)
+            if not lengths[evicted.length]:
+                del lengths[evicted.length]
+            if not lengths:
+                del self._by_target[evicted.target]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_target.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.extensions = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.extensions
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "extensions": self.extensions,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+rollup_cache = RollupCache.from_env()
+
+
+class ResampleService:
+    @staticmethod
+    def resample(
+        market_data: Union[MarketData, OHLCVSeries],
+        timeframe: TimeFrame,
+        fill_gaps: bool = False
+    ) -> Tuple[OHLCVSeries, np.ndarray]:
+        """
+        Bars of ``timeframe`` built from finer candles, and the number of
+        candles in each bar. The last bar may still be unfinished.
+        """
+        series = OHLCVSeries.coerce(market_data)
+        timeframe = TimeFrame(timeframe)
+        _check_timeframes(series.timeframe, timeframe)
+        bars = rollup_cache.rollup(series, timeframe, fill_gaps)
+        rolled = OHLCVSeries(
+            symbol=series.symbol,
+            timeframe=timeframe,
+            last_updated=series.last_updated,
+            **{name: bars[name] for name in BAR_COLUMNS if name != "count"}
+        )
+        return rolled, bars["count"]
+
+    @staticmethod
+    def completed_index(series: OHLCVSeries, bars: OHLCVSeries) -> np.ndarray:
+        """
+        For every candle of ``series``, the index in ``bars`` of the last bar
+        closed by then (-1 before the first)
+        """
+        return completed_bar_index(
+            series.timestamp, timeframe_ns(series.timeframe),
+            bars.timestamp, timeframe_ns(bars.timeframe)
+        )
+
+    @staticmethod
+    def aligned(
+        market_data: Union[MarketData, OHLCVSeries],
+        timeframe: TimeFrame,
+        fill_gaps: bool = False
+    ) -> OHLCVSeries:
+        """
+        The ``timeframe`` series on the base candles' index: each candle
+        carries the last higher-timeframe bar that had closed when it
+        closed, so nothing from an unfinished bar leaks into earlier
+        candles. Candles before the first closed bar are NaN.
+        """
+        series = OHLCVSeries.coerce(market_data)
+        bars, _ = ResampleService.resample(series, timeframe, fill_gaps)
+        index = ResampleService.completed_index(series, bars)
+        return OHLCVSeries(
+            symbol=series.symbol,
+            timeframe=series.timeframe,
+            timestamp=series.timestamp,
+            last_updated=series.last_updated,
+            **{name: align(getattr(bars, name), index) for name in ("open", "high", "low", "close", "volume")}
+        )
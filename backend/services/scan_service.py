@@ -0,0 +1,150 @@
+"""Scan Service - Evaluate many strategies over many symbols in one request"""
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple, Union
+from models.market_data import MarketData
+from models.ohlcv_series import OHLCVSeries
+from services.strategy_service import StrategyService
+from services.compute_executor import compute_executor, ComputeSaturatedError
+
+# A scan source: symbol, timeframe and a coroutine function loading its candles
+ScanLoader = Tuple[str, str, Callable[[], Awaitable[Union[MarketData, OHLCVSeries]]]]
+
+# Backoff between submissions to a saturated process pool, in seconds
+SATURATED_BACKOFF_START = 0.05
+SATURATED_BACKOFF_MAX = 1.0
+
+# Columns of a scan result row, in order
+SCAN_COLUMNS = (
+    "symbol",
+    "timeframe",
+    "strategy_id",
+    "signal_type",
+    "strength",
+    "confidence",
+    "price",
+    "timestamp",
+    "indicators",
+    "error",
+)
+
+
+def _row(series: OHLCVSeries, strategy_id: str, signal=None, error: str = None) -> Dict:
+    return {
+        "symbol": series.symbol,
+        "timeframe": series.timeframe.value,
+        "strategy_id": strategy_id,
+        "signal_type": signal.signal_type.value if signal else None,
+        "strength": signal.strength.value if signal else None,
+        "confidence": signal.confidence if signal else None,
+        "price": signal.price if signal else None,
+        "timestamp": series.datetime_at(-1).isoformat() if len(series) else None,
+        "indicators": signal.indicators if signal else None,
+        "error": error,
+    }
+
+
+def _error_rows(sources: List[Tuple[str, str]], strategies: List[Dict], error: str) -> List[Dict]:
+    """
+    One row per source and strategy carrying ``error`` in place of a signal
+    """
+    rows = []
+    for symbol, timeframe in sources:
+        for strategy in strategies:
+            row = dict.fromkeys(SCAN_COLUMNS)
+            row.update(symbol=symbol, timeframe=timeframe, strategy_id=strategy["strategy_id"], error=error)
+            rows.append(row)
+    return rows
+
+
+class ScanService:
+    @staticmethod
+    def scan_series(
+        market_data: Union[MarketData, OHLCVSeries],
+        strategies: List[Dict]
+    ) -> List[Dict]:
+        """
+        Latest signal of every strategy on one series. Strategies share one
+        indicator memo, so an indicator they have in common is computed once.
+        """
+        series = OHLCVSeries.coerce(market_data)
+        if len(series) == 0:
+            return [_row(series, strategy["strategy_id"], error="No candles") for strategy in strategies]
+        indicator_cache = {}
+        rows = []
+        for strategy in strategies:
+            strategy_id = strategy["strategy_id"]
+            try:
+                signal = StrategyService.execute_strategy(
+                    strategy_id, series, strategy.get("parameters"), indicator_cache
+                )
+                rows.append(_row(series, strategy_id, signal))
+            except Exception as e:
+                rows.append(_row(series, strategy_id, error=str(e)))
+        return rows
+
+    @staticmethod
+    def scan_batch(
+        market_data: List[Union[MarketData, OHLCVSeries]],
+        strategies: List[Dict]
+    ) -> List[Dict]:
+        return [row for data in market_data for row in ScanService.scan_series(data, strategies)]
+
+    @staticmethod
+    async def stream(
+        loaders: List[ScanLoader],
+        strategies: List[Dict],
+        batch_size: int = 16,
+        concurrency: int = 2
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Scan the series produced by ``loaders`` in batches on the process
+        pool, yielding each batch's rows as soon as it completes. At most
+        ``concurrency`` batches are in flight, so loading the next series
+        overlaps with evaluating the current ones.
+
+        Failures never end the stream early: a series that cannot be loaded,
+        or a batch that times out, fails in a worker or cannot get a worker
+        within the executor's timeout, comes back as error rows naming its
+        symbols, so every requested symbol appears in the output.
+        """
+        async def run(batch, sources, failed):
+            if not batch:
+                return failed
+            deadline = time.monotonic() + compute_executor.timeout
+            delay = SATURATED_BACKOFF_START
+            while True:
+                try:
+                    rows = await compute_executor.run_process(ScanService.scan_batch, batch, strategies)
+                    return failed + rows
+                except ComputeSaturatedError as e:
+                    if time.monotonic() + delay > deadline:
+                        return failed + _error_rows(sources, strategies, str(e))
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, SATURATED_BACKOFF_MAX)
+                except Exception as e:
+                    return failed + _error_rows(sources, strategies, str(e) or type(e).__name__)
+
+        pending = set()
+        try:
+            for start in range(0, len(loaders), batch_size):
+                batch, sources, failed = [], [], []
+                for symbol, timeframe, load in loaders[start:start + batch_size]:
+                    try:
+                        batch.append(await load())
+                        sources.append((symbol, timeframe))
+                    except Exception as e:
+                        failed.extend(_error_rows([(symbol, timeframe)], strategies, str(e) or type(e).__name__))
+                pending.add(asyncio.create_task(run(batch, sources, failed)))
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
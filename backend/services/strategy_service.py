@@ -1,92 +1,133 @@
 """Strategy Service - Execute trading strategies"""
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
+import numpy as np
 from models.market_data import MarketData
-from models.indicator import Indicator, IndicatorType, IndicatorConfig
+from models.ohlcv_series import OHLCVSeries
+from models.indicator import Indicator, IndicatorType, IndicatorConfig, INDICATOR_LINES
 from models.strategy import Strategy, StrategyConfig, StrategyResult, StrategyType
 from models.signal import Signal, SignalType, SignalStrength
 from services.indicator_service import IndicatorService
+from services.indicator_cache import IndicatorCache, indicator_cache as shared_indicator_cache
+from services.resample_service import ResampleService
+from utils.resampling import align
+from utils.strategy_rules import RulePlan, compile_rules
 import uuid
 
+# Memo of indicator lines for strategy calls: a dict shared only by calls
+# on the same series, or an IndicatorCache, which any series may share
+IndicatorMemo = Union[Dict, IndicatorCache]
+
+
+class StrategyNotFoundError(ValueError):
+    """Raised for a strategy id that is not registered"""
+
+
+class SignalSeries:
+    """
+    BUY/SELL/HOLD signals for every candle of a market series.
+
+    ``signals[i]`` and ``confidence[i]`` are what ``execute_strategy`` would
+    return for the first ``i+1`` candles; the confidence is unrounded.
+    """
+    BUY = 1
+    HOLD = 0
+    SELL = -1
+
+    def __init__(self, signals: np.ndarray, confidence: np.ndarray):
+        self.signals = signals
+        self.confidence = confidence
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    def signal_type(self, index: int) -> SignalType:
+        code = self.signals[index]
+        if code == SignalSeries.BUY:
+            return SignalType.BUY
+        if code == SignalSeries.SELL:
+            return SignalType.SELL
+        return SignalType.HOLD
+
+
+class RegisteredStrategy:
+    """
+    A strategy's listing info and its latest-signal and signal-series entry
+    points (see ``StrategyService.register_strategy``)
+    """
+    __slots__ = ("info", "execute", "generate", "arguments")
+
+    def __init__(self, info: Dict, execute: Callable, generate: Callable, arguments: Callable):
+        self.info = info
+        self.execute = execute
+        self.generate = generate
+        self.arguments = arguments
+
+
+_registry: Dict[str, RegisteredStrategy] = {}
+
 
 class StrategyService:
     @staticmethod
     def get_predefined_strategies() -> List[Dict]:
         """
-        Get list of predefined trading strategies
-        """
-        return [
-            {
-                "id": "trend_follow_ema",
-                "name": "EMA Crossover",
-                "description": "Buy when fast EMA crosses above slow EMA, sell on opposite",
-                "type": StrategyType.TREND_FOLLOWING,
-                "indicators": ["EMA_9", "EMA_21"],
-                "parameters": {
-                    "fast_period": 9,
-                    "slow_period": 21
-                }
-            },
-            {
-                "id": "rsi_oversold",
-                "name": "RSI Oversold/Overbought",
-                "description": "Buy when RSI < 30, sell when RSI > 70",
-                "type": StrategyType.MEAN_REVERSION,
-                "indicators": ["RSI_14"],
-                "parameters": {
-                    "oversold": 30,
-                    "overbought": 70,
-                    "period": 14
-                }
-            },
-            {
-                "id": "macd_signal",
-                "name": "MACD Signal Cross",
-                "description": "Buy when MACD crosses above signal line, sell on opposite",
-                "type": StrategyType.MOMENTUM,
-                "indicators": ["MACD_12_26_9"],
-                "parameters": {
-                    "fast_period": 12,
-                    "slow_period": 26,
-                    "signal_period": 9
-                }
-            },
-            {
-                "id": "bollinger_breakout",
-                "name": "Bollinger Band Breakout",
-                "description": "Buy when price breaks above upper band, sell below lower band",
-                "type": StrategyType.BREAKOUT,
-                "indicators": ["BB_20_2.0"],
-                "parameters": {
-                    "period": 20,
-                    "std_dev": 2.0
-                }
-            }
-        ]
+        Get list of registered trading strategies
+        """
+        return [strategy.info for strategy in _registry.values()]
+    
+    @staticmethod
+    def get_strategy(strategy_id: str) -> Dict:
+        """
+        Info of a registered strategy, or ``StrategyNotFoundError``
+        """
+        strategy = _registry.get(strategy_id)
+        if strategy is None:
+            raise StrategyNotFoundError(f"Unknown strategy: {strategy_id}")
+        return strategy.info
+    
+    @staticmethod
+    def register_strategy(
+        info: Dict,
+        execute: Callable[..., Signal],
+        generate: Callable[..., SignalSeries],
+        arguments: Callable[[Dict], Tuple]
+    ):
+        """
+        Make a strategy available by ``info["id"]``. ``arguments(parameters)``
+        maps request parameters to the positional arguments passed to
+        ``execute(market_data, *arguments, indicator_cache)`` (latest signal)
+        and ``generate(...)`` (signal for every candle). Strategies are
+        streamed by ``/stream`` only once a live evaluator is registered with
+        ``LiveSignalService.register_evaluator``.
+        """
+        _registry[info["id"]] = RegisteredStrategy(info, execute, generate, arguments)
     
     @staticmethod
     def execute_ema_crossover(
-        market_data: MarketData,
+        market_data: Union[MarketData, OHLCVSeries],
         fast_period: int = 9,
-        slow_period: int = 21
+        slow_period: int = 21,
+        indicator_cache: Optional[IndicatorMemo] = None
     ) -> Signal:
         """
         Execute EMA Crossover strategy
         """
+        series = OHLCVSeries.coerce(market_data)
+        
         # Calculate EMAs
         fast_ema_config = IndicatorConfig(type=IndicatorType.EMA, period=fast_period)
         slow_ema_config = IndicatorConfig(type=IndicatorType.EMA, period=slow_period)
         
-        fast_ema = IndicatorService.calculate_indicator(market_data, fast_ema_config)
-        slow_ema = IndicatorService.calculate_indicator(market_data, slow_ema_config)
+        fast_ema = StrategyService._indicator_values(series, fast_ema_config, indicator_cache)
+        slow_ema = StrategyService._indicator_values(series, slow_ema_config, indicator_cache)
         
         # Get latest values
-        fast_val = fast_ema.values[-1]
-        slow_val = slow_ema.values[-1]
-        prev_fast = fast_ema.values[-2] if len(fast_ema.values) > 1 else fast_val
-        prev_slow = slow_ema.values[-2] if len(slow_ema.values) > 1 else slow_val
+        fast_val = float(fast_ema[-1])
+        slow_val = float(slow_ema[-1])
+        prev_fast = float(fast_ema[-2]) if len(fast_ema) > 1 else fast_val
+        prev_slow = float(slow_ema[-2]) if len(slow_ema) > 1 else slow_val
         
-        current_price = market_data.data[-1].close
+        current_price = float(series.close[-1])
         
         # Determine signal
         signal_type = SignalType.HOLD
@@ -109,8 +150,8 @@ class StrategyService:
         
         return Signal(
             id=str(uuid.uuid4()),
-            symbol=market_data.symbol,
-            timeframe=market_data.timeframe.value,
+            symbol=series.symbol,
+            timeframe=series.timeframe.value,
             signal_type=signal_type,
             strength=strength,
             confidence=round(confidence, 3),
@@ -124,20 +165,23 @@ class StrategyService:
     
     @staticmethod
     def execute_rsi_strategy(
-        market_data: MarketData,
+        market_data: Union[MarketData, OHLCVSeries],
         period: int = 14,
         oversold: float = 30,
-        overbought: float = 70
+        overbought: float = 70,
+        indicator_cache: Optional[IndicatorMemo] = None
     ) -> Signal:
         """
         Execute RSI Oversold/Overbought strategy
         """
+        series = OHLCVSeries.coerce(market_data)
+        
         # Calculate RSI
         rsi_config = IndicatorConfig(type=IndicatorType.RSI, period=period)
-        rsi = IndicatorService.calculate_indicator(market_data, rsi_config)
+        rsi = StrategyService._indicator_values(series, rsi_config, indicator_cache)
         
-        rsi_val = rsi.values[-1]
-        current_price = market_data.data[-1].close
+        rsi_val = float(rsi[-1])
+        current_price = float(series.close[-1])
         
         # Determine signal
         signal_type = SignalType.HOLD
@@ -156,8 +200,8 @@ class StrategyService:
         
         return Signal(
             id=str(uuid.uuid4()),
-            symbol=market_data.symbol,
-            timeframe=market_data.timeframe.value,
+            symbol=series.symbol,
+            timeframe=series.timeframe.value,
             signal_type=signal_type,
             strength=strength,
             confidence=round(confidence, 3),
@@ -169,30 +213,621 @@ class StrategyService:
         )
     
     @staticmethod
-    def execute_strategy(
-        strategy_id: str,
-        market_data: MarketData,
-        parameters: Dict = None
+    def execute_macd_signal(
+        market_data: Union[MarketData, OHLCVSeries],
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        indicator_cache: Optional[IndicatorMemo] = None
     ) -> Signal:
         """
-        Execute a strategy by ID
+        Execute MACD Signal Cross strategy
         """
-        params = parameters or {}
+        series = OHLCVSeries.coerce(market_data)
         
-        if strategy_id == "trend_follow_ema":
-            return StrategyService.execute_ema_crossover(
-                market_data,
-                params.get("fast_period", 9),
-                params.get("slow_period", 21)
-            )
-        
-        elif strategy_id == "rsi_oversold":
-            return StrategyService.execute_rsi_strategy(
-                market_data,
-                params.get("period", 14),
-                params.get("oversold", 30),
-                params.get("overbought", 70)
-            )
+        # Calculate MACD and its signal line
+        macd_config = IndicatorConfig(
+            type=IndicatorType.MACD,
+            params={"fast_period": fast_period, "slow_period": slow_period, "signal_period": signal_period}
+        )
+        lines = StrategyService._indicator_lines(series, macd_config, indicator_cache)
+        macd_line = lines["macd"]
+        signal_line = lines["signal"]
+        
+        # Get latest values
+        macd_val = float(macd_line[-1])
+        signal_val = float(signal_line[-1])
+        prev_macd = float(macd_line[-2]) if len(macd_line) > 1 else macd_val
+        prev_signal = float(signal_line[-2]) if len(signal_line) > 1 else signal_val
+        
+        current_price = float(series.close[-1])
+        
+        # Determine signal
+        signal_type = SignalType.HOLD
+        confidence = 0.5
+        strength = SignalStrength.WEAK
+        
+        # Bullish crossover
+        if prev_macd <= prev_signal and macd_val > signal_val:
+            signal_type = SignalType.BUY
+            diff_percent = ((macd_val - signal_val) / current_price) * 100
+            confidence = min(0.5 + (diff_percent * 10), 0.95)
+            strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+        
+        # Bearish crossover
+        elif prev_macd >= prev_signal and macd_val < signal_val:
+            signal_type = SignalType.SELL
+            diff_percent = ((signal_val - macd_val) / current_price) * 100
+            confidence = min(0.5 + (diff_percent * 10), 0.95)
+            strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
         
+        name = f"MACD_{fast_period}_{slow_period}_{signal_period}"
+        return Signal(
+            id=str(uuid.uuid4()),
+            symbol=series.symbol,
+            timeframe=series.timeframe.value,
+            signal_type=signal_type,
+            strength=strength,
+            confidence=round(confidence, 3),
+            price=current_price,
+            strategy_name="MACD Signal Cross",
+            indicators={
+                name: macd_val,
+                f"{name}_signal": signal_val,
+                f"{name}_histogram": float(lines["histogram"][-1])
+            }
+        )
+    
+    @staticmethod
+    def execute_bollinger_breakout(
+        market_data: Union[MarketData, OHLCVSeries],
+        period: int = 20,
+        std_dev: float = 2.0,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> Signal:
+        """
+        Execute Bollinger Band Breakout strategy
+        """
+        series = OHLCVSeries.coerce(market_data)
+        
+        # Calculate Bollinger Bands
+        bb_config = IndicatorConfig(type=IndicatorType.BOLLINGER_BANDS, period=period, params={"std_dev": std_dev})
+        lines = StrategyService._indicator_lines(series, bb_config, indicator_cache)
+        
+        upper = float(lines["upper"][-1])
+        middle = float(lines["middle"][-1])
+        lower = float(lines["lower"][-1])
+        current_price = float(series.close[-1])
+        
+        # Determine signal
+        signal_type = SignalType.HOLD
+        confidence = 0.5
+        strength = SignalStrength.WEAK
+        
+        # Bands are filled with 0 until period candles are available
+        if len(series) >= period:
+            if current_price > upper:
+                signal_type = SignalType.BUY
+                diff_percent = ((current_price - upper) / upper) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+            
+            elif current_price < lower:
+                signal_type = SignalType.SELL
+                diff_percent = ((lower - current_price) / lower) * 100
+                confidence = min(0.5 + (diff_percent * 10), 0.95)
+                strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+        
+        name = f"BB_{period}_{std_dev}"
+        return Signal(
+            id=str(uuid.uuid4()),
+            symbol=series.symbol,
+            timeframe=series.timeframe.value,
+            signal_type=signal_type,
+            strength=strength,
+            confidence=round(confidence, 3),
+            price=current_price,
+            strategy_name="Bollinger Band Breakout",
+            indicators={
+                f"{name}_upper": upper,
+                f"{name}_middle": middle,
+                f"{name}_lower": lower
+            }
+        )
+    
+    @staticmethod
+    def _indicator_values(
+        series: OHLCVSeries,
+        indicator_config: IndicatorConfig,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> np.ndarray:
+        """
+        Indicator values as an array, memoized in ``indicator_cache`` if given.
+        A memo dict must only be shared between calls on the same series;
+        an ``IndicatorCache`` is content-addressed and bounded. Without
+        either the process-wide cache is used.
+        """
+        lines = StrategyService._indicator_lines(series, indicator_config, indicator_cache)
+        return lines[INDICATOR_LINES[indicator_config.type][0]]
+    
+    @staticmethod
+    def _indicator_lines(
+        series: OHLCVSeries,
+        indicator_config: IndicatorConfig,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Every output line of an indicator as arrays, memoized like
+        ``_indicator_values``
+        """
+        if indicator_cache is None:
+            indicator_cache = shared_indicator_cache
+        if isinstance(indicator_cache, IndicatorCache):
+            return indicator_cache.calculate_lines(series, indicator_config)[1]
+        
+        key = (
+            indicator_config.type.value,
+            indicator_config.period,
+            tuple(sorted((indicator_config.params or {}).items()))
+        )
+        lines = indicator_cache.get(key)
+        if lines is None:
+            _, lines = IndicatorService.calculate_lines(series, indicator_config)
+            lines = {line: np.asarray(values, dtype=np.float64) for line, values in lines.items()}
+            indicator_cache[key] = lines
+        return lines
+    
+    @staticmethod
+    def _timeframe_indicator_lines(
+        series: OHLCVSeries,
+        timeframe: str,
+        indicator_config: IndicatorConfig,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        An indicator computed on ``series`` resampled to ``timeframe``, on the
+        base candles' index: each candle sees the value of the last bar
+        closed by then, NaN during the indicator's warm-up and before the
+        first closed bar. Memoized like ``_indicator_lines``.
+        """
+        key = (
+            timeframe,
+            indicator_config.type.value,
+            indicator_config.period,
+            tuple(sorted((indicator_config.params or {}).items()))
+        )
+        memo = indicator_cache if isinstance(indicator_cache, dict) else None
+        if memo is not None and key in memo:
+            return memo[key]
+        
+        bars, _ = ResampleService.resample(series, timeframe)
+        index = ResampleService.completed_index(series, bars)
+        # A memo dict belongs to ``series``, not its bars; a
+        # content-addressed cache serves any series
+        bars_cache = indicator_cache if memo is None else None
+        lines = IndicatorService.mask_warmup(
+            indicator_config,
+            StrategyService._indicator_lines(bars, indicator_config, bars_cache)
+        )
+        # Bars before the kernels' minimum length stay NaN, as they would on
+        # any shorter history
+        minimum = IndicatorService.minimum_length(indicator_config)
+        for values in lines.values():
+            values[:minimum - 1] = np.nan
+        lines = {line: align(values, index) for line, values in lines.items()}
+        if memo is not None:
+            memo[key] = lines
+        return lines
+    
+    @staticmethod
+    def generate_ema_crossover_signals(
+        market_data: Union[MarketData, OHLCVSeries],
+        fast_period: int = 9,
+        slow_period: int = 21,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> SignalSeries:
+        """
+        Generate EMA Crossover signals for every candle in one pass
+        """
+        series = OHLCVSeries.coerce(market_data)
+        fast_ema_config = IndicatorConfig(type=IndicatorType.EMA, period=fast_period)
+        slow_ema_config = IndicatorConfig(type=IndicatorType.EMA, period=slow_period)
+        
+        fast = StrategyService._indicator_values(series, fast_ema_config, indicator_cache)
+        slow = StrategyService._indicator_values(series, slow_ema_config, indicator_cache)
+        
+        # The first candle has no previous value and compares against itself
+        prev_fast = np.concatenate((fast[:1], fast[:-1]))
+        prev_slow = np.concatenate((slow[:1], slow[:-1]))
+        
+        # A slice shorter than either period yields NaN EMAs, i.e. HOLD
+        ready = np.arange(1, len(fast) + 1) >= max(fast_period, slow_period)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            buy = ready & (prev_fast <= prev_slow) & (fast > slow)
+            sell = ready & ~buy & (prev_fast >= prev_slow) & (fast < slow)
+            buy_confidence = np.minimum(0.5 + (((fast - slow) / slow) * 100) * 10, 0.95)
+            sell_confidence = np.minimum(0.5 + (((slow - fast) / fast) * 100) * 10, 0.95)
+        
+        signals = np.zeros(len(fast), dtype=np.int8)
+        signals[buy] = SignalSeries.BUY
+        signals[sell] = SignalSeries.SELL
+        confidence = np.where(buy, buy_confidence, np.where(sell, sell_confidence, 0.5))
+        
+        return SignalSeries(signals, confidence)
+    
+    @staticmethod
+    def generate_rsi_signals(
+        market_data: Union[MarketData, OHLCVSeries],
+        period: int = 14,
+        oversold: float = 30,
+        overbought: float = 70,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> SignalSeries:
+        """
+        Generate RSI Oversold/Overbought signals for every candle in one pass
+        """
+        series = OHLCVSeries.coerce(market_data)
+        rsi_config = IndicatorConfig(type=IndicatorType.RSI, period=period)
+        rsi = StrategyService._indicator_values(series, rsi_config, indicator_cache)
+        
+        # A slice of period candles or fewer yields NaN RSI, i.e. HOLD
+        ready = np.arange(1, len(rsi) + 1) >= period + 1
+        
+        buy = ready & (rsi < oversold)
+        sell = ready & ~buy & (rsi > overbought)
+        
+        signals = np.zeros(len(rsi), dtype=np.int8)
+        signals[buy] = SignalSeries.BUY
+        signals[sell] = SignalSeries.SELL
+        with np.errstate(divide="ignore", invalid="ignore"):
+            buy_confidence = 0.5 + ((oversold - rsi) / oversold) * 0.4
+            sell_confidence = 0.5 + ((rsi - overbought) / (100 - overbought)) * 0.4
+        confidence = np.where(buy, buy_confidence, np.where(sell, sell_confidence, 0.5))
+        
+        return SignalSeries(signals, confidence)
+    
+    @staticmethod
+    def generate_macd_signals(
+        market_data: Union[MarketData, OHLCVSeries],
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> SignalSeries:
+        """
+        Generate MACD Signal Cross signals for every candle in one pass
+        """
+        series = OHLCVSeries.coerce(market_data)
+        macd_config = IndicatorConfig(
+            type=IndicatorType.MACD,
+            params={"fast_period": fast_period, "slow_period": slow_period, "signal_period": signal_period}
+        )
+        lines = StrategyService._indicator_lines(series, macd_config, indicator_cache)
+        macd_line = lines["macd"]
+        signal_line = lines["signal"]
+        close = series.close
+        
+        # The first candle has no previous value and compares against itself
+        prev_macd = np.concatenate((macd_line[:1], macd_line[:-1]))
+        prev_signal = np.concatenate((signal_line[:1], signal_line[:-1]))
+        
+        # A slice shorter than the slow period yields all-zero lines, i.e. HOLD
+        ready = np.arange(1, len(macd_line) + 1) >= slow_period
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            buy = ready & (prev_macd <= prev_signal) & (macd_line > signal_line)
+            sell = ready & ~buy & (prev_macd >= prev_signal) & (macd_line < signal_line)
+            buy_confidence = np.minimum(0.5 + (((macd_line - signal_line) / close) * 100) * 10, 0.95)
+            sell_confidence = np.minimum(0.5 + (((signal_line - macd_line) / close) * 100) * 10, 0.95)
+        
+        signals = np.zeros(len(macd_line), dtype=np.int8)
+        signals[buy] = SignalSeries.BUY
+        signals[sell] = SignalSeries.SELL
+        confidence = np.where(buy, buy_confidence, np.where(sell, sell_confidence, 0.5))
+        
+        return SignalSeries(signals, confidence)
+    
+    @staticmethod
+    def generate_bollinger_breakout_signals(
+        market_data: Union[MarketData, OHLCVSeries],
+        period: int = 20,
+        std_dev: float = 2.0,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> SignalSeries:
+        """
+        Generate Bollinger Band Breakout signals for every candle in one pass
+        """
+        series = OHLCVSeries.coerce(market_data)
+        bb_config = IndicatorConfig(type=IndicatorType.BOLLINGER_BANDS, period=period, params={"std_dev": std_dev})
+        lines = StrategyService._indicator_lines(series, bb_config, indicator_cache)
+        upper = lines["upper"]
+        lower = lines["lower"]
+        close = series.close
+        
+        # A slice shorter than the period yields zero bands, i.e. HOLD
+        ready = np.arange(1, len(close) + 1) >= period
+        
+        buy = ready & (close > upper)
+        sell = ready & ~buy & (close < lower)
+        
+        signals = np.zeros(len(close), dtype=np.int8)
+        signals[buy] = SignalSeries.BUY
+        signals[sell] = SignalSeries.SELL
+        with np.errstate(divide="ignore", invalid="ignore"):
+            buy_confidence = np.minimum(0.5 + (((close - upper) / upper) * 100) * 10, 0.95)
+            sell_confidence = np.minimum(0.5 + (((lower - close) / lower) * 100) * 10, 0.95)
+        confidence = np.where(buy, buy_confidence, np.where(sell, sell_confidence, 0.5))
+        
+        return SignalSeries(signals, confidence)
+    
+    @staticmethod
+    def _rule_plan(rules: Dict) -> RulePlan:
+        if not isinstance(rules, dict) or not rules.get("buy") or not rules.get("sell"):
+            raise ValueError("Rule strategies need 'buy' and 'sell' rules")
+        unknown = set(rules) - {"buy", "sell", "confidence"}
+        if unknown:
+            raise ValueError(f"Unknown rules: {', '.join(sorted(unknown))}")
+        numbers = {"confidence": rules["confidence"]} if rules.get("confidence") else None
+        return compile_rules({"buy": rules["buy"], "sell": rules["sell"]}, numbers)
+    
+    @staticmethod
+    def compile_rule_strategy(config: StrategyConfig) -> Dict:
+        """
+        Check a rule strategy's config and describe it: the ``custom_rules``
+        parameters that run it (its parameters plus its rules), the
+        indicators it reads and the candles it needs before its first signal
+        """
+        parameters = {**config.parameters, "rules": config.rules}
+        plan = StrategyService._rule_plan(config.rules)
+        return {
+            "strategy_id": "custom_rules",
+            "parameters": parameters,
+            "indicators": [
+                (name if line == INDICATOR_LINES[IndicatorType(indicator_type)][0] else f"{name}_{line}")
+                + (f"@{timeframe}" if timeframe else "")
+                for name, indicator_type, _, _, line, timeframe in plan.indicators(parameters)
+            ],
+            "lookback": plan.lookback(parameters)
+        }
+    
+    @staticmethod
+    def _evaluate_rules(
+        series: OHLCVSeries,
+        rules: Dict,
+        parameters: Dict,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ):
+        """
+        Compiled ``buy``/``sell`` (and optional ``confidence``) rules evaluated
+        over the whole series, plus the indicator lines they read
+        """
+        plan = StrategyService._rule_plan(rules)
+        
+        def indicator_lines(indicator_type, period, params, timeframe):
+            config = IndicatorConfig(type=IndicatorType(indicator_type), period=period, params=params or None)
+            if timeframe:
+                return StrategyService._timeframe_indicator_lines(series, timeframe, config, indicator_cache)
+            return StrategyService._indicator_lines(series, config, indicator_cache)
+        
+        def timeframe_columns(timeframe):
+            aligned = ResampleService.aligned(series, timeframe)
+            return {name: getattr(aligned, name) for name in ("open", "high", "low", "close", "volume")}
+        
+        columns = {
+            "open": series.open,
+            "high": series.high,
+            "low": series.low,
+            "close": series.close,
+            "volume": series.volume,
+        }
+        return plan.evaluate(columns, parameters, indicator_lines, timeframe_columns)
+    
+    @staticmethod
+    def generate_rule_signals(
+        market_data: Union[MarketData, OHLCVSeries],
+        rules: Dict,
+        parameters: Dict = None,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> SignalSeries:
+        """
+        Generate rule strategy signals for every candle in one pass.
+
+        ``rules`` holds ``buy`` and ``sell`` condition expressions and an
+        optional ``confidence`` expression (see ``utils.strategy_rules``);
+        names in them that are not price columns are read from
+        ``parameters``. BUY wins when both conditions hold.
+        """
+        series = OHLCVSeries.coerce(market_data)
+        outputs, _ = StrategyService._evaluate_rules(series, rules, parameters or {}, indicator_cache)
+        return StrategyService._rule_signal_series(outputs)
+    
+    @staticmethod
+    def _rule_signal_series(outputs: Dict[str, np.ndarray]) -> SignalSeries:
+        buy = outputs["buy"]
+        sell = ~buy & outputs["sell"]
+        
+        signals = np.zeros(len(buy), dtype=np.int8)
+        signals[buy] = SignalSeries.BUY
+        signals[sell] = SignalSeries.SELL
+        confidence = np.full(len(buy), 0.5)
+        if "confidence" in outputs:
+            active = buy | sell
+            confidence[active] = np.clip(np.nan_to_num(outputs["confidence"][active], nan=0.5), 0.0, 1.0)
+        
+        return SignalSeries(signals, confidence)
+    
+    @staticmethod
+    def execute_rule_strategy(
+        market_data: Union[MarketData, OHLCVSeries],
+        rules: Dict,
+        parameters: Dict = None,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> Signal:
+        """
+        Execute a rule strategy: the last candle of ``generate_rule_signals``
+        """
+        series = OHLCVSeries.coerce(market_data)
+        outputs, indicators = StrategyService._evaluate_rules(series, rules, parameters or {}, indicator_cache)
+        signal_series = StrategyService._rule_signal_series(outputs)
+        
+        signal_type = signal_series.signal_type(-1)
+        confidence = float(signal_series.confidence[-1])
+        if signal_type == SignalType.HOLD:
+            strength = SignalStrength.WEAK
         else:
-            raise ValueError(f"Unknown strategy: {strategy_id}")
+            strength = SignalStrength.STRONG if confidence > 0.8 else SignalStrength.MODERATE
+        
+        return Signal(
+            id=str(uuid.uuid4()),
+            symbol=series.symbol,
+            timeframe=series.timeframe.value,
+            signal_type=signal_type,
+            strength=strength,
+            confidence=round(confidence, 3),
+            price=float(series.close[-1]),
+            strategy_name="Rule Strategy",
+            indicators={name: float(values[-1]) for name, values in indicators.items()}
+        )
+    
+    @staticmethod
+    def generate_signals(
+        strategy_id: str,
+        market_data: Union[MarketData, OHLCVSeries],
+        parameters: Dict = None,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> SignalSeries:
+        """
+        Generate a strategy's signal for every candle by ID
+        """
+        strategy = _registry.get(strategy_id)
+        if strategy is None:
+            raise StrategyNotFoundError(f"Unknown strategy: {strategy_id}")
+        
+        params = parameters or {}
+        market_data = OHLCVSeries.coerce(market_data)
+        return strategy.generate(market_data, *strategy.arguments(params), indicator_cache)
+    
+    @staticmethod
+    def execute_strategy(
+        strategy_id: str,
+        market_data: Union[MarketData, OHLCVSeries],
+        parameters: Dict = None,
+        indicator_cache: Optional[IndicatorMemo] = None
+    ) -> Signal:
+        """
+        Execute a strategy by ID. ``indicator_cache`` lets strategies run on
+        the same series share indicator values.
+        """
+        strategy = _registry.get(strategy_id)
+        if strategy is None:
+            raise StrategyNotFoundError(f"Unknown strategy: {strategy_id}")
+        
+        params = parameters or {}
+        market_data = OHLCVSeries.coerce(market_data)
+        return strategy.execute(market_data, *strategy.arguments(params), indicator_cache)
+
+
+# Built-in strategies
+StrategyService.register_strategy(
+    {
+        "id": "trend_follow_ema",
+        "name": "EMA Crossover",
+        "description": "Buy when fast EMA crosses above slow EMA, sell on opposite",
+        "type": StrategyType.TREND_FOLLOWING,
+        "indicators": ["EMA_9", "EMA_21"],
+        "parameters": {
+            "fast_period": 9,
+            "slow_period": 21
+        }
+    },
+    StrategyService.execute_ema_crossover,
+    StrategyService.generate_ema_crossover_signals,
+    lambda params: (params.get("fast_period", 9), params.get("slow_period", 21))
+)
+
+StrategyService.register_strategy(
+    {
+        "id": "rsi_oversold",
+        "name": "RSI Oversold/Overbought",
+        "description": "Buy when RSI < 30, sell when RSI > 70",
+        "type": StrategyType.MEAN_REVERSION,
+        "indicators": ["RSI_14"],
+        "parameters": {
+            "oversold": 30,
+            "overbought": 70,
+            "period": 14
+        }
+    },
+    StrategyService.execute_rsi_strategy,
+    StrategyService.generate_rsi_signals,
+    lambda params: (
+        params.get("period", 14),
+        params.get("oversold", 30),
+        params.get("overbought", 70)
+    )
+)
+
+StrategyService.register_strategy(
+    {
+        "id": "macd_signal",
+        "name": "MACD Signal Cross",
+        "description": "Buy when MACD crosses above signal line, sell on opposite",
+        "type": StrategyType.MOMENTUM,
+        "indicators": ["MACD_12_26_9"],
+        "parameters": {
+            "fast_period": 12,
+            "slow_period": 26,
+            "signal_period": 9
+        }
+    },
+    StrategyService.execute_macd_signal,
+    StrategyService.generate_macd_signals,
+    lambda params: (
+        params.get("fast_period", 12),
+        params.get("slow_period", 26),
+        params.get("signal_period", 9)
+    )
+)
+
+StrategyService.register_strategy(
+    {
+        "id": "bollinger_breakout",
+        "name": "Bollinger Band Breakout",
+        "description": "Buy when price breaks above upper band, sell below lower band",
+        "type": StrategyType.BREAKOUT,
+        "indicators": ["BB_20_2.0"],
+        "parameters": {
+            "period": 20,
+            "std_dev": 2.0
+        }
+    },
+    StrategyService.execute_bollinger_breakout,
+    StrategyService.generate_bollinger_breakout_signals,
+    lambda params: (params.get("period", 20), params.get("std_dev", 2.0))
+)
+
+StrategyService.register_strategy(
+    {
+        "id": "custom_rules",
+        "name": "Rule Strategy",
+        "description": "Buy and sell when the rule expressions in parameters.rules hold",
+        "type": StrategyType.CUSTOM,
+        "indicators": [],
+        "parameters": {
+            "rules": {
+                "buy": "crosses_above(EMA(fast), EMA(slow)) and RSI(14) < 70",
+                "sell": "crosses_below(EMA(fast), EMA(slow))"
+            },
+            "fast": 9,
+            "slow": 21
+        }
+    },
+    StrategyService.execute_rule_strategy,
+    StrategyService.generate_rule_signals,
+    # Parameters left out of a request fall back to the registered defaults
+    lambda params: (
+        params.get("rules") or _registry["custom_rules"].info["parameters"]["rules"],
+        {**_registry["custom_rules"].info["parameters"], **params}
+    )
+)
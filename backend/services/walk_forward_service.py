@@ -0,0 +1,301 @@
+"""Walk-Forward Service - Out-of-sample validation of optimized strategy parameters"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from models.execution import ExecutionModel
+from models.market_data import MarketData
+from models.ohlcv_series import OHLCVSeries
+from services.backtest_service import BacktestService
+from services.compute_executor import compute_executor
+from services.indicator_cache import IndicatorCache
+from services.optimizer_service import (
+    OptimizerService,
+    RANKABLE_METRICS,
+    _share_series,
+    _init_worker,
+)
+from services import optimizer_service
+from services.strategy_service import IndicatorMemo
+from utils.fill_simulator import EXIT_END, simulate_fills
+from utils.risk_metrics import risk_metrics
+
+# Per-process signal arrays of each parameter combination over the full
+# series, reused by every fold the worker evaluates
+_worker_signals = {}
+
+
+def _init_fold_worker(shm_name: str, n: int, symbol: str, timeframe: str):
+    _init_worker(shm_name, n, symbol, timeframe)
+    _worker_signals.clear()
+
+
+def build_folds(n: int, train_size: int, test_size: int, anchored: bool = False) -> List[Tuple[int, int, int]]:
+    """
+    (train start, test start, test stop) candle indices of every fold. Test
+    windows tile the series after the first training window; training
+    windows slide with them, or all start at 0 when ``anchored``.
+    """
+    if train_size < 1 or test_size < 1:
+        raise ValueError("train_size and test_size must be positive")
+    folds = []
+    test_start = train_size
+    while test_start + test_size <= n:
+        train_start = 0 if anchored else test_start - train_size
+        folds.append((train_start, test_start, test_start + test_size))
+        test_start += test_size
+    if not folds:
+        raise ValueError(
+            f"{n} candles do not fit one fold of {train_size} training and {test_size} test candles"
+        )
+    return folds
+
+
+def _window(signals: Tuple[np.ndarray, np.ndarray, np.ndarray], start: int, stop: int):
+    """
+    The signals in candles [start, stop), indexed from ``start``
+    """
+    index, side, confidence = signals
+    lo, hi = np.searchsorted(index, (start, stop))
+    return index[lo:hi] - start, side[lo:hi], confidence[lo:hi]
+
+
+def _evaluate_folds(
+    strategy_id: str,
+    series: OHLCVSeries,
+    folds: List[Tuple[int, int, int, int]],
+    combinations: List[Dict],
+    rank_by: str,
+    initial_capital: float,
+    position_size: float,
+    execution: Optional[ExecutionModel],
+    top_n: Optional[int],
+    indicator_cache: IndicatorMemo,
+    signal_cache: Dict
+) -> List[Dict]:
+    """
+    Backtest every combination on each fold's training window, then the
+    best one on its test window. Signals of a combination are computed
+    once over the whole series and windowed per fold.
+    """
+    def signals_of(number: int):
+        signals = signal_cache.get(number)
+        if signals is None:
+            signals = BacktestService.signal_arrays(
+                strategy_id, series, combinations[number], indicator_cache=indicator_cache
+            )
+            signal_cache[number] = signals
+        return signals
+
+    def backtest(signals, start: int, stop: int) -> Dict:
+        result = BacktestService.backtest_signals(
+            strategy_id, series[start:stop], *_window(signals, start, stop),
+            initial_capital=initial_capital,
+            position_size=position_size,
+            execution=execution
+        )
+        for key in ("strategy_id", "symbol", "timeframe", "trades"):
+            del result[key]
+        return result
+
+    reports = []
+    for number, train_start, test_start, test_stop in folds:
+        rows = []
+        for combination, parameters in enumerate(combinations):
+            result = backtest(signals_of(combination), train_start, test_start)
+            rows.append({"combination": combination, "parameters": parameters, **{
+                metric: result[metric] for metric in RANKABLE_METRICS
+            }})
+        # Stable: ties go to the earlier combination in grid order
+        rows.sort(key=lambda row: row[rank_by], reverse=True)
+        best = rows[0]
+
+        test_signals = _window(signals_of(best["combination"]), test_start, test_stop)
+        test = backtest(signals_of(best["combination"]), test_start, test_stop)
+        reports.append({
+            "fold": number,
+            "train": {"start": train_start, "stop": test_start, "results": rows[:top_n] if top_n else rows},
+            "test": {"start": test_start, "stop": test_stop, **test},
+            "parameters": best["parameters"],
+            "test_signals": test_signals,
+        })
+    return reports
+
+
+def _evaluate_folds_in_worker(
+    strategy_id: str,
+    folds: List[Tuple[int, int, int, int]],
+    combinations: List[Dict],
+    rank_by: str,
+    initial_capital: float,
+    position_size: float,
+    execution: Optional[ExecutionModel],
+    top_n: Optional[int]
+) -> List[Dict]:
+    return _evaluate_folds(
+        strategy_id, optimizer_service._worker_series, folds, combinations, rank_by,
+        initial_capital, position_size, execution, top_n,
+        optimizer_service._worker_indicator_cache, _worker_signals
+    )
+
+
+class WalkForwardService:
+    @staticmethod
+    def run_walk_forward(
+        strategy_id: str,
+        market_data: Union[MarketData, OHLCVSeries],
+        parameter_grid: Dict[str, List[Any]],
+        train_size: int,
+        test_size: int,
+        anchored: bool = False,
+        method: str = "grid",
+        max_evaluations: Optional[int] = None,
+        seed: Optional[int] = None,
+        rank_by: str = "roi_percent",
+        initial_capital: float = 10000.0,
+        position_size: float = 0.1,
+        base_parameters: Optional[Dict] = None,
+        max_workers: Optional[int] = None,
+        top_n: Optional[int] = None,
+        execution: Optional[ExecutionModel] = None,
+        include_details: bool = False
+    ) -> Dict:
+        """
+        Optimize on each training window, test the winner on the next
+        ``test_size`` candles, and roll forward (see ``build_folds``).
+
+        Folds are spread over a process pool whose workers read the series
+        from shared memory. The pool is one of the compute executor's worker
+        pools (see ``ComputeExecutor.worker_pool``): when they are all busy
+        the run fails with ``ComputeSaturatedError``. A strategy's signal at
+        a candle depends only on the candles up to it, so each worker
+        computes a combination's signals (and the indicators behind them,
+        memoized across combinations) once over the whole series and windows
+        them for every fold: windows share the computation of their common
+        history, and every window starts with that history as its warm-up.
+
+        Each fold reports its training ranking and the test backtest of the
+        chosen parameters. The stitched out-of-sample report chains the test
+        windows, each starting with the capital the previous one ended with
+        and closing its positions at its end.
+        """
+        if rank_by not in RANKABLE_METRICS:
+            raise ValueError(f"Cannot rank by: {rank_by}")
+
+        series = OHLCVSeries.coerce(market_data)
+        combinations = OptimizerService.build_combinations(
+            parameter_grid, method, max_evaluations, seed, base_parameters
+        )
+        folds = [
+            (number, *fold)
+            for number, fold in enumerate(build_folds(len(series), train_size, test_size, anchored))
+        ]
+        workers = compute_executor.worker_count(max_workers, len(folds))
+        arguments = (combinations, rank_by, initial_capital, position_size, execution, top_n)
+
+        if workers == 1:
+            reports = _evaluate_folds(strategy_id, series, folds, *arguments, IndicatorCache.from_env(), {})
+        else:
+            # Interleaved so every worker gets early and late folds alike
+            shares = [folds[worker::workers] for worker in range(workers)]
+            shm = _share_series(series)
+            try:
+                with compute_executor.worker_pool(
+                    workers,
+                    initializer=_init_fold_worker,
+                    initargs=(shm.name, len(series), series.symbol, series.timeframe.value)
+                ) as pool:
+                    futures = [
+                        pool.submit(_evaluate_folds_in_worker, strategy_id, share, *arguments)
+                        for share in shares
+                    ]
+                    reports = [report for future in futures for report in future.result()]
+            finally:
+                shm.close()
+                shm.unlink()
+        reports.sort(key=lambda report: report["fold"])
+
+        for report in reports:
+            for window in ("train", "test"):
+                fields = report[window]
+                start, stop = fields.pop("start"), fields.pop("stop")
+                report[window] = {
+                    "start": series.datetime_at(start),
+                    "end": series.datetime_at(stop - 1),
+                    "candles": stop - start,
+                    **fields
+                }
+
+        return {
+            "strategy_id": strategy_id,
+            "symbol": series.symbol,
+            "timeframe": series.timeframe.value,
+            "method": method,
+            "rank_by": rank_by,
+            "anchored": anchored,
+            "combinations": len(combinations),
+            "workers": workers,
+            "folds": [{key: value for key, value in report.items() if key != "test_signals"} for report in reports],
+            "out_of_sample": WalkForwardService._stitch(
+                strategy_id, series, folds, reports,
+                initial_capital, position_size, execution, include_details
+            ),
+        }
+
+    @staticmethod
+    def _stitch(
+        strategy_id: str,
+        series: OHLCVSeries,
+        folds: List[Tuple[int, int, int, int]],
+        reports: List[Dict],
+        initial_capital: float,
+        position_size: float,
+        execution: Optional[ExecutionModel],
+        include_details: bool
+    ) -> Dict:
+        """
+        The test windows run back to back with the capital carried over
+        """
+        capital = initial_capital
+        profits = []
+        fills_list = []
+        orders = []
+        equity = []
+        open_lots = []
+        detailed = execution is not None
+        for (_, _, test_start, test_stop), report in zip(folds, reports):
+            window = series[test_start:test_stop]
+            fills = simulate_fills(
+                window.open, window.high, window.low, window.close,
+                *report["test_signals"],
+                initial_capital=capital,
+                position_size=position_size,
+                execution=execution
+            )
+            profits += fills.profit.tolist()
+            fills_list.append(fills)
+            orders += [
+                (index + test_start, *order)
+                for index, *order in fills.orders
+                if detailed or order[6] != EXIT_END
+            ]
+            window_equity, window_lots = BacktestService._equity(window, capital, fills)
+            equity.append(window_equity)
+            open_lots.append(window_lots)
+            capital = fills.final_capital
+
+        first, last = folds[0][2], folds[-1][3]
+        equity = np.concatenate(equity)
+        stitched = {
+            "start": series.datetime_at(first),
+            "end": series.datetime_at(last - 1),
+            "candles": last - first,
+            **BacktestService._summary(initial_capital, capital, profits),
+            **risk_metrics(
+                equity, np.concatenate(open_lots) > 0, BacktestService._periods_per_year(series)
+            ),
+            "trades": BacktestService._trade_log(series, orders if include_details else orders[-10:], detailed),
+        }
+        if detailed:
+            stitched.update(BacktestService._execution_summary(fills_list))
+        if include_details:
+            stitched["equity_curve"] = BacktestService._equity_curve(series[first:last], equity)
+        return stitched
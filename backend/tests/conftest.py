@@ -0,0 +1,64 @@
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from models.ohlcv_series import OHLCVSeries
+from routes import market_router, indicators_router, strategies_router, backtest_router
+from services import compute_executor as compute_executor_module
+from services.market_service import MarketService
+from services.market_data_store import MarketDataStore
+from services.backtest_job_service import BacktestJobService
+from services.indicator_cache import indicator_cache
+from utils.json_codec import FastJSONResponse
+
+
+def mock_series(num_candles: int, seed: int = 7, volatility: float = 0.01) -> OHLCVSeries:
+    """
+    Reproducible mock candles starting at a fixed time
+    """
+    return MarketService.generate_mock_series(
+        "TEST",
+        num_candles=num_candles,
+        volatility=volatility,
+        seed=seed,
+        start=datetime(2024, 1, 1)
+    )
+
+
+@pytest.fixture
+def series() -> OHLCVSeries:
+    return mock_series(600)
+
+
+@pytest.fixture(autouse=True)
+def clear_indicator_cache():
+    # Tests must not see each other's cached indicator values
+    indicator_cache.clear()
+    yield
+    indicator_cache.clear()
+
+
+@pytest.fixture
+def four_cpus(monkeypatch):
+    # Lets tests ask for several workers on a single-CPU machine
+    monkeypatch.setattr(compute_executor_module.os, "cpu_count", lambda: 4)
+
+
+@pytest.fixture
+def database():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient()["test"]
+
+
+@pytest.fixture
+def client(database):
+    """
+    The API routers over an in-memory MongoDB
+    """
+    app = FastAPI(default_response_class=FastJSONResponse)
+    for router in (market_router, indicators_router, strategies_router, backtest_router):
+        app.include_router(router, prefix="/api")
+    app.state.market_store = MarketDataStore(database)
+    app.state.backtest_jobs = BacktestJobService(database)
+    with TestClient(app) as client:
+        yield client
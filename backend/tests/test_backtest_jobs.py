@@ -0,0 +1,148 @@
+"""Backtest jobs: submission, dedupe, status and paging"""
+import asyncio
+import time
+from datetime import timedelta, timezone
+import pytest
+from models.market_data import MarketData
+from services import backtest_job_service
+from services.backtest_service import BacktestService
+from tests.conftest import mock_series
+
+JOB = {"strategy_id": "rsi_oversold", "parameters": {"period": 7, "oversold": 40, "overbought": 60}}
+
+
+@pytest.fixture(scope="module")
+def market_data():
+    return mock_series(500, volatility=0.02).to_market_data().model_dump(mode="json")
+
+
+@pytest.fixture
+def inline_process(monkeypatch):
+    """
+    Run process-pool jobs in the calling thread, optionally failing them
+    """
+    failures = []
+
+    async def run_process(fn, *args, timeout=None, **kwargs):
+        if failures:
+            raise failures.pop(0)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(backtest_job_service.compute_executor, "run_process", run_process)
+    # Several chunks per job, so pages cross chunk boundaries
+    monkeypatch.setattr(backtest_job_service, "CHUNK_SIZE", 7)
+    return failures
+
+
+@pytest.fixture
+def jobs(client, inline_process):
+    service = client.app.state.backtest_jobs
+    asyncio.run(service.ensure_indexes())
+    return service
+
+
+def _submit(client, market_data, **body):
+    response = client.post("/api/backtest/jobs", json={**JOB, "market_data": market_data, **body})
+    assert response.status_code == 200, response.json()
+    return response.json()
+
+
+def _wait(client, job_id):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/backtest/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_runs_to_completion(client, jobs, market_data):
+    submitted = _submit(client, market_data)
+    assert submitted["status"] == "queued"
+    assert submitted["deduplicated"] is False
+
+    job = _wait(client, submitted["job_id"])
+    assert job["status"] == "completed"
+    assert job["progress"] == 1.0
+    assert "dedupe_key" not in job
+    direct = BacktestService.run_backtest(
+        JOB["strategy_id"], mock_series(500, volatility=0.02), parameters=JOB["parameters"], include_details=True
+    )
+    assert job["result"]["final_capital"] == direct["final_capital"]
+    assert job["trade_count"] == len(direct["trades"]) > 7
+    assert job["equity_points"] == 500
+
+
+def test_trades_and_equity_pages(client, jobs, market_data):
+    job = _wait(client, _submit(client, market_data)["job_id"])
+    job_id = job["id"]
+
+    trades = []
+    while len(trades) < job["trade_count"]:
+        page = client.get(f"/api/backtest/jobs/{job_id}/trades", params={"offset": len(trades), "limit": 5}).json()
+        assert page["total"] == job["trade_count"]
+        trades += page["items"]
+    direct = BacktestService.run_backtest(
+        JOB["strategy_id"], mock_series(500, volatility=0.02), parameters=JOB["parameters"], include_details=True
+    )
+    assert [trade["price"] for trade in trades] == [trade["price"] for trade in direct["trades"]]
+    assert trades[0]["timestamp"] == direct["trades"][0]["timestamp"].isoformat()
+
+    page = client.get(f"/api/backtest/jobs/{job_id}/equity", params={"offset": 495, "limit": 100}).json()
+    assert page["total"] == 500
+    assert page["equity"] == direct["equity_curve"]["equity"][495:]
+    assert len(page["timestamp"]) == 5
+    past_end = client.get(f"/api/backtest/jobs/{job_id}/trades", params={"offset": 10000}).json()
+    assert past_end["items"] == []
+
+
+def test_identical_submissions_are_deduplicated(client, jobs, market_data):
+    first = _submit(client, market_data)
+    second = _submit(client, market_data)
+    assert second == {"job_id": first["job_id"], "status": second["status"], "deduplicated": True}
+    other = _submit(client, market_data, position_size=0.2)
+    assert other["job_id"] != first["job_id"]
+
+
+def test_dedupe_relies_on_a_sparse_unique_index(jobs):
+    indexes = asyncio.run(jobs.db.backtest_jobs.index_information())
+    dedupe = next(index for index in indexes.values() if index["key"] == [("dedupe_key", 1)])
+    assert dedupe["unique"] and dedupe["sparse"]
+
+
+def test_failed_job_can_be_resubmitted(client, jobs, market_data, inline_process):
+    inline_process.append(RuntimeError("worker died"))
+    failed = _wait(client, _submit(client, market_data)["job_id"])
+    assert failed["status"] == "failed"
+    assert failed["error"] == "worker died"
+
+    retried = _submit(client, market_data)
+    assert retried["deduplicated"] is False
+    assert _wait(client, retried["job_id"])["status"] == "completed"
+
+
+def test_unknown_strategy_is_rejected_before_queueing(client, jobs, market_data):
+    response = client.post("/api/backtest/jobs", json={**JOB, "strategy_id": "nope", "market_data": market_data})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown strategy: nope"
+    assert asyncio.run(jobs.db.backtest_jobs.count_documents({})) == 0
+
+
+@pytest.mark.parametrize("path", ["", "/trades", "/equity"])
+def test_unknown_job_is_404(client, jobs, path):
+    assert client.get(f"/api/backtest/jobs/missing{path}").status_code == 404
+
+
+@pytest.mark.filterwarnings("error::UserWarning")
+def test_equity_columns_of_an_aware_series(client, jobs, market_data):
+    aware = MarketData.model_validate(market_data)
+    tz = timezone(timedelta(hours=-5))
+    for candle in aware.data:
+        candle.timestamp = candle.timestamp.replace(tzinfo=timezone.utc).astimezone(tz)
+    job = _wait(client, _submit(client, aware.model_dump(mode="json"))["job_id"])
+    assert job["status"] == "completed"
+    page = client.get(f"/api/backtest/jobs/{job['id']}/equity", params={"limit": 3}).json()
+    assert page["timestamp"][0].endswith("-05:00")
+    columns = client.get(f"/api/backtest/jobs/{job['id']}/equity", params={"format": "json", "limit": 3}).json()
+    assert columns["t"] == (mock_series(3).timestamp // 1_000_000).tolist()
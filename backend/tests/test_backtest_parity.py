@@ -0,0 +1,61 @@
+"""Vectorized backtests against the per-candle reference loop"""
+from datetime import timedelta, timezone
+import pytest
+from models.market_data import MarketData
+from models.ohlcv_series import OHLCVSeries
+from services.backtest_service import BacktestService
+from services.strategy_service import StrategyService
+from tests.conftest import mock_series
+
+STRATEGIES = StrategyService.get_predefined_strategies()
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES, ids=[strategy["id"] for strategy in STRATEGIES])
+def test_vectorized_matches_per_candle(series, strategy):
+    results = [
+        BacktestService.run_backtest(
+            strategy["id"], series, parameters=strategy["parameters"], vectorized=vectorized, include_details=True
+        )
+        for vectorized in (True, False)
+    ]
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_signals_match_per_candle(seed):
+    series = mock_series(400, seed=seed, volatility=0.02)
+    for strategy in STRATEGIES:
+        vectorized = BacktestService.signal_arrays(strategy["id"], series, strategy["parameters"], vectorized=True)
+        per_candle = BacktestService.signal_arrays(strategy["id"], series, strategy["parameters"], vectorized=False)
+        for fast, slow in zip(vectorized, per_candle):
+            assert fast.tolist() == slow.tolist(), strategy["id"]
+
+
+def test_parameters_change_signals(series):
+    default = BacktestService.signal_arrays("rsi_oversold", series, {"period": 14})
+    tight = BacktestService.signal_arrays("rsi_oversold", series, {"period": 14, "oversold": 45, "overbought": 55})
+    assert len(tight[0]) > len(default[0])
+
+
+def test_short_series_has_no_trades():
+    result = BacktestService.run_backtest("trend_follow_ema", mock_series(15), vectorized=True)
+    assert result["total_trades"] == 0
+    assert result["final_capital"] == result["initial_capital"]
+
+
+@pytest.mark.parametrize("tz", [timezone.utc, timezone(timedelta(hours=2))])
+def test_aware_timestamps_are_returned_in_their_zone(series, tz):
+    market_data = series.to_market_data()
+    for candle in market_data.data:
+        candle.timestamp = candle.timestamp.replace(tzinfo=timezone.utc).astimezone(tz)
+    aware = OHLCVSeries.from_market_data(MarketData.model_validate(market_data.model_dump()))
+    assert aware.to_market_data().data == market_data.data
+    assert aware.content_hash() != series.content_hash()
+
+    result = BacktestService.run_backtest("rsi_oversold", aware, include_details=True)
+    naive = BacktestService.run_backtest("rsi_oversold", series, include_details=True)
+    assert result["trades"]
+    for trade, naive_trade in zip(result["trades"], naive["trades"]):
+        assert trade["timestamp"].tzinfo == tz
+        assert trade["timestamp"] == naive_trade["timestamp"].replace(tzinfo=timezone.utc)
+    assert result["equity_curve"]["timestamp"][0] == market_data.data[0].timestamp
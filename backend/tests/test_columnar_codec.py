@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.columnar_codec import CSVColumnParser, _parse_timestamps
+
+NS = 1_700_000_000_123_456_789
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1_700_000_000, 1_700_000_000 * 10**9),
+    (1_700_000_000_123, 1_700_000_000_123 * 10**6),
+    (1_700_000_000_123_456, 1_700_000_000_123_456 * 10**3),
+    (NS, NS),
+])
+def test_integer_epochs_are_exact(value, expected):
+    parsed = _parse_timestamps(pd.Series([value, value + 1]))
+    assert parsed.dtype == np.int64
+    assert parsed[0] == expected
+    assert parsed[1] - parsed[0] == expected // value
+
+
+def test_fractional_epoch_seconds():
+    parsed = _parse_timestamps(pd.Series([1_700_000_000.25, 1_700_000_000.5]))
+    np.testing.assert_array_equal(parsed, [1_700_000_000_250_000_000, 1_700_000_000_500_000_000])
+
+
+def test_iso_timestamps():
+    parsed = _parse_timestamps(pd.Series(["2024-01-01T00:00:00Z", "2024-01-01T00:05:00.000000001Z"]))
+    start = np.datetime64("2024-01-01T00:00:00", "ns").astype(np.int64)
+    np.testing.assert_array_equal(parsed, [start, start + 300 * 10**9 + 1])
+
+
+def test_csv_parser_keeps_nanosecond_epochs_across_blocks():
+    rows = [f"{NS + i},1,2,0.5,1.5,10" for i in range(500)]
+    payload = ("timestamp,open,high,low,close,volume\n" + "\n".join(rows)).encode()
+    parser = CSVColumnParser(block_bytes=1024)
+    for start in range(0, len(payload), 300):
+        parser.feed(payload[start:start + 300])
+    columns = parser.finish()
+    np.testing.assert_array_equal(columns["timestamp"], NS + np.arange(500))
+    np.testing.assert_array_equal(columns["close"], np.full(500, 1.5))
+
+
+def test_csv_import_route(client):
+    start = 1_704_067_200_000  # 2024-01-01 in milliseconds
+    rows = [f"{start + i * 300_000},1,2,0.5,1.5,10" for i in range(20)]
+    body = "timestamp,open,high,low,close,volume\n" + "\n".join(rows)
+    response = client.post(
+        "/api/market/ohlcv/import",
+        params={"symbol": "TEST", "timeframe": "5m"},
+        content=body,
+        headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    assert response.json()["candles"] == 20
+    exported = client.get("/api/market/ohlcv", params={"symbol": "TEST", "timeframe": "5m"}).json()
+    assert exported["data"][0]["timestamp"].startswith("2024-01-01T00:00:00")
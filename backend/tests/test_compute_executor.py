@@ -0,0 +1,63 @@
+"""Bounded compute pools: admission and recovery"""
+import asyncio
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from services.compute_executor import ComputeExecutor, ComputeSaturatedError
+
+
+def _square(x):
+    return x * x
+
+
+def _die():
+    # Like a worker killed by the OOM killer
+    os._exit(1)
+
+
+@pytest.fixture
+def executor():
+    executor = ComputeExecutor(thread_workers=1, process_workers=1, max_pending=2, timeout=60)
+    yield executor
+    executor.shutdown()
+
+
+def test_jobs_after_a_dead_worker_run_in_a_new_pool(executor):
+    async def run():
+        assert await executor.run_process(_square, 3) == 9
+        with pytest.raises(BrokenProcessPool):
+            await executor.run_process(_die)
+        return [await executor.run_process(_square, x) for x in range(3)]
+
+    assert asyncio.run(run()) == [0, 1, 4]
+    assert executor.stats()["process_pending"] == 0
+
+
+def test_pool_broken_while_idle_is_replaced_on_submit(executor):
+    async def run():
+        await executor.run_process(_square, 2)
+        # Break the pool behind the executor's back, as a crash between jobs would
+        broken = executor._processes._executor
+        broken._broken = "A worker died"
+        return await executor.run_process(_square, 5), broken
+
+    result, broken = asyncio.run(run())
+    assert result == 25
+    assert executor._processes._executor is not broken
+    broken.shutdown(wait=True)
+
+
+def test_saturated_pool_rejects_and_frees_slots(executor):
+    release = threading.Event()
+
+    async def run():
+        blocked = [asyncio.ensure_future(executor.run_thread(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ComputeSaturatedError):
+            await executor.run_thread(_square, 9)
+        release.set()
+        await asyncio.gather(*blocked)
+        return await executor.run_thread(_square, 9)
+
+    assert asyncio.run(run()) == 81
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services.backtest_service import BacktestService
+from services.indicator_cache import indicator_cache
+from services.indicator_service import IndicatorService
+from services.strategy_service import StrategyService
+from utils import fast_indicators, technical_indicators
+from tests.conftest import mock_series
+
+LARGE = 5000
+
+# pandas' rolling variance drifts by about eps * price**2, so its standard
+# deviation of a (nearly) flat window is only good to about sqrt(eps) * price
+STD_TOLERANCE = 4 * np.sqrt(np.finfo(np.float64).eps)
+
+
+def _prices(n, seed=3, flat=False, nans=0):
+    """
+    High, low and close columns of a random walk; ``flat`` holds runs of
+    unchanged prices and ``nans`` leads with missing values
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    if flat and n:
+        for start in range(0, n, 97):
+            close[start + 20:start + 60] = close[min(start + 20, n - 1)]
+    spread = 0 if flat else 0.5
+    high = close + np.abs(rng.normal(0, 0.5, n)) + spread
+    low = close - np.abs(rng.normal(0, 0.5, n)) - spread
+    if flat and n:
+        for start in range(0, n, 97):
+            high[start + 20:start + 60] = close[start + 20:start + 60]
+            low[start + 20:start + 60] = close[start + 20:start + 60]
+    for column in (high, low, close):
+        column[:nans] = np.nan
+    return high, low, close
+
+
+def _assert_matches(fast, reference, tolerance=1e-9):
+    fast = np.asarray(fast, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    assert fast.shape == reference.shape
+    np.testing.assert_array_equal(np.isnan(fast), np.isnan(reference))
+    scale = np.nanmax(np.abs(reference)) if np.isfinite(reference).any() else 1.0
+    np.testing.assert_allclose(fast, reference, rtol=1e-9, atol=tolerance * max(scale, 1.0))
+
+
+def _kernels(period):
+    """
+    (name, call) pairs running one indicator on (high, low, close) columns
+    """
+    return [
+        ("sma", lambda module, h, l, c: [module.calculate_sma(c, period)]),
+        ("ema", lambda module, h, l, c: [module.calculate_ema(c, period)]),
+        ("rsi", lambda module, h, l, c: [module.calculate_rsi(c, period)]),
+        ("macd", lambda module, h, l, c: module.calculate_macd(c, max(1, period // 2), period, max(1, period // 3))),
+        ("bollinger", lambda module, h, l, c: module.calculate_bollinger_bands(c, period, 2.0)),
+        ("atr", lambda module, h, l, c: [module.calculate_atr(h, l, c, period)]),
+        ("stochastic", lambda module, h, l, c: module.calculate_stochastic(h, l, c, period, 3)),
+    ]
+
+
+def _compare_all(period, high, low, close):
+    for name, run in _kernels(period):
+        fast = run(fast_indicators, high, low, close)
+        reference = run(technical_indicators, high, low, close)
+        assert len(fast) == len(reference), name
+        tolerance = STD_TOLERANCE if name == "bollinger" else 1e-9
+        for fast_line, reference_line in zip(fast, reference):
+            try:
+                _assert_matches(fast_line, reference_line, tolerance)
+            except AssertionError as e:
+                raise AssertionError(f"{name} with period {period} and {len(close)} candles: {e}")
+
+
+@pytest.mark.parametrize("period", [2, 14, 26])
+@pytest.mark.parametrize("length", ["empty", "one", "period-1", "period", "large"])
+def test_kernels_match_pandas_at_edge_lengths(period, length):
+    n = {"empty": 0, "one": 1, "period-1": period - 1, "period": period, "large": LARGE}[length]
+    _compare_all(period, *_prices(n))
+
+
+@pytest.mark.parametrize("period", range(1, 51))
+def test_kernels_match_pandas_for_every_period(period):
+    _compare_all(period, *_prices(400, seed=period))
+
+
+@pytest.mark.parametrize("period", [1, 5, 14, 50])
+def test_kernels_match_pandas_on_flat_runs(period):
+    _compare_all(period, *_prices(1000, flat=True))
+
+
+@pytest.mark.parametrize("period", [1, 5, 14, 50])
+def test_kernels_match_pandas_after_missing_values(period):
+    _compare_all(period, *_prices(600, nans=period + 7))
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 50])
+def test_rolling_primitives_match_pandas(window):
+    _, _, close = _prices(LARGE, nans=3)
+    close[1000:1005] = np.nan
+    reference = pd.Series(close)
+    _assert_matches(fast_indicators.rolling_mean(close, window), reference.rolling(window).mean())
+    _assert_matches(fast_indicators.rolling_std(close, window), reference.rolling(window).std(), STD_TOLERANCE)
+    _assert_matches(fast_indicators.rolling_min(close, window), reference.rolling(window).min())
+    _assert_matches(fast_indicators.rolling_max(close, window), reference.rolling(window).max())
+    _assert_matches(fast_indicators.ewm(close, window), reference.ewm(span=window, adjust=False).mean())
+
+
+@pytest.mark.parametrize("window", [2, 5, 20])
+def test_rolling_std_is_exact_on_flat_and_nearly_flat_windows(window):
+    _, _, close = _prices(LARGE, flat=True)
+    # Neighbouring prices a few ulps apart, far from the block mean
+    close[3000:3100] = 250.0 + np.arange(100) % 2 * 1e-9
+    std = fast_indicators.rolling_std(close, window)
+    windows = np.lib.stride_tricks.sliding_window_view(close, window)
+    exact = windows.std(axis=1, ddof=1)
+    # Two-pass sums leave about eps * price of noise on flat windows
+    np.testing.assert_allclose(std[window - 1:], exact, rtol=1e-9, atol=1e-12)
+    assert (std[window - 1:][windows.min(axis=1) == windows.max(axis=1)] == 0).all()
+
+
+@pytest.fixture(params=["pandas", "numpy"])
+def indicator_backend(request, monkeypatch):
+    monkeypatch.setattr(IndicatorService, "backend", request.param)
+    # Cached values are not keyed by backend
+    indicator_cache.clear()
+    yield request.param
+    indicator_cache.clear()
+
+
+@pytest.mark.parametrize("strategy_id", [info["id"] for info in StrategyService.get_predefined_strategies()])
+def test_vectorized_and_per_candle_backtests_agree_on_each_backend(indicator_backend, strategy_id):
+    series = mock_series(300)
+    vectorized = BacktestService.run_backtest(strategy_id, series, include_details=True, vectorized=True)
+    per_candle = BacktestService.run_backtest(strategy_id, series, include_details=True, vectorized=False)
+    assert vectorized == per_candle
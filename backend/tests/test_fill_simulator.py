@@ -0,0 +1,224 @@
+"""Fill simulator against fills worked out by hand"""
+import numpy as np
+import pytest
+from models.execution import ExecutionModel, SlippageModel
+from utils.fill_simulator import (
+    EXIT_END,
+    EXIT_SIGNAL,
+    EXIT_STOP_LOSS,
+    EXIT_TAKE_PROFIT,
+    LONG,
+    SHORT,
+    simulate_fills,
+)
+
+
+def _simulate(close, signals, open=None, high=None, low=None, **execution):
+    """
+    Fill ``signals`` ({candle index: side}) with 10% positions of 10000;
+    candles default to open = high = low = close
+    """
+    close = np.asarray(close, dtype=np.float64)
+    indices = np.array(sorted(signals), dtype=np.int64)
+    return simulate_fills(
+        np.asarray(open if open is not None else close, dtype=np.float64),
+        np.asarray(high if high is not None else close, dtype=np.float64),
+        np.asarray(low if low is not None else close, dtype=np.float64),
+        close,
+        indices,
+        np.array([signals[i] for i in indices], dtype=np.int8),
+        np.full(len(indices), 0.5),
+        initial_capital=10000.0,
+        position_size=0.1,
+        execution=ExecutionModel(**execution)
+    )
+
+
+def test_long_round_trip_at_closes():
+    fills = _simulate([100, 110, 120, 90], {0: LONG, 2: SHORT})
+    assert len(fills) == 1
+    assert fills.units[0] == pytest.approx(10.0)
+    assert fills.profit[0] == pytest.approx(200.0)
+    assert fills.exit_reason[0] == EXIT_SIGNAL
+    assert fills.final_capital == pytest.approx(10200.0)
+
+
+def test_sell_without_position_is_ignored_when_long_only():
+    fills = _simulate([100, 110, 120], {0: SHORT, 1: LONG})
+    assert fills.entry_index.tolist() == [1]
+    assert fills.exit_reason[0] == EXIT_END
+    assert fills.profit[0] == pytest.approx(1000 / 110 * 10)
+
+
+def test_fees():
+    fills = _simulate([100, 110, 120], {0: LONG, 2: SHORT}, fee_rate=0.001, fee_per_order=1.0)
+    # Entry: 0.001 * 1000 + 1; exit: 0.001 * 10 * 120 + 1
+    assert fills.fees[0] == pytest.approx(2.0 + 2.2)
+    assert fills.profit[0] == pytest.approx(200 - 4.2)
+    assert fills.final_capital == pytest.approx(10000 - 2.0 + 200 - 2.2)
+    entry, exit = fills.orders
+    assert entry[4] == pytest.approx(2.0)
+    assert exit[4] == pytest.approx(2.2)
+
+
+def test_entry_size_follows_capital_after_fees():
+    fills = _simulate([100, 100, 100, 100], {0: LONG, 1: SHORT, 2: LONG, 3: SHORT}, fee_per_order=5.0)
+    # The first round trip costs 10, so the second entry is 10% of 9990
+    assert fills.units.tolist() == pytest.approx([10.0, 9.99])
+    assert fills.final_capital == pytest.approx(10000 - 4 * 5.0)
+
+
+@pytest.mark.parametrize("model, slippage, entry, exit", [
+    (SlippageModel.PERCENT, 0.01, 101.0, 118.8),
+    (SlippageModel.FIXED, 0.5, 100.5, 119.5),
+    # Fraction of the candle's range: 0.5 * (102 - 98) then 0.5 * (124 - 116)
+    (SlippageModel.RANGE, 0.5, 102.0, 116.0),
+])
+def test_slippage_is_against_every_market_order(model, slippage, entry, exit):
+    fills = _simulate(
+        [100, 110, 120],
+        {0: LONG, 2: SHORT},
+        high=[102, 112, 124],
+        low=[98, 108, 116],
+        slippage_model=model,
+        slippage=slippage
+    )
+    units = 1000 / entry
+    assert fills.entry_price[0] == pytest.approx(entry)
+    assert fills.exit_price[0] == pytest.approx(exit)
+    assert fills.units[0] == pytest.approx(units)
+    assert fills.profit[0] == pytest.approx(units * (exit - entry))
+
+
+def test_stop_loss_fills_at_the_stop():
+    fills = _simulate(
+        [100, 97, 99, 110],
+        {0: LONG, 3: SHORT},
+        open=[100, 98, 97, 100],
+        low=[100, 94, 96, 100],
+        stop_loss=0.05
+    )
+    assert fills.exit_index.tolist() == [1]
+    assert fills.exit_reason[0] == EXIT_STOP_LOSS
+    assert fills.exit_price[0] == pytest.approx(95.0)
+    assert fills.profit[0] == pytest.approx(-50.0)
+    # The later SELL finds no position to close
+    assert len(fills.orders) == 2
+
+
+def test_stop_loss_gap_fills_at_the_open_with_slippage():
+    fills = _simulate(
+        [100, 92, 95],
+        {0: LONG},
+        open=[100, 93, 92],
+        low=[100, 91, 92],
+        stop_loss=0.05,
+        slippage_model=SlippageModel.FIXED,
+        slippage=0.5
+    )
+    # Entry pays 100.5, so the stop is 95.475; the gap opens at 93
+    assert fills.entry_price[0] == pytest.approx(100.5)
+    assert fills.exit_price[0] == pytest.approx(92.5)
+    assert fills.exit_reason[0] == EXIT_STOP_LOSS
+
+
+@pytest.mark.parametrize("candle_open, exit_price", [(105, 111.1), (112, 112.0)])
+def test_take_profit_fills_at_the_target_or_a_better_gap(candle_open, exit_price):
+    fills = _simulate(
+        [100, 108, 108],
+        {0: LONG},
+        open=[100, candle_open, 108],
+        high=[100, 113, 108],
+        take_profit=0.1,
+        slippage=0.01
+    )
+    # The target is 10% over the slipped entry at 101; limit orders pay no
+    # slippage
+    assert fills.exit_reason[0] == EXIT_TAKE_PROFIT
+    assert fills.exit_price[0] == pytest.approx(exit_price)
+    assert fills.profit[0] == pytest.approx(1000 / 101 * (exit_price - 101))
+
+
+@pytest.mark.parametrize("candle_open, reason, exit_price", [
+    (100, EXIT_STOP_LOSS, 95.0),
+    (111, EXIT_TAKE_PROFIT, 111.0),
+])
+def test_candle_reaching_both_levels(candle_open, reason, exit_price):
+    fills = _simulate(
+        [100, 100],
+        {0: LONG},
+        open=[100, candle_open],
+        high=[100, 115],
+        low=[100, 90],
+        stop_loss=0.05,
+        take_profit=0.1
+    )
+    assert fills.exit_reason[0] == reason
+    assert fills.exit_price[0] == pytest.approx(exit_price)
+
+
+def test_levels_are_not_checked_on_the_entry_candle():
+    fills = _simulate([100, 100], {0: LONG}, low=[80, 100], stop_loss=0.05)
+    assert fills.exit_reason[0] == EXIT_END
+
+
+def test_short_round_trip_and_reversal():
+    fills = _simulate([100, 90, 80, 88], {0: SHORT, 2: LONG}, allow_short=True)
+    short, long = 0, 1
+    assert fills.side.tolist() == [SHORT, LONG]
+    assert fills.profit[short] == pytest.approx(10 * (100 - 80))
+    # The reversal opens 10% of 10200 at 80 and is closed at the last close
+    assert fills.units[long] == pytest.approx(1020 / 80)
+    assert fills.profit[long] == pytest.approx(1020 / 80 * 8)
+    assert fills.exit_reason.tolist() == [EXIT_SIGNAL, EXIT_END]
+    assert fills.final_capital == pytest.approx(10200 + 102)
+
+
+def test_short_stop_and_slippage():
+    fills = _simulate(
+        [100, 103, 100],
+        {0: SHORT},
+        open=[100, 104, 100],
+        high=[100, 107, 100],
+        allow_short=True,
+        stop_loss=0.05,
+        slippage_model=SlippageModel.PERCENT,
+        slippage=0.01
+    )
+    # Selling short receives 99, so the stop is 103.95; the candle gaps
+    # over it to 104 and the buy back pays 1% more
+    assert fills.entry_price[0] == pytest.approx(99.0)
+    assert fills.exit_price[0] == pytest.approx(104 * 1.01)
+    units = 1000 / 99
+    assert fills.profit[0] == pytest.approx(-units * (104 * 1.01 - 99))
+
+
+def test_pyramiding_limits_entries_and_averages_levels():
+    fills = _simulate(
+        [100, 110, 105, 96, 120],
+        {0: LONG, 1: LONG, 2: LONG, 4: SHORT},
+        low=[100, 110, 105, 94, 120],
+        stop_loss=0.1,
+        max_entries=2
+    )
+    # Two lots: 10 at 100 and 1000 / 110 at 110; the third BUY is ignored
+    assert fills.entry_index.tolist() == [0, 1]
+    units = np.array([10.0, 1000 / 110])
+    average = (units * [100, 110]).sum() / units.sum()
+    stop = average * 0.9
+    assert 94 < stop < 96
+    assert fills.exit_index.tolist() == [3, 3]
+    assert fills.exit_reason.tolist() == [EXIT_STOP_LOSS, EXIT_STOP_LOSS]
+    assert fills.exit_price.tolist() == pytest.approx([stop, stop])
+    assert fills.profit.tolist() == pytest.approx(list(units * (stop - np.array([100, 110]))))
+    # One order closes both lots
+    assert len(fills.orders) == 3
+    assert fills.orders[-1][3] == pytest.approx(units.sum())
+
+
+def test_pyramided_fixed_fee_is_split_by_units():
+    fills = _simulate([100, 100, 100], {0: LONG, 1: LONG, 2: SHORT}, fee_per_order=3.0, max_entries=2)
+    units = fills.units
+    exit_fees = 3.0 * units / units.sum()
+    assert fills.fees.tolist() == pytest.approx(list(3.0 + exit_fees))
+    assert fills.final_capital == pytest.approx(10000 - 3 * 3.0)
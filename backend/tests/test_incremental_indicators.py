@@ -0,0 +1,89 @@
+"""Streaming indicator calculators against the batch functions"""
+import numpy as np
+import pytest
+from utils import technical_indicators as ti
+from utils.incremental_indicators import (
+    IncrementalSMA,
+    IncrementalEMA,
+    IncrementalRSI,
+    IncrementalMACD,
+    IncrementalBollingerBands,
+    IncrementalATR,
+    IncrementalStochastic,
+)
+from tests.conftest import mock_series
+
+
+def _stream(calculator, series) -> np.ndarray:
+    return np.array([calculator.update(series[i]) for i in range(len(series))], dtype=np.float64)
+
+
+def _batch(values) -> np.ndarray:
+    if isinstance(values, tuple):
+        return np.column_stack([np.asarray(line, dtype=np.float64) for line in values])
+    return np.asarray(values, dtype=np.float64)
+
+
+@pytest.fixture(params=[("random", 1), ("flat", 2)])
+def candles(request):
+    kind, seed = request.param
+    series = mock_series(300, seed=seed)
+    if kind == "flat":
+        # Runs of identical prices exercise the zero-variance and 0/0 paths
+        for column in (series.open, series.high, series.low, series.close):
+            column[100:160] = 50000.0
+    return series
+
+
+@pytest.mark.parametrize("period", [1, 2, 14, 50])
+def test_sma_ema_bit_for_bit(candles, period):
+    assert _stream(IncrementalSMA(period), candles).tolist() == ti.calculate_sma(candles.close, period)
+    assert _stream(IncrementalEMA(period), candles).tolist() == ti.calculate_ema(candles.close, period)
+
+
+@pytest.mark.parametrize("period", [2, 14, 30])
+def test_rsi(candles, period):
+    np.testing.assert_allclose(
+        _stream(IncrementalRSI(period), candles), _batch(ti.calculate_rsi(candles.close, period)), rtol=1e-12
+    )
+
+
+def test_macd(candles):
+    np.testing.assert_array_equal(
+        _stream(IncrementalMACD(12, 26, 9), candles), _batch(ti.calculate_macd(candles.close, 12, 26, 9))
+    )
+
+
+@pytest.mark.parametrize("period", [2, 20])
+def test_bollinger_bands(candles, period):
+    np.testing.assert_allclose(
+        _stream(IncrementalBollingerBands(period, 2.0), candles),
+        _batch(ti.calculate_bollinger_bands(candles.close, period, 2.0)),
+        rtol=1e-9, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize("period", [1, 14])
+def test_atr(candles, period):
+    np.testing.assert_allclose(
+        _stream(IncrementalATR(period), candles),
+        _batch(ti.calculate_atr(candles.high, candles.low, candles.close, period)),
+        rtol=1e-12
+    )
+
+
+@pytest.mark.parametrize("k_period,d_period", [(14, 3), (5, 1)])
+def test_stochastic(candles, k_period, d_period):
+    np.testing.assert_allclose(
+        _stream(IncrementalStochastic(k_period, d_period), candles),
+        _batch(ti.calculate_stochastic(candles.high, candles.low, candles.close, k_period, d_period)),
+        rtol=1e-12
+    )
+
+
+def test_ema_resume_continues_the_batch(candles):
+    full = ti.calculate_ema(candles.close, 20)
+    calculator = IncrementalEMA(20).resume(full[199], 200)
+    tail = [calculator.update(candles[i]) for i in range(200, len(candles))]
+    assert tail == full[200:]
+    assert calculator.count == len(candles)
@@ -0,0 +1,107 @@
+"""Content-addressed indicator cache"""
+import numpy as np
+import pytest
+from models.indicator import IndicatorConfig, IndicatorType
+from services.backtest_service import BacktestService
+from services.indicator_cache import IndicatorCache, indicator_cache
+from services.indicator_service import IndicatorService
+from tests.conftest import mock_series
+
+RSI = IndicatorConfig(type=IndicatorType.RSI, period=14)
+CONFIGS = [
+    IndicatorConfig(type=IndicatorType.SMA, period=20),
+    IndicatorConfig(type=IndicatorType.EMA, period=20),
+    RSI,
+    IndicatorConfig(type=IndicatorType.BOLLINGER_BANDS, period=20, params={"std_dev": 2.0}),
+    IndicatorConfig(type=IndicatorType.ATR, period=14),
+    IndicatorConfig(type=IndicatorType.STOCHASTIC, period=14, params={"k_period": 14, "d_period": 3}),
+]
+
+
+def _computed(series, config):
+    return {line: np.asarray(values, dtype=np.float64) for line, values in IndicatorService.calculate_lines(series, config)[1].items()}
+
+
+def test_miss_then_hit(series):
+    cache = IndicatorCache()
+    first = cache.calculate_lines(series, RSI)
+    second = cache.calculate_lines(series, RSI)
+    assert second[1]["value"] is first[1]["value"]
+    assert not second[1]["value"].flags.writeable
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_same_candles_share_an_entry(series):
+    cache = IndicatorCache()
+    cache.calculate_lines(series, RSI)
+    # Content-addressed: a copy of the same candles hits
+    cache.calculate_lines(mock_series(len(series)), RSI)
+    # Only the inputs and the normalized config matter: ``period`` is unused by MACD
+    cache.calculate_lines(series, IndicatorConfig(type=IndicatorType.MACD, period=5))
+    cache.calculate_lines(series, IndicatorConfig(type=IndicatorType.MACD, period=9))
+    assert cache.stats()["hits"] == 2
+
+
+@pytest.mark.parametrize("config", CONFIGS, ids=[config.type.value for config in CONFIGS])
+def test_prefix_extension_matches_recomputation(series, config):
+    cache = IndicatorCache()
+    cache.calculate_lines(series[:400], config)
+    _, lines = cache.calculate_lines(series, config)
+    assert cache.stats()["extensions"] == 1
+    for line, values in _computed(series, config).items():
+        np.testing.assert_allclose(lines[line], values, rtol=1e-9, atol=1e-9)
+
+
+def test_macd_is_recomputed(series):
+    cache = IndicatorCache()
+    config = IndicatorConfig(type=IndicatorType.MACD)
+    cache.calculate_lines(series[:400], config)
+    cache.calculate_lines(series, config)
+    assert cache.stats()["extensions"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_prefix_extension_can_be_disabled(series):
+    cache = IndicatorCache(extend_prefixes=False)
+    cache.calculate_lines(series[:400], RSI)
+    cache.calculate_lines(series, RSI)
+    assert cache.stats()["extensions"] == 0
+
+
+def test_eviction_is_lru_and_bounded(series):
+    entry_bytes = len(series) * 8 + 256
+    cache = IndicatorCache(max_bytes=2 * entry_bytes)
+    periods = (10, 20, 30)
+    for period in periods[:2]:
+        cache.calculate_lines(series, IndicatorConfig(type=IndicatorType.SMA, period=period))
+    # Touch period 10 so period 20 is the least recently used
+    cache.calculate_lines(series, IndicatorConfig(type=IndicatorType.SMA, period=10))
+    cache.calculate_lines(series, IndicatorConfig(type=IndicatorType.SMA, period=30))
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["bytes"] <= cache.max_bytes
+    cache.calculate_lines(series, IndicatorConfig(type=IndicatorType.SMA, period=10))
+    assert cache.stats()["hits"] == 2
+    cache.calculate_lines(series, IndicatorConfig(type=IndicatorType.SMA, period=20))
+    assert cache.stats()["misses"] == 4
+
+
+def test_entries_larger_than_the_cache_are_not_stored(series):
+    cache = IndicatorCache(max_bytes=1024)
+    cache.calculate_lines(series, RSI)
+    assert cache.stats()["entries"] == 0
+
+
+def test_clear_resets_stats(series):
+    cache = IndicatorCache()
+    cache.calculate_lines(series, RSI)
+    cache.calculate_lines(series, RSI)
+    cache.clear()
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["hits"], stats["misses"], stats["hit_rate"]) == (0, 0, 0, 0, 0.0)
+
+
+def test_per_candle_backtests_leave_the_shared_cache_alone():
+    BacktestService.run_backtest("rsi_oversold", mock_series(200), vectorized=False)
+    assert indicator_cache.stats()["entries"] == 0
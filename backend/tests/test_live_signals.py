@@ -0,0 +1,98 @@
+"""The /stream WebSocket of live strategy signals"""
+import pytest
+from models.signal import SignalType
+from services import live_signal_service
+from tests.conftest import mock_series
+
+
+@pytest.fixture(scope="module")
+def candles():
+    return [candle.model_dump(mode="json") for candle in mock_series(300, volatility=0.02).to_market_data().data]
+
+
+def _subscribe(websocket, strategy_id="rsi_oversold", **message):
+    websocket.send_json({
+        "action": "subscribe", "strategy_id": strategy_id, "symbol": "TEST", "timeframe": "5m", **message
+    })
+    return websocket.receive_json()
+
+
+def test_subscribe_stream_and_unsubscribe(client, candles):
+    with client.websocket_connect("/api/strategies/stream") as websocket:
+        reply = _subscribe(websocket, history=candles[:50])
+        assert reply["type"] == "subscribed"
+        subscription_id = reply["subscription_id"]
+
+        signals = []
+        for candle in candles[50:]:
+            websocket.send_json({"action": "candle", "subscription_id": subscription_id, "candle": candle})
+        # A closing unsubscribe flushes every signal sent before it
+        websocket.send_json({"action": "unsubscribe", "subscription_id": subscription_id})
+        while (message := websocket.receive_json())["type"] == "signal":
+            signals.append(message["signal"]["signal_type"])
+        assert message == {"type": "unsubscribed", "subscription_id": subscription_id}
+
+        # Only changes of signal type are sent
+        assert {SignalType.BUY.value, SignalType.SELL.value} <= set(signals)
+        assert all(a != b for a, b in zip(signals, signals[1:]))
+
+        websocket.send_json({"action": "candle", "subscription_id": subscription_id, "candle": candles[0]})
+        assert websocket.receive_json() == {"type": "error", "detail": f"Unknown subscription: {subscription_id}"}
+
+
+@pytest.mark.parametrize("strategy_id, parameters, message", [
+    ("rsi_oversold", {"period": "x"}, "period must be a positive whole number"),
+    ("rsi_oversold", {"period": 0}, "period must be a positive whole number"),
+    ("rsi_oversold", {"period": -3}, "period must be a positive whole number"),
+    ("rsi_oversold", {"period": 2.5}, "period must be a positive whole number"),
+    ("rsi_oversold", {"oversold": "low"}, "oversold must be a number"),
+    ("trend_follow_ema", {"fast_period": None}, "fast_period must be a positive whole number"),
+    ("macd_signal", {"signal_period": True}, "signal_period must be a positive whole number"),
+    ("bollinger_breakout", {"std_dev": None}, "std_dev must be a number"),
+    ("nope", {}, "Unknown strategy: nope"),
+    ("custom_rules", {}, "Strategy custom_rules cannot be streamed"),
+])
+def test_bad_subscriptions_are_errors_and_keep_the_socket(client, candles, strategy_id, parameters, message):
+    with client.websocket_connect("/api/strategies/stream") as websocket:
+        reply = _subscribe(websocket, strategy_id, parameters=parameters)
+        assert reply["type"] == "error"
+        assert message in reply["detail"]
+
+        reply = _subscribe(websocket, strategy_id="rsi_oversold", parameters={"period": 14.0})
+        assert reply["type"] == "subscribed"
+        websocket.send_json({"action": "candle", "subscription_id": reply["subscription_id"], "candles": candles[:20]})
+        websocket.send_json({"action": "unsubscribe", "subscription_id": reply["subscription_id"]})
+        assert websocket.receive_json()["type"] == "unsubscribed"
+
+
+def test_failing_evaluator_reports_an_error_frame(client, candles, monkeypatch):
+    class Failing:
+        strategy_name = "Failing"
+
+        def update(self, candle):
+            raise RuntimeError("evaluator broke")
+
+    monkeypatch.setitem(live_signal_service._evaluators, "failing", lambda params: Failing())
+    with client.websocket_connect("/api/strategies/stream") as websocket:
+        healthy = _subscribe(websocket)["subscription_id"]
+        failing = _subscribe(websocket, "failing")["subscription_id"]
+        websocket.send_json({"action": "candle", "subscription_id": failing, "candle": candles[0]})
+        assert websocket.receive_json() == {"type": "error", "detail": "evaluator broke"}
+
+        # The socket and its other subscriptions are still there
+        websocket.send_json({"action": "unsubscribe", "subscription_id": healthy})
+        assert websocket.receive_json() == {"type": "unsubscribed", "subscription_id": healthy}
+
+
+@pytest.mark.parametrize("message", [["not", "an", "object"], {"action": "dance"}, {"action": "candle"}])
+def test_malformed_messages_are_errors(client, message):
+    with client.websocket_connect("/api/strategies/stream") as websocket:
+        websocket.send_json(message)
+        assert websocket.receive_json()["type"] == "error"
+
+
+def test_listing_marks_streamable_strategies(client):
+    strategies = {strategy["id"]: strategy for strategy in client.get("/api/strategies/list").json()["strategies"]}
+    assert strategies["custom_rules"]["streamable"] is False
+    for strategy_id in ("trend_follow_ema", "rsi_oversold", "macd_signal", "bollinger_breakout"):
+        assert strategies[strategy_id]["streamable"] is True
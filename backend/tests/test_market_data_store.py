@@ -0,0 +1,130 @@
+import asyncio
+import numpy as np
+import pytest
+from services.market_data_store import MarketDataStore, MarketDataConflictError
+from tests.conftest import mock_series
+
+
+class RacingCollection:
+    """
+    A collection proxy that lets another ingest write just before each of
+    the first ``races`` bulk writes, as an overlapping request would
+    """
+    def __init__(self, collection, rival: MarketDataStore, rival_series, races: int = 1):
+        self._collection = collection
+        self._rival = rival
+        self._rival_series = rival_series
+        self.races = races
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def bulk_write(self, *args, **kwargs):
+        if self.races:
+            self.races -= 1
+            await self._rival.ingest(self._rival_series)
+        return await self._collection.bulk_write(*args, **kwargs)
+
+
+@pytest.fixture
+def store(database):
+    store = MarketDataStore(database)
+    asyncio.run(store.ensure_indexes())
+    return store
+
+
+def _racing_store(store, rival_series, races=1):
+    racer = MarketDataStore(store.db)
+    racer.collection = RacingCollection(store.collection, MarketDataStore(store.db), rival_series, races)
+    return racer
+
+
+def _assert_union(store, *parts):
+    loaded = asyncio.run(store.load("TEST", parts[0].timeframe))
+    expected = np.unique(np.concatenate([part.timestamp for part in parts]))
+    np.testing.assert_array_equal(loaded.timestamp, expected)
+    return loaded
+
+
+def test_overlapping_ingests_merge(store):
+    series = mock_series(600)
+    first = asyncio.run(store.ingest(series[:400]))
+    second = asyncio.run(store.ingest(series[300:]))
+    assert first["buckets_inserted"] == 2
+    assert second["buckets_updated"] == 1
+    assert second["buckets_inserted"] == 1
+    loaded = _assert_union(store, series)
+    np.testing.assert_array_equal(loaded.close, series.close)
+
+
+def test_later_ingest_replaces_repeated_timestamps(store):
+    series = mock_series(100)
+    asyncio.run(store.ingest(series))
+    replacement = mock_series(100, seed=8)[50:]
+    asyncio.run(store.ingest(replacement))
+    loaded = asyncio.run(store.load("TEST", series.timeframe))
+    np.testing.assert_array_equal(loaded.close[:50], series.close[:50])
+    np.testing.assert_array_equal(loaded.close[50:], replacement.close)
+
+
+def test_concurrent_insert_of_new_bucket_is_merged(store):
+    series = mock_series(600)
+    racer = _racing_store(store, series[:150])
+    result = asyncio.run(racer.ingest(series[100:250]))
+    assert result["buckets_updated"] == 1
+    _assert_union(store, series[:150], series[100:250])
+
+
+def test_concurrent_update_of_stored_bucket_is_merged(store):
+    series = mock_series(600)
+    asyncio.run(store.ingest(series[:100]))
+    racer = _racing_store(store, series[100:200])
+    asyncio.run(racer.ingest(series[200:280]))
+    _assert_union(store, series[:280])
+    doc = asyncio.run(store.collection.find_one({"symbol": "TEST"}))
+    assert doc["version"] == 3
+
+
+def test_gather_of_overlapping_ingests_keeps_every_candle(store):
+    series = mock_series(900)
+    parts = [series[0:400], series[200:600], series[500:900]]
+
+    async def ingest_all():
+        await asyncio.gather(*(store.ingest(part) for part in parts))
+
+    asyncio.run(ingest_all())
+    _assert_union(store, *parts)
+
+
+def test_unversioned_bucket_is_updated(store):
+    series = mock_series(100)
+    asyncio.run(store.ingest(series[:50]))
+    asyncio.run(store.collection.update_many({}, {"$unset": {"version": ""}}))
+    result = asyncio.run(store.ingest(series[50:]))
+    assert result["buckets_updated"] == 1
+    _assert_union(store, series)
+
+
+def test_conflicts_that_never_settle_raise(store):
+    series = mock_series(100)
+    racer = _racing_store(store, series[:10], races=100)
+    with pytest.raises(MarketDataConflictError):
+        asyncio.run(racer.ingest(series[5:20]))
+
+
+def test_ingest_conflict_maps_to_409(client, monkeypatch):
+    async def conflict(self, market_data):
+        raise MarketDataConflictError("busy")
+
+    monkeypatch.setattr(MarketDataStore, "ingest", conflict)
+    series = mock_series(10)
+    response = client.post("/api/market/ohlcv", json={
+        "symbol": "TEST",
+        "timeframe": series.timeframe.value,
+        "data": [
+            {"timestamp": candle.timestamp.isoformat(), "open": candle.open, "high": candle.high,
+             "low": candle.low, "close": candle.close, "volume": candle.volume}
+            for candle in (series[i] for i in range(len(series)))
+        ]
+    })
+    assert response.status_code == 409
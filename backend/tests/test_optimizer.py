@@ -0,0 +1,66 @@
+"""Parameter sweeps: worker pools and their admission"""
+import pytest
+from services import compute_executor as compute_executor_module, optimizer_service
+from services.compute_executor import ComputeSaturatedError, compute_executor
+from services.optimizer_service import OptimizerService
+from tests.conftest import mock_series
+
+GRID = {"period": [10, 14], "oversold": [25, 30]}
+
+
+def test_worker_count_is_capped():
+    cpu_count = compute_executor_module.os.cpu_count() or 1
+    assert compute_executor.worker_count(None, 3) == min(cpu_count, 3)
+    assert compute_executor.worker_count(1000, 1000) == cpu_count
+    assert compute_executor.worker_count(2, 0) == 1
+
+
+def test_parallel_sweep_matches_single_process(series, four_cpus):
+    single = OptimizerService.optimize("rsi_oversold", series, GRID, max_workers=1)
+    parallel = OptimizerService.optimize("rsi_oversold", series, GRID, max_workers=2)
+    assert parallel["workers"] == 2
+    assert parallel["results"] == single["results"]
+
+
+def test_sweeps_beyond_the_pool_limit_are_rejected(series, four_cpus):
+    with compute_executor.worker_pool(1):
+        with pytest.raises(ComputeSaturatedError):
+            OptimizerService.optimize("rsi_oversold", series, GRID, max_workers=2)
+    # The slot is free again once the pool is shut down
+    assert OptimizerService.optimize("rsi_oversold", series, GRID, max_workers=2)["evaluated"] == 4
+
+
+def test_unknown_rank_metric(series):
+    with pytest.raises(ValueError):
+        OptimizerService.optimize("rsi_oversold", series, GRID, rank_by="luck")
+
+
+def test_grids_over_the_limit_are_rejected(series, monkeypatch):
+    monkeypatch.setattr(optimizer_service, "MAX_EVALUATIONS", 3)
+    with pytest.raises(ValueError, match="more than the limit of 3"):
+        OptimizerService.build_combinations(GRID)
+    # Wide grids are fine once a budget brings them under the limit
+    wide = {"period": list(range(2, 1002)), "oversold": list(range(1000))}
+    assert len(OptimizerService.build_combinations(wide, max_evaluations=3)) == 3
+    assert len(OptimizerService.build_combinations(wide, "random", max_evaluations=3, seed=1)) == 3
+
+
+@pytest.mark.parametrize("method, max_evaluations, message", [
+    ("random", None, "Random search needs max_evaluations"),
+    ("grid", 0, "at least 1"),
+    ("annealing", 2, "Unknown optimization method"),
+])
+def test_invalid_sweeps(method, max_evaluations, message):
+    with pytest.raises(ValueError, match=message):
+        OptimizerService.build_combinations(GRID, method, max_evaluations)
+
+
+def test_oversized_sweep_is_400(client, monkeypatch):
+    monkeypatch.setattr(optimizer_service, "MAX_EVALUATIONS", 3)
+    response = client.post("/api/backtest/optimize", json={
+        "strategy_id": "rsi_oversold",
+        "market_data": mock_series(200).to_market_data().model_dump(mode="json"),
+        "parameter_grid": GRID
+    })
+    assert response.status_code == 400
+    assert "more than the limit" in response.json()["detail"]
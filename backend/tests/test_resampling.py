@@ -0,0 +1,180 @@
+"""Higher-timeframe rollups, their cache and look-ahead-free alignment"""
+import numpy as np
+import pandas as pd
+import pytest
+from models.market_data import TimeFrame
+from models.ohlcv_series import OHLCVSeries
+from services.backtest_service import BacktestService
+from services.resample_service import ResampleService, RollupCache, timeframe_ns
+from utils.resampling import BAR_COLUMNS, align, completed_bar_index, resample_columns
+from tests.conftest import mock_series
+
+HOUR = timeframe_ns(TimeFrame.H1)
+
+
+def _gapped(n, seed, keep=0.8):
+    """
+    Mock 5m candles with a random ``1 - keep`` of them missing
+    """
+    series = mock_series(n, seed=seed)
+    mask = np.random.default_rng(seed).random(n) < keep
+    mask[0] = True
+    return OHLCVSeries(
+        series.symbol, series.timeframe,
+        **{name: getattr(series, name)[mask] for name in ("timestamp", "open", "high", "low", "close", "volume")}
+    )
+
+
+def _columns(series):
+    return [series.timestamp, series.open, series.high, series.low, series.close, series.volume]
+
+
+def _assert_bars_equal(bars, expected):
+    for name in BAR_COLUMNS:
+        np.testing.assert_array_equal(bars[name], expected[name], err_msg=name)
+
+
+@pytest.mark.parametrize("timeframe", [TimeFrame.M15, TimeFrame.H1, TimeFrame.H4])
+def test_bars_match_pandas(timeframe):
+    series = _gapped(2000, seed=1)
+    bars = resample_columns(*_columns(series), timeframe_ns(timeframe))
+    frame = pd.DataFrame(
+        {name: getattr(series, name) for name in ("open", "high", "low", "close", "volume")},
+        index=pd.to_datetime(series.timestamp)
+    )
+    expected = frame.resample(pd.Timedelta(timeframe_ns(timeframe))).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    counts = frame["close"].resample(pd.Timedelta(timeframe_ns(timeframe))).count()
+    expected = expected[counts > 0]
+    np.testing.assert_array_equal(bars["timestamp"], expected.index.as_unit("ns").asi8)
+    for name in ("open", "high", "low", "close", "volume"):
+        np.testing.assert_allclose(bars[name], expected[name].to_numpy(), rtol=1e-12, err_msg=name)
+    np.testing.assert_array_equal(bars["count"], counts[counts > 0].to_numpy())
+
+
+def test_fill_gaps_writes_flat_bars_at_the_previous_close():
+    series = _gapped(2000, seed=2, keep=0.3)
+    bars = resample_columns(*_columns(series), HOUR)
+    filled = resample_columns(*_columns(series), HOUR, fill_gaps=True)
+    assert (np.diff(filled["timestamp"]) == HOUR).all()
+    assert len(filled["timestamp"]) > len(bars["timestamp"])
+
+    occupied = np.isin(filled["timestamp"], bars["timestamp"])
+    for name in BAR_COLUMNS:
+        np.testing.assert_array_equal(filled[name][occupied], bars[name])
+    empty = np.flatnonzero(~occupied)
+    previous_close = filled["close"][empty - 1]
+    for name in ("open", "high", "low", "close"):
+        np.testing.assert_array_equal(filled[name][empty], previous_close)
+    assert (filled["volume"][empty] == 0).all() and (filled["count"][empty] == 0).all()
+
+
+def test_empty_and_unordered_candles():
+    empty = resample_columns(*(np.empty(0) for _ in range(6)), HOUR)
+    assert all(len(empty[name]) == 0 for name in BAR_COLUMNS)
+    with pytest.raises(ValueError, match="strictly increasing"):
+        resample_columns(np.array([2, 1]), *(np.ones(2) for _ in range(5)), HOUR)
+
+
+def test_target_must_be_a_whole_multiple_of_the_base():
+    with pytest.raises(ValueError, match="whole multiple"):
+        ResampleService.resample(mock_series(10), TimeFrame.M1)
+
+
+def test_completed_bar_index_never_looks_ahead():
+    series = _gapped(1500, seed=3)
+    bars = resample_columns(*_columns(series), HOUR)
+    index = completed_bar_index(series.timestamp, timeframe_ns(series.timeframe), bars["timestamp"], HOUR)
+    candle_ends = series.timestamp + timeframe_ns(series.timeframe)
+    visible = index >= 0
+    # The bar shown has closed, and the next one has not
+    assert (bars["timestamp"][index[visible]] + HOUR <= candle_ends[visible]).all()
+    following = index + 1 < len(bars["timestamp"])
+    assert (bars["timestamp"][(index + 1)[following]] + HOUR > candle_ends[following]).all()
+    assert (np.diff(index) >= 0).all()
+
+
+@pytest.mark.parametrize("fill_gaps", [False, True])
+def test_aligned_values_only_use_earlier_candles(fill_gaps):
+    series = _gapped(400, seed=4)
+    aligned = ResampleService.aligned(series, TimeFrame.H1, fill_gaps)
+    for stop in range(1, len(series) + 1, 7):
+        prefix = ResampleService.aligned(series[:stop], TimeFrame.H1, fill_gaps)
+        for name in ("open", "high", "low", "close", "volume"):
+            np.testing.assert_array_equal(getattr(prefix, name), getattr(aligned, name)[:stop])
+
+
+def test_align_is_nan_before_the_first_bar():
+    np.testing.assert_array_equal(align([5.0, 6.0], np.array([-1, -1, 0, 1])), [np.nan, np.nan, 5.0, 6.0])
+
+
+@pytest.mark.parametrize("fill_gaps", [False, True])
+def test_extended_rollups_equal_a_full_resample(fill_gaps):
+    rng = np.random.default_rng(5)
+    for seed in range(100):
+        series = _gapped(int(rng.integers(50, 400)), seed=seed, keep=rng.uniform(0.2, 1.0))
+        cut = int(rng.integers(1, len(series)))
+        cache = RollupCache()
+        cache.rollup(series[:cut], TimeFrame.H1, fill_gaps)
+        bars = cache.rollup(series, TimeFrame.H1, fill_gaps)
+        assert cache.stats()["extensions"] == 1, seed
+        _assert_bars_equal(bars, resample_columns(*_columns(series), HOUR, fill_gaps))
+
+
+def test_rollup_cache_hits_and_keys_by_target(series):
+    cache = RollupCache()
+    first = cache.rollup(series, TimeFrame.H1)
+    assert cache.rollup(mock_series(len(series)), TimeFrame.H1) is first
+    assert not first["close"].flags.writeable
+    cache.rollup(series, TimeFrame.H1, fill_gaps=True)
+    cache.rollup(series, TimeFrame.H4)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 3)
+
+
+def test_rollup_extension_can_be_disabled(series):
+    cache = RollupCache(extend_prefixes=False)
+    cache.rollup(series[:300], TimeFrame.H1)
+    cache.rollup(series, TimeFrame.H1)
+    assert cache.stats()["extensions"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_rollup_eviction_is_lru_and_bounded(series):
+    probe = RollupCache()
+    probe.rollup(series, TimeFrame.H1)
+    entry_bytes = probe.stats()["bytes"]
+    cache = RollupCache(max_bytes=2 * entry_bytes)
+    windows = [series[:len(series) - 1], series[1:], series[2:]]
+    cache.rollup(windows[0], TimeFrame.H1)
+    cache.rollup(windows[1], TimeFrame.H1)
+    cache.rollup(windows[0], TimeFrame.H1)
+    cache.rollup(windows[2], TimeFrame.H1)
+    stats = cache.stats()
+    assert stats["evictions"] >= 1 and stats["bytes"] <= cache.max_bytes
+    cache.rollup(windows[0], TimeFrame.H1)
+    assert cache.stats()["hits"] == 2
+
+
+def test_rollup_clear_resets_stats(series):
+    cache = RollupCache()
+    cache.rollup(series, TimeFrame.H1)
+    cache.rollup(series, TimeFrame.H1)
+    cache.clear()
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["hits"], stats["misses"], stats["hit_rate"]) == (0, 0, 0, 0, 0.0)
+
+
+@pytest.mark.parametrize("rules", [
+    {"buy": 'close > on("1h", high)', "sell": 'close < on("1h", low)'},
+    {"buy": 'crosses_above(on("1h", EMA(5)), on("4h", SMA(3)))', "sell": 'on("1h", RSI(7)) > 60'},
+])
+def test_higher_timeframe_rules_match_the_per_candle_path(rules):
+    series = mock_series(700, seed=6, volatility=0.02)
+    parameters = {"rules": rules}
+    vectorized = BacktestService.signal_arrays("custom_rules", series, parameters, vectorized=True)
+    per_candle = BacktestService.signal_arrays("custom_rules", series, parameters, vectorized=False)
+    assert len(vectorized[0]) > 0
+    for fast, slow in zip(vectorized, per_candle):
+        assert fast.tolist() == slow.tolist()
@@ -0,0 +1,46 @@
+"""HTTP status mapping of the compute routes"""
+import pytest
+from tests.conftest import mock_series
+
+
+@pytest.fixture(scope="module")
+def market_data():
+    return mock_series(200).to_market_data().model_dump(mode="json")
+
+
+def test_run_backtest(client, market_data):
+    response = client.post("/api/backtest/run", json={"strategy_id": "rsi_oversold", "market_data": market_data})
+    assert response.status_code == 200
+    assert response.json()["strategy_id"] == "rsi_oversold"
+
+
+@pytest.mark.parametrize("path,body", [
+    ("/api/backtest/run", {}),
+    ("/api/backtest/optimize", {"parameter_grid": {"period": [14]}}),
+    ("/api/backtest/walk-forward", {"parameter_grid": {"period": [14]}, "train_size": 100, "test_size": 50}),
+    ("/api/strategies/execute", {}),
+])
+def test_unknown_strategy_is_404(client, market_data, path, body):
+    response = client.post(path, json={"strategy_id": "nope", "market_data": market_data, **body})
+    assert response.status_code == 404
+    assert "Unknown strategy" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("path,body", [
+    ("/api/backtest/run", {"strategy_id": "custom_rules", "parameters": {"rules": {"buy": "close >"}}}),
+    ("/api/backtest/optimize", {"strategy_id": "rsi_oversold", "parameter_grid": {"period": []}}),
+    ("/api/backtest/optimize", {"strategy_id": "rsi_oversold", "parameter_grid": {"period": [14]}, "rank_by": "luck"}),
+    ("/api/backtest/walk-forward", {
+        "strategy_id": "rsi_oversold", "parameter_grid": {"period": [14]}, "train_size": 500, "test_size": 500
+    }),
+])
+def test_invalid_input_is_400(client, market_data, path, body):
+    response = client.post(path, json={"market_data": market_data, **body})
+    assert response.status_code == 400, response.json()
+
+
+def test_unknown_stored_data_is_404(client):
+    response = client.post("/api/backtest/run", json={
+        "strategy_id": "rsi_oversold", "query": {"symbol": "MISSING", "timeframe": "5m"}
+    })
+    assert response.status_code == 404
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from services import scan_service
+from services.compute_executor import ComputeSaturatedError, ComputeTimeoutError
+from services.market_data_store import MarketDataNotFoundError
+from services.scan_service import ScanService
+from tests.conftest import mock_series
+
+STRATEGIES = [{"strategy_id": "trend_follow_ema"}, {"strategy_id": "rsi_oversold"}]
+
+
+def _source(symbol):
+    series = mock_series(120)
+    series.symbol = symbol
+
+    async def load():
+        return series
+    return (symbol, series.timeframe.value, load)
+
+
+def _missing(symbol):
+    async def load():
+        raise MarketDataNotFoundError(f"No stored candles for {symbol}")
+    return (symbol, "5m", load)
+
+
+def _scan(loaders, batch_size=2):
+    async def collect():
+        return [row async for batch in ScanService.stream(loaders, STRATEGIES, batch_size) for row in batch]
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def inline_process(monkeypatch):
+    """
+    Run process-pool jobs in the calling thread, optionally failing some
+    """
+    calls = []
+    failures = []
+
+    async def run_process(fn, *args, **kwargs):
+        calls.append(args)
+        if failures:
+            raise failures.pop(0)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(scan_service.compute_executor, "run_process", run_process)
+    monkeypatch.setattr(scan_service, "SATURATED_BACKOFF_START", 0.001)
+    return calls, failures
+
+
+def _by_symbol(rows):
+    symbols = {}
+    for row in rows:
+        symbols.setdefault(row["symbol"], []).append(row)
+    return symbols
+
+
+def test_complete_scan_has_a_row_per_symbol_and_strategy(inline_process):
+    rows = _scan([_source(f"S{i}") for i in range(5)])
+    assert len(rows) == 5 * len(STRATEGIES)
+    assert all(row["error"] is None and row["signal_type"] is not None for row in rows)
+
+
+def test_missing_series_gives_error_rows(inline_process):
+    rows = _by_symbol(_scan([_source("A"), _missing("B"), _source("C")]))
+    assert set(rows) == {"A", "B", "C"}
+    assert all(row["error"] is None for row in rows["A"] + rows["C"])
+    assert [row["strategy_id"] for row in rows["B"]] == ["trend_follow_ema", "rsi_oversold"]
+    assert all("No stored candles" in row["error"] and row["signal_type"] is None for row in rows["B"])
+
+
+@pytest.mark.parametrize("failure", [ComputeTimeoutError("Job did not finish"), RuntimeError("worker died")])
+def test_failed_batch_gives_error_rows_for_its_symbols(inline_process, failure):
+    _, failures = inline_process
+    failures.append(failure)
+    rows = _by_symbol(_scan([_source(f"S{i}") for i in range(4)]))
+    failed = {symbol for symbol, symbol_rows in rows.items() if symbol_rows[0]["error"]}
+    assert len(rows) == 4
+    assert len(failed) == 2
+    assert all(row["error"] == str(failure) for symbol in failed for row in rows[symbol])
+
+
+def test_saturated_pool_is_retried(inline_process):
+    calls, failures = inline_process
+    failures.extend(ComputeSaturatedError("busy") for _ in range(3))
+    rows = _scan([_source("A")])
+    assert len(calls) == 4
+    assert all(row["error"] is None for row in rows)
+
+
+def test_saturation_past_the_timeout_gives_error_rows(inline_process, monkeypatch):
+    _, failures = inline_process
+    failures.extend(ComputeSaturatedError("busy") for _ in range(1000))
+    monkeypatch.setattr(scan_service.compute_executor, "timeout", 0.05)
+    rows = _scan([_source("A"), _source("B")])
+    assert len(rows) == 2 * len(STRATEGIES)
+    assert all(row["error"] == "busy" for row in rows)
+
+
+def test_scan_route_reports_missing_queries(client, inline_process):
+    asyncio.run(client.app.state.market_store.ingest(mock_series(120)))
+    response = client.post("/api/strategies/scan", json={
+        "queries": [{"symbol": "TEST", "timeframe": "5m"}, {"symbol": "NONE", "timeframe": "5m"}],
+        "strategies": STRATEGIES,
+        "stream": False
+    })
+    assert response.status_code == 200
+    body = response.json()
+    rows = [dict(zip(body["columns"], row)) for row in body["rows"]]
+    errors = {row["symbol"]: row["error"] for row in rows}
+    assert errors["TEST"] is None
+    assert "No stored candles" in errors["NONE"]
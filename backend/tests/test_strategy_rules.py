@@ -0,0 +1,170 @@
+import numpy as np
+import pytest
+from models.indicator import IndicatorConfig, IndicatorType
+from models.market_data import TimeFrame
+from models.ohlcv_series import OHLCVSeries
+from services.indicator_service import IndicatorService
+from services.resample_service import ResampleService
+from services.strategy_service import StrategyService
+from utils.strategy_rules import compile_rules
+
+CLOSE = np.array([1.0, 2.0, 3.0, 2.0, 1.0, 2.0, 4.0, 3.0])
+
+DEFAULT_RULES = {
+    "buy": "crosses_above(EMA(fast), EMA(slow)) and RSI(14) < 70",
+    "sell": "crosses_below(EMA(fast), EMA(slow))"
+}
+
+
+def _evaluate(buy, sell="close < 0", parameters=None, close=CLOSE):
+    """
+    Evaluate rules over a close-only series, computing indicators directly
+    """
+    columns = {name: close for name in ("open", "high", "low", "close", "volume")}
+
+    def indicator_lines(indicator_type, period, params, timeframe):
+        config = IndicatorConfig(type=IndicatorType(indicator_type), period=period, params=params or None)
+        series = OHLCVSeries("TEST", TimeFrame.M5, np.arange(len(close), dtype=np.int64), close, close, close, close, close)
+        return IndicatorService.calculate_lines(series, config)[1]
+
+    plan = compile_rules({"buy": buy, "sell": sell})
+    return plan.evaluate(columns, parameters or {}, indicator_lines)
+
+
+@pytest.mark.parametrize("rule, message", [
+    ("close >", "Invalid buy rule"),
+    ("close + 1", "must be a condition"),
+    ("close | 1", "Unsupported expression"),
+    ("close is 1", "Unsupported comparison"),
+    ("median(close) > 1", "Unknown function"),
+    ("EMA(close) > 1", "must be numbers or parameter names"),
+    ("EMA(9, 10) > 1", "takes at most 1 arguments"),
+    ("EMA(length=9) > 1", "has no argument length"),
+    ("MACD(12, 26, 9).bogus > 0", "has no line bogus"),
+    ("abs(close, 1) > 1", "Unknown function or wrong arguments"),
+    ("crosses_above(close) ", "Unknown function or wrong arguments"),
+    ("crosses_above(close > 1, 2)", "Expected a number"),
+    ("close > 1 and close", "Expected a condition"),
+    ("prev(close, 0) > 1", "prev's n must be a positive whole number"),
+    ("prev(close, n=1.5) > 1", "prev's n must be a positive whole number"),
+    ("prev(close, 1, 2) > 1", "prev takes a series"),
+    ('on("2h", close) > 1', "on's timeframe must be one of"),
+    ("on(close) > 1", "on takes a timeframe and an expression"),
+    ('on("1h", on("4h", close)) > 1', "cannot be nested"),
+    ('on("1h", close > 1)', "Expected a number"),
+])
+def test_parse_errors(rule, message):
+    with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(".", r"\.")):
+        compile_rules({"buy": rule, "sell": "close < 0"})
+
+
+def test_rules_must_be_strings():
+    with pytest.raises(ValueError, match="must be an expression string"):
+        compile_rules({"buy": 1, "sell": "close < 0"})
+
+
+def test_comparison_and_boolean_operators():
+    outputs, _ = _evaluate("close >= 2 and not close > 3", "close < 2 or close > 3")
+    np.testing.assert_array_equal(outputs["buy"], (CLOSE >= 2) & ~(CLOSE > 3))
+    np.testing.assert_array_equal(outputs["sell"], (CLOSE < 2) | (CLOSE > 3))
+
+
+def test_chained_comparison():
+    outputs, _ = _evaluate("1 < close <= 3")
+    np.testing.assert_array_equal(outputs["buy"], (CLOSE > 1) & (CLOSE <= 3))
+
+
+def test_arithmetic_and_abs():
+    outputs, _ = _evaluate("abs(close - 3) * 2 / 1 == 2")
+    np.testing.assert_array_equal(outputs["buy"], np.abs(CLOSE - 3) == 1)
+
+
+def test_prev_shifts_and_waits_for_history():
+    outputs, _ = _evaluate("close > prev(close)")
+    # Candle 0 has no previous close
+    np.testing.assert_array_equal(outputs["buy"], [False, True, True, False, False, True, True, False])
+    outputs, _ = _evaluate("close > prev(close, n=2)")
+    np.testing.assert_array_equal(outputs["buy"], [False, False, True, False, False, False, True, True])
+
+
+def test_crossings():
+    outputs, _ = _evaluate("crosses_above(close, 2.5)", "crosses_below(close, 2.5)")
+    np.testing.assert_array_equal(outputs["buy"], [False, False, True, False, False, False, True, False])
+    np.testing.assert_array_equal(outputs["sell"], [False, False, False, True, False, False, False, False])
+
+
+def test_parameters_are_resolved_at_evaluation():
+    plan = compile_rules({"buy": "close > level", "sell": "close < 0"})
+    assert plan.parameters == ["level"]
+    for level in (1, 3):
+        outputs, _ = _evaluate("close > level", parameters={"level": level})
+        np.testing.assert_array_equal(outputs["buy"], CLOSE > level)
+    with pytest.raises(ValueError, match="Unknown parameter: level"):
+        _evaluate("close > level")
+    with pytest.raises(ValueError, match="must be a number"):
+        _evaluate("close > level", parameters={"level": "high"})
+
+
+def test_prev_of_an_indicator_waits_for_its_warmup():
+    outputs, _ = _evaluate("SMA(3) != prev(SMA(3))")
+    # SMA(3) is defined from candle 2, so its previous value from candle 3
+    assert not outputs["buy"][:3].any()
+    assert outputs["buy"][3:].all()
+
+
+def test_indicators_gate_on_lookback_and_are_reported():
+    outputs, indicators = _evaluate("close > SMA(period)", parameters={"period": 3})
+    sma = np.convolve(CLOSE, np.ones(3) / 3, mode="full")[:len(CLOSE)]
+    expected = CLOSE > sma
+    expected[:2] = False
+    np.testing.assert_array_equal(outputs["buy"], expected)
+    np.testing.assert_allclose(indicators["SMA_3"][2:], sma[2:])
+    with pytest.raises(ValueError, match="positive whole number"):
+        _evaluate("close > SMA(period)", parameters={"period": 2.5})
+
+
+def test_shared_subexpressions_are_compiled_once():
+    single = compile_rules({"buy": "EMA(9) > EMA(21)", "sell": "close < 0"})
+    shared = compile_rules({"buy": "EMA(9) > EMA(21)", "sell": "EMA(9) < EMA(21)"})
+    assert len(shared.indicators({})) == len(single.indicators({})) == 2
+
+
+def test_on_reads_the_last_closed_higher_timeframe_bar(series):
+    rules = {"buy": 'close > on("1h", close)', "sell": 'close < on("1h", SMA(3))'}
+    outputs, indicators = StrategyService._evaluate_rules(series, rules, {}, {})
+    hourly = ResampleService.aligned(series, TimeFrame.H1)
+    hourly_sma = np.asarray(IndicatorService.calculate_lines(
+        ResampleService.resample(series, TimeFrame.H1)[0],
+        IndicatorConfig(type=IndicatorType.SMA, period=3)
+    )[1]["value"])
+
+    bar_closes = np.flatnonzero(~np.isnan(hourly.close) & (hourly.close != np.r_[np.nan, hourly.close[:-1]]))
+    expected_buy = series.close > hourly.close
+    expected_buy[:bar_closes[0]] = False
+    np.testing.assert_array_equal(outputs["buy"], expected_buy)
+    # The SMA of bars only shows once the third hourly bar has closed
+    aligned_sma = indicators["SMA_3@1h"]
+    defined = np.flatnonzero(~np.isnan(aligned_sma))
+    assert defined[0] == bar_closes[2]
+    np.testing.assert_allclose(aligned_sma[bar_closes[2:]], hourly_sma[2:2 + len(bar_closes) - 2])
+    assert not outputs["sell"][:defined[0]].any()
+
+
+def test_on_with_prev_steps_by_base_candles(series):
+    rules = {"buy": 'on("1h", close) != prev(on("1h", close))', "sell": "close < 0"}
+    outputs, _ = StrategyService._evaluate_rules(series, rules, {}, {})
+    hourly = ResampleService.aligned(series, TimeFrame.H1).close
+    previous = np.r_[np.nan, hourly[:-1]]
+    # The first closed bar has no earlier bar value to differ from
+    np.testing.assert_array_equal(outputs["buy"], ~np.isnan(previous) & (hourly != previous))
+
+
+def test_custom_rules_fall_back_to_registered_defaults(series):
+    explicit = StrategyService.generate_signals(
+        "custom_rules", series, {"rules": DEFAULT_RULES, "fast": 9, "slow": 21}
+    )
+    for parameters in ({}, {"rules": DEFAULT_RULES}, {"fast": 9}):
+        signals = StrategyService.generate_signals("custom_rules", series, parameters)
+        np.testing.assert_array_equal(signals.signals, explicit.signals)
+    slower = StrategyService.generate_signals("custom_rules", series, {"slow": 50})
+    assert not np.array_equal(slower.signals, explicit.signals)
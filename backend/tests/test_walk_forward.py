@@ -0,0 +1,33 @@
+"""Walk-forward folds and their worker pools"""
+import pytest
+from services.compute_executor import ComputeSaturatedError, compute_executor
+from services.walk_forward_service import WalkForwardService, build_folds
+
+GRID = {"period": [10, 14], "oversold": [25, 30]}
+
+
+def _walk_forward(series, **kwargs):
+    return WalkForwardService.run_walk_forward("rsi_oversold", series, GRID, train_size=200, test_size=100, **kwargs)
+
+
+def test_folds_tile_the_series():
+    assert build_folds(500, 200, 100) == [(0, 200, 300), (100, 300, 400), (200, 400, 500)]
+    assert build_folds(500, 200, 100, anchored=True) == [(0, 200, 300), (0, 300, 400), (0, 400, 500)]
+    with pytest.raises(ValueError):
+        build_folds(250, 200, 100)
+
+
+def test_parallel_folds_match_single_process(series, four_cpus):
+    single = _walk_forward(series, max_workers=1)
+    parallel = _walk_forward(series, max_workers=2)
+    assert single["workers"] == 1
+    assert parallel["workers"] == 2
+    assert parallel["folds"] == single["folds"]
+    assert parallel["out_of_sample"] == single["out_of_sample"]
+
+
+def test_walk_forward_beyond_the_pool_limit_is_rejected(series, four_cpus):
+    with compute_executor.worker_pool(1):
+        with pytest.raises(ComputeSaturatedError):
+            _walk_forward(series, max_workers=2)
+    assert len(_walk_forward(series, max_workers=2)["folds"]) == 4
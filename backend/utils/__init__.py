@@ -7,6 +7,15 @@ from .technical_indicators import (
     calculate_atr,
     calculate_stochastic,
 )
+from .incremental_indicators import (
+    IncrementalSMA,
+    IncrementalEMA,
+    IncrementalRSI,
+    IncrementalMACD,
+    IncrementalBollingerBands,
+    IncrementalATR,
+    IncrementalStochastic,
+)
 
 __all__ = [
     "calculate_sma",
@@ -16,4 +25,11 @@ __all__ = [
     "calculate_bollinger_bands",
     "calculate_atr",
     "calculate_stochastic",
+    "IncrementalSMA",
+    "IncrementalEMA",
+    "IncrementalRSI",
+    "IncrementalMACD",
+    "IncrementalBollingerBands",
+    "IncrementalATR",
+    "IncrementalStochastic",
 ]
@@ -0,0 +1,244 @@
+"""
+Columnar Codec Module
+Encodes and decodes named column arrays as raw little-endian bytes, NumPy
+.npy, CSV and (when pyarrow is installed) Arrow IPC streams, without
+building a model object per row
+"""
+import io
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow IPC is optional
+    pa = None
+
+OHLCV_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+MEDIA_TYPES = {
+    "raw": "application/octet-stream",
+    "npy": "application/x-npy",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def format_from_media_type(media_type: Optional[str]) -> Optional[str]:
+    """
+    The codec format for a Content-Type header, if it names one
+    """
+    if not media_type:
+        return None
+    media_type = media_type.split(";")[0].strip().lower()
+    for fmt, known in MEDIA_TYPES.items():
+        if media_type == known:
+            return fmt
+    return None
+
+
+def _check_format(fmt: str):
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Unknown format: {fmt}")
+    if fmt == "arrow" and pa is None:
+        raise ValueError("Arrow IPC requires the pyarrow package")
+
+
+def _dtype_for(name: str) -> str:
+    return "<i8" if name == "timestamp" else "<f8"
+
+
+def encode_columns(columns: Dict[str, np.ndarray], fmt: str) -> bytes:
+    """
+    Encode equal-length columns as one ``raw``, ``npy`` or ``arrow`` payload.
+
+    ``raw`` is the columns back to back as little-endian int64 (timestamp,
+    ns since epoch) or float64, in the order given; ``npy`` is a structured
+    array with one field per column.
+    """
+    _check_format(fmt)
+    names = list(columns)
+    arrays = [np.asarray(columns[name]).astype(_dtype_for(name), copy=False) for name in names]
+
+    if fmt == "raw":
+        return b"".join(array.tobytes() for array in arrays)
+
+    if fmt == "npy":
+        records = np.empty(len(arrays[0]) if arrays else 0, dtype=[(name, _dtype_for(name)) for name in names])
+        for name, array in zip(names, arrays):
+            records[name] = array
+        buffer = io.BytesIO()
+        np.save(buffer, records, allow_pickle=False)
+        return buffer.getvalue()
+
+    if fmt == "arrow":
+        fields = [
+            pa.array(array.view("datetime64[ns]")) if name == "timestamp" else pa.array(array)
+            for name, array in zip(names, arrays)
+        ]
+        table = pa.Table.from_arrays(fields, names=names)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    raise ValueError(f"Format {fmt} cannot be encoded in one payload")
+
+
+def iter_csv(columns: Dict[str, np.ndarray], chunk_rows: int = 50_000) -> Iterator[bytes]:
+    """
+    Encode columns as CSV in chunks of ``chunk_rows`` rows. Timestamps are
+    written as ISO 8601 UTC and NaN as an empty field.
+    """
+    names = list(columns)
+    n = len(next(iter(columns.values()))) if columns else 0
+    yield (",".join(names) + "\n").encode()
+    for start in range(0, n, chunk_rows):
+        frame = pd.DataFrame({
+            name: (
+                np.datetime_as_string(np.asarray(columns[name][start:start + chunk_rows]).view("datetime64[ns]"), unit="us")
+                if name == "timestamp" else columns[name][start:start + chunk_rows]
+            )
+            for name in names
+        })
+        yield frame.to_csv(index=False, header=False).encode()
+
+
+def decode_ohlcv(payload: bytes, fmt: str) -> Dict[str, np.ndarray]:
+    """
+    Decode a ``raw``, ``npy`` or ``arrow`` payload into OHLCV columns.
+
+    A ``raw`` payload must hold the six OHLCV columns back to back in
+    ``OHLCV_COLUMNS`` order; ``npy`` and ``arrow`` payloads are matched by
+    column name.
+    """
+    _check_format(fmt)
+
+    if fmt == "raw":
+        if len(payload) % (8 * len(OHLCV_COLUMNS)):
+            raise ValueError("Raw payload length is not a multiple of six 8-byte columns")
+        n = len(payload) // (8 * len(OHLCV_COLUMNS))
+        return {
+            name: np.frombuffer(payload, dtype=_dtype_for(name), count=n, offset=i * n * 8)
+            for i, name in enumerate(OHLCV_COLUMNS)
+        }
+
+    if fmt == "npy":
+        records = np.load(io.BytesIO(payload), allow_pickle=False)
+        if records.dtype.names is None:
+            raise ValueError("The .npy payload must be a structured array with OHLCV fields")
+        return _select_ohlcv({name: records[name] for name in records.dtype.names})
+
+    if fmt == "arrow":
+        table = pa.ipc.open_stream(payload).read_all()
+        columns = {}
+        for name in table.column_names:
+            column = table.column(name).combine_chunks()
+            if pa.types.is_timestamp(column.type):
+                column = column.cast(pa.timestamp("ns"))
+                columns[name] = column.to_numpy(zero_copy_only=False).view(np.int64)
+            else:
+                columns[name] = column.to_numpy(zero_copy_only=False)
+        return _select_ohlcv(columns)
+
+    raise ValueError("CSV payloads are decoded with CSVColumnParser")
+
+
+def _select_ohlcv(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    missing = [name for name in OHLCV_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    selected = {}
+    for name in OHLCV_COLUMNS:
+        column = columns[name]
+        if name == "timestamp" and np.issubdtype(column.dtype, np.datetime64):
+            column = column.astype("datetime64[ns]").view(np.int64)
+        selected[name] = np.asarray(column, dtype=_dtype_for(name))
+    return selected
+
+
+def _epoch_scale(magnitude: np.ndarray) -> np.ndarray:
+    """
+    Nanoseconds per unit of epoch numbers, told apart by magnitude: seconds,
+    milliseconds, microseconds or nanoseconds
+    """
+    return np.select(
+        [magnitude < 1e11, magnitude < 1e14, magnitude < 1e17],
+        [10**9, 10**6, 10**3],
+        default=1
+    ).astype(np.int64)
+
+
+def _parse_timestamps(values: pd.Series) -> np.ndarray:
+    if pd.api.types.is_integer_dtype(values):
+        # Integer arithmetic keeps nanosecond epochs exact; float64 holds
+        # only 53 bits
+        numbers = values.to_numpy(dtype=np.int64)
+        return numbers * _epoch_scale(np.abs(numbers))
+    if pd.api.types.is_numeric_dtype(values):
+        # Fractional epochs: the whole units are scaled exactly and only the
+        # fraction goes through float arithmetic
+        numbers = values.to_numpy(dtype=np.float64)
+        scale = _epoch_scale(np.abs(numbers))
+        whole = np.floor(numbers)
+        fraction = np.rint((numbers - whole) * scale).astype(np.int64)
+        return whole.astype(np.int64) * scale + fraction
+    parsed = pd.to_datetime(values, utc=True, format="ISO8601")
+    return parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+class CSVColumnParser:
+    """
+    Incremental CSV parser producing OHLCV columns.
+
+    Bytes are fed as they arrive; every ``block_bytes`` of complete lines is
+    parsed with pandas' C reader and appended as column arrays, so memory
+    holds the parsed columns plus at most one block of text. The header must
+    name the OHLCV columns; timestamps may be ISO 8601 or epoch numbers.
+    """
+    def __init__(self, block_bytes: int = 4 * 1024 * 1024):
+        self.block_bytes = block_bytes
+        self.rows = 0
+        self._header: Optional[List[str]] = None
+        self._pending = bytearray()
+        self._blocks: List[Dict[str, np.ndarray]] = []
+
+    def feed(self, chunk: bytes):
+        self._pending += chunk
+        if len(self._pending) >= self.block_bytes:
+            cut = self._pending.rfind(b"\n") + 1
+            if cut:
+                self._parse(bytes(self._pending[:cut]))
+                del self._pending[:cut]
+
+    def _parse(self, text: bytes):
+        if self._header is None:
+            newline = text.find(b"\n")
+            self._header = [name.strip().lower() for name in text[:newline].decode().split(",")]
+            missing = [name for name in OHLCV_COLUMNS if name not in self._header]
+            if missing:
+                raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+            text = text[newline + 1:]
+        if not text.strip():
+            return
+        frame = pd.read_csv(io.BytesIO(text), header=None, names=self._header, usecols=list(OHLCV_COLUMNS))
+        block = {"timestamp": _parse_timestamps(frame["timestamp"])}
+        for name in OHLCV_COLUMNS[1:]:
+            block[name] = frame[name].to_numpy(dtype=np.float64)
+        self._blocks.append(block)
+        self.rows += len(frame)
+
+    def finish(self) -> Dict[str, np.ndarray]:
+        """
+        Parse any buffered text and return the concatenated columns
+        """
+        if self._pending:
+            self._parse(bytes(self._pending) + (b"" if self._pending.endswith(b"\n") else b"\n"))
+            self._pending.clear()
+        if self._header is None:
+            raise ValueError("CSV payload has no header")
+        return {
+            name: np.concatenate([block[name] for block in self._blocks])
+            if self._blocks else np.empty(0, dtype=_dtype_for(name))
+            for name in OHLCV_COLUMNS
+        }
@@ -0,0 +1,74 @@
+"""
+Downsampling Module
+Picks a few hundred representative points of a long series for charting.
+Both methods keep the first and last points and return sorted indices into
+the original series, so any aligned column can be sampled alike.
+"""
+import numpy as np
+
+
+def lttb(values: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: the interior is split into
+    ``points - 2`` buckets and each contributes the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    average, which preserves the visual shape of the line
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    # Integer arithmetic keeps bucket edges exact at any length
+    edges = 1 + np.arange(points - 1, dtype=np.int64) * (n - 2) // (points - 2)
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    # Next-bucket averages; the last bucket looks ahead to the last point
+    next_x = np.empty(points - 2)
+    next_y = np.empty(points - 2)
+    next_x[:-1] = (edges[1:-1] + edges[2:] - 1) / 2
+    next_y[:-1] = (sums[edges[2:]] - sums[edges[1:-1]]) / (edges[2:] - edges[1:-1])
+    next_x[-1], next_y[-1] = n - 1, values[-1]
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        x = np.arange(lo, hi)
+        ax, ay = previous, values[previous]
+        # Twice the triangle area; the constant factor does not change argmax
+        area = np.abs((ax - next_x[bucket]) * (values[lo:hi] - ay) - (ax - x) * (next_y[bucket] - ay))
+        previous = lo + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def _first_in_segments(mask: np.ndarray, segment: np.ndarray) -> np.ndarray:
+    """
+    Index of the first True of ``mask`` in each segment
+    """
+    hits = np.flatnonzero(mask)
+    _, first = np.unique(segment[hits], return_index=True)
+    return hits[first]
+
+
+def min_max(values: np.ndarray, points: int) -> np.ndarray:
+    """
+    Min/max decimation: the interior is split into ``(points - 2) // 2``
+    buckets and each contributes its lowest and highest point, so no peak
+    or trough (e.g. the deepest drawdown) is lost
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if points >= n:
+        return np.arange(n)
+    if points < 4:  # no room for a min/max pair between the end points
+        return lttb(values, points)
+
+    buckets = (points - 2) // 2
+    starts = np.arange(buckets, dtype=np.int64) * (n - 2) // buckets
+    interior = values[1:n - 1]
+    segment = np.repeat(np.arange(buckets), np.diff(np.append(starts, n - 2)))
+    lows = _first_in_segments(interior == np.minimum.reduceat(interior, starts)[segment], segment)
+    highs = _first_in_segments(interior == np.maximum.reduceat(interior, starts)[segment], segment)
+    return np.unique(np.concatenate(([0, n - 1], lows + 1, highs + 1)))
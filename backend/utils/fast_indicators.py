@@ -0,0 +1,367 @@
+"""
+Fast Technical Indicators Module
+NumPy kernels for the indicators in ``technical_indicators``, working on
+float64 arrays end to end and returning arrays instead of lists.
+
+Rolling sums come from block-anchored cumulative sums, rolling min/max from
+block prefix/suffix extremes (van Herk/Gil-Werman), and EMAs from a blocked
+closed form of the recursion; all are O(n) apart from rolling variances
+too small for their block's sums, which are recomputed window by window.
+The pandas functions remain the reference: results agree with them to
+within floating-point rounding (about 1e-9 relative), not bit for bit, and
+the same warm-up fills and short-input NaN rules apply.
+"""
+import math
+import numpy as np
+import pandas as pd
+from typing import Tuple, List, Union
+
+ArrayLike = Union[List[float], np.ndarray]
+
+# Window starts processed per cumulative sum; bounds the sums' magnitude
+_SUM_BLOCK = 1024
+
+# Windows whose cumulative-sum variance may be off by more than this
+# fraction are recomputed directly
+_VARIANCE_RTOL = 1e-10
+
+# Window values gathered at once when recomputing variances
+_EXACT_CHUNK = 1 << 20
+
+
+def _as_array(data: ArrayLike) -> np.ndarray:
+    return np.asarray(data, dtype=np.float64)
+
+
+def _fill(values: np.ndarray, fill: float) -> np.ndarray:
+    return np.where(np.isnan(values), fill, values)
+
+
+def _nan_windows(nan_mask: np.ndarray, window: int) -> np.ndarray:
+    """
+    For every complete window, whether it contains a NaN
+    """
+    counts = np.concatenate(([0], np.cumsum(nan_mask, dtype=np.int64)))
+    return (counts[window:] - counts[:-window]) > 0
+
+
+def _rolling_moments(data: np.ndarray, window: int, with_var: bool):
+    """
+    Mean (and sample variance) of every complete window; NaN for windows
+    holding a NaN, as pandas' ``rolling(window)`` with full min_periods.
+
+    Each block of window starts is summed about its own mean, which keeps
+    the cumulative sums small. A window whose variance is tiny next to the
+    block's squared deviations (e.g. two nearly equal prices far from the
+    block mean) would still lose digits to cancellation, so those windows
+    are recomputed in two passes.
+    """
+    n = len(data)
+    mean = np.full(n, np.nan)
+    var = np.full(n, np.nan) if with_var else None
+    if window < 1 or n < window:
+        return mean, var
+    # Bound on each window's variance error from the cumulative sums
+    var_error = np.zeros(n) if with_var else None
+
+    nan_mask = np.isnan(data)
+    starts = n - window + 1
+    for start in range(0, starts, _SUM_BLOCK):
+        stop = min(start + _SUM_BLOCK, starts)
+        segment = data[start:stop + window - 1]
+        segment_nan = nan_mask[start:stop + window - 1]
+        anchor = segment[~segment_nan].mean() if not segment_nan.all() else 0.0
+        deviations = np.where(segment_nan, 0.0, segment - anchor)
+
+        sums = np.concatenate(([0.0], np.cumsum(deviations)))
+        window_sums = sums[window:] - sums[:-window]
+        mean[start + window - 1:stop + window - 1] = anchor + window_sums / window
+
+        if with_var and window > 1:
+            squares = np.concatenate(([0.0], np.cumsum(deviations * deviations)))
+            window_squares = squares[window:] - squares[:-window]
+            variance = (window_squares - window_sums * window_sums / window) / (window - 1)
+            var[start + window - 1:stop + window - 1] = np.maximum(variance, 0.0)
+            error = 2 * np.finfo(np.float64).eps * squares[-1] / (window - 1)
+            var_error[start + window - 1:stop + window - 1] = error
+
+    # As pandas: a mean of non-negative values is >= 0, and a window of one
+    # repeated value is that value exactly (so a run of zero gains stays 0)
+    tail = mean[window - 1:]
+    negative = tail < 0
+    if negative.any():
+        negatives = np.concatenate(([0], np.cumsum(data < 0, dtype=np.int64)))
+        tail[negative & ((negatives[window:] - negatives[:-window]) == 0)] = 0.0
+    repeats = data[1:] == data[:-1]
+    if window == 1 or repeats.any():
+        changes = np.concatenate(([0], np.cumsum(~repeats, dtype=np.int64)))
+        constant = (changes[window - 1:] - changes[:n - window + 1]) == 0
+        tail[constant] = data[window - 1:][constant]
+        if with_var and window > 1:
+            var[window - 1:][constant] = 0.0
+            var_error[window - 1:][constant] = 0.0
+
+    if with_var and window > 1:
+        suspect = np.flatnonzero(var_error[window - 1:] > _VARIANCE_RTOL * var[window - 1:])
+        if len(suspect):
+            windows = np.lib.stride_tricks.sliding_window_view(data, window)
+            step = max(1, _EXACT_CHUNK // window)
+            for start in range(0, len(suspect), step):
+                chosen = suspect[start:start + step]
+                var[window - 1:][chosen] = windows[chosen].var(axis=1, ddof=1)
+
+    if nan_mask.any():
+        holes = _nan_windows(nan_mask, window)
+        mean[window - 1:][holes] = np.nan
+        if with_var:
+            var[window - 1:][holes] = np.nan
+    return mean, var
+
+
+def rolling_mean(data: ArrayLike, window: int) -> np.ndarray:
+    """
+    ``pd.Series(data).rolling(window).mean()``
+    """
+    return _rolling_moments(_as_array(data), window, with_var=False)[0]
+
+
+def rolling_std(data: ArrayLike, window: int) -> np.ndarray:
+    """
+    ``pd.Series(data).rolling(window).std()`` (sample standard deviation)
+    """
+    return np.sqrt(_rolling_moments(_as_array(data), window, with_var=True)[1])
+
+
+def _rolling_extreme(data: np.ndarray, window: int, maximum: bool) -> np.ndarray:
+    """
+    Rolling max (or min) in O(n): with blocks of ``window`` values, a window
+    is the suffix of one block plus the prefix of the next
+    """
+    n = len(data)
+    result = np.full(n, np.nan)
+    if window < 1 or n < window:
+        return result
+
+    nan_mask = np.isnan(data)
+    pad = -np.inf if maximum else np.inf
+    accumulate = np.maximum.accumulate if maximum else np.minimum.accumulate
+    combine = np.maximum if maximum else np.minimum
+
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, pad)
+    padded[:n] = np.where(nan_mask, pad, data)
+    grid = padded.reshape(blocks, window)
+    prefix = accumulate(grid, axis=1).ravel()
+    suffix = accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    result[window - 1:] = combine(suffix[:n - window + 1], prefix[window - 1:n])
+    if nan_mask.any():
+        result[window - 1:][_nan_windows(nan_mask, window)] = np.nan
+    return result
+
+
+def rolling_min(data: ArrayLike, window: int) -> np.ndarray:
+    """
+    ``pd.Series(data).rolling(window).min()``
+    """
+    return _rolling_extreme(_as_array(data), window, maximum=False)
+
+
+def rolling_max(data: ArrayLike, window: int) -> np.ndarray:
+    """
+    ``pd.Series(data).rolling(window).max()``
+    """
+    return _rolling_extreme(_as_array(data), window, maximum=True)
+
+
+def ewm(data: ArrayLike, span: int) -> np.ndarray:
+    """
+    ``pd.Series(data).ewm(span=span, adjust=False).mean()``.
+
+    Within a block, y[s+k] = r^(k+1) y[s-1] + a r^k sum_j x[s+j] r^-j with
+    a = 2 / (span + 1) and r = 1 - a, so each block is one cumulative sum;
+    the block length keeps r^-k far from overflow. Only the carry between
+    blocks is a Python loop. Series with NaN after the first value fall back
+    to pandas, whose NaN weighting this does not reproduce.
+    """
+    values = _as_array(data)
+    n = len(values)
+    result = np.full(n, np.nan)
+    finite = np.flatnonzero(~np.isnan(values))
+    if not len(finite):
+        return result
+    first = finite[0]
+    values = values[first:]
+    if np.isnan(values).any():
+        return pd.Series(data, dtype=np.float64).ewm(span=span, adjust=False).mean().to_numpy()
+
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        result[first:] = values
+        return result
+
+    block = max(1, min(len(values), int(150 * math.log(10) / -math.log(decay))))
+    blocks = -(-len(values) // block)
+    grid = np.zeros(blocks * block)
+    grid[:len(values)] = values
+    grid = grid.reshape(blocks, block)
+
+    offsets = np.arange(block)
+    growth = decay ** -offsets.astype(np.float64)
+    local = alpha * decay ** offsets * np.cumsum(grid * growth, axis=1)
+    carry_weights = decay ** (offsets + 1.0)
+
+    # y[-1] = x[0] makes y[0] = x[0], as pandas starts the recursion
+    carry = values[0]
+    out = np.empty((blocks, block))
+    for index in range(blocks):
+        out[index] = local[index] + carry_weights * carry
+        carry = out[index, -1]
+    result[first:] = out.ravel()[:len(values)]
+    return result
+
+
+def diff(data: ArrayLike) -> np.ndarray:
+    values = _as_array(data)
+    result = np.full(len(values), np.nan)
+    result[1:] = values[1:] - values[:-1]
+    return result
+
+
+def shift(data: ArrayLike) -> np.ndarray:
+    values = _as_array(data)
+    result = np.full(len(values), np.nan)
+    result[1:] = values[:-1]
+    return result
+
+
+def positive_part(data: np.ndarray) -> np.ndarray:
+    """
+    ``s.where(s > 0, 0)``: NaN becomes 0
+    """
+    return np.where(data > 0, data, 0.0)
+
+
+def negative_part(data: np.ndarray) -> np.ndarray:
+    """
+    ``-s.where(s < 0, 0)``: NaN becomes (-)0
+    """
+    return -np.where(data < 0, data, 0.0)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    # fmax skips the NaN previous close on the first row, like DataFrame.max(axis=1)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def calculate_sma(data: ArrayLike, period: int = 14) -> np.ndarray:
+    """
+    Calculate Simple Moving Average
+    """
+    if len(data) < period:
+        return np.full(len(data), np.nan)
+    return _fill(rolling_mean(data, period), 0)
+
+
+def calculate_ema(data: ArrayLike, period: int = 14) -> np.ndarray:
+    """
+    Calculate Exponential Moving Average
+    """
+    if len(data) < period:
+        return np.full(len(data), np.nan)
+    return _fill(ewm(data, period), 0)
+
+
+def calculate_rsi(data: ArrayLike, period: int = 14) -> np.ndarray:
+    """
+    Calculate Relative Strength Index
+    """
+    if len(data) < period + 1:
+        return np.full(len(data), np.nan)
+
+    delta = diff(data)
+    gain = rolling_mean(positive_part(delta), period)
+    loss = rolling_mean(negative_part(delta), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + gain / loss))
+    return _fill(rsi, 50)
+
+
+def calculate_macd(
+    data: ArrayLike,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate MACD (Moving Average Convergence Divergence)
+    Returns: (macd_line, signal_line, histogram)
+    """
+    if len(data) < slow_period:
+        empty = np.full(len(data), np.nan)
+        return empty, empty.copy(), empty.copy()
+
+    macd_line = ewm(data, fast_period) - ewm(data, slow_period)
+    signal_line = ewm(macd_line, signal_period)
+    histogram = macd_line - signal_line
+    return _fill(macd_line, 0), _fill(signal_line, 0), _fill(histogram, 0)
+
+
+def calculate_bollinger_bands(
+    data: ArrayLike,
+    period: int = 20,
+    std_dev: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate Bollinger Bands
+    Returns: (upper_band, middle_band, lower_band)
+    """
+    if len(data) < period:
+        empty = np.full(len(data), np.nan)
+        return empty, empty.copy(), empty.copy()
+
+    middle_band, var = _rolling_moments(_as_array(data), period, with_var=True)
+    std = np.sqrt(var)
+    upper_band = middle_band + (std * std_dev)
+    lower_band = middle_band - (std * std_dev)
+    return _fill(upper_band, 0), _fill(middle_band, 0), _fill(lower_band, 0)
+
+
+def calculate_atr(
+    high: ArrayLike,
+    low: ArrayLike,
+    close: ArrayLike,
+    period: int = 14
+) -> np.ndarray:
+    """
+    Calculate Average True Range
+    """
+    if len(high) < period or len(low) < period or len(close) < period:
+        return np.full(len(close), np.nan)
+
+    tr = true_range(_as_array(high), _as_array(low), shift(close))
+    return _fill(rolling_mean(tr, period), 0)
+
+
+def calculate_stochastic(
+    high: ArrayLike,
+    low: ArrayLike,
+    close: ArrayLike,
+    k_period: int = 14,
+    d_period: int = 3
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate Stochastic Oscillator
+    Returns: (%K, %D)
+    """
+    if len(high) < k_period or len(low) < k_period or len(close) < k_period:
+        empty = np.full(len(close), np.nan)
+        return empty, empty.copy()
+
+    lowest_low = rolling_min(low, k_period)
+    highest_high = rolling_max(high, k_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (_as_array(close) - lowest_low) / (highest_high - lowest_low)
+    d = rolling_mean(k, d_period)
+    return _fill(k, 50), _fill(d, 50)
@@ -0,0 +1,221 @@
+"""
+Fill Simulator
+Executes BUY/SELL signals against OHLC candles with stop-loss and
+take-profit exits detected from each candle's high and low, fees, slippage,
+short positions and pyramiding.
+
+Only the signal candles are visited in Python. Between them, an open
+position's stop and target are searched for in chunks of candles with
+array comparisons, so the cost grows with the number of signals, not with
+the number of candles.
+"""
+from typing import List, Tuple
+import numpy as np
+from models.execution import ExecutionModel, SlippageModel
+
+LONG = 1
+SHORT = -1
+
+# Why a position was closed; Fills.exit_reason holds the index into this
+EXIT_REASONS = ("signal", "stop_loss", "take_profit", "end")
+EXIT_SIGNAL, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_END = range(len(EXIT_REASONS))
+
+# Candles compared per step of the stop/target search
+_SCAN_CHUNK = 1024
+
+
+class Fills:
+    """
+    Closed lots (one per entry, so pyramided positions have several) as
+    parallel arrays, and the order log as (candle index, order side, price,
+    units, fee, lot profit or None for entries, position side, exit reason
+    or None for entries, signal confidence or None) tuples in fill order
+    """
+    __slots__ = (
+        "entry_index", "exit_index", "side", "units", "entry_price", "exit_price",
+        "fees", "profit", "exit_reason", "orders", "final_capital"
+    )
+
+    def __init__(self, lots: List[Tuple], orders: List[Tuple], final_capital: float):
+        columns = list(zip(*lots)) if lots else [()] * 9
+        self.entry_index = np.array(columns[0], dtype=np.int64)
+        self.exit_index = np.array(columns[1], dtype=np.int64)
+        self.side = np.array(columns[2], dtype=np.int8)
+        self.units = np.array(columns[3], dtype=np.float64)
+        self.entry_price = np.array(columns[4], dtype=np.float64)
+        self.exit_price = np.array(columns[5], dtype=np.float64)
+        self.fees = np.array(columns[6], dtype=np.float64)
+        self.profit = np.array(columns[7], dtype=np.float64)
+        self.exit_reason = np.array(columns[8], dtype=np.int8)
+        self.orders = orders
+        self.final_capital = final_capital
+
+    def __len__(self) -> int:
+        return len(self.profit)
+
+
+def simulate_fills(
+    open: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    signal_index: np.ndarray,
+    signal_side: np.ndarray,
+    signal_confidence: np.ndarray,
+    initial_capital: float = 10000.0,
+    position_size: float = 0.1,
+    execution: ExecutionModel = None
+) -> Fills:
+    """
+    Fill the signals at ``signal_index`` (increasing candle indices,
+    ``signal_side`` +1 for BUY and -1 for SELL) in order.
+
+    A signal in the direction of the open position adds an entry while
+    fewer than ``max_entries`` are open; the opposite signal closes the
+    position and, for BUY or with ``allow_short``, opens one its way. Each
+    entry costs ``position_size`` of the realized capital (fees paid so far
+    included). Stops and targets are set from the position's average entry
+    price and checked from the candle after the last entry. When a candle
+    reaches both, an opening gap through one of them decides; otherwise
+    the stop is assumed to fill first. Whatever is still open is closed at
+    the last close.
+
+    With the default ``ExecutionModel`` the fills are those of a long-only
+    backtest at closing prices with one position at a time.
+    """
+    execution = execution or ExecutionModel()
+    n = len(close)
+    stop_loss, take_profit = execution.stop_loss, execution.take_profit
+    fee_rate, fee_per_order = execution.fee_rate, execution.fee_per_order
+
+    def slipped(index: int, price: float, order_side: int) -> float:
+        if not execution.slippage:
+            return price
+        if execution.slippage_model == SlippageModel.PERCENT:
+            offset = price * execution.slippage
+        elif execution.slippage_model == SlippageModel.FIXED:
+            offset = execution.slippage
+        else:
+            offset = (float(high[index]) - float(low[index])) * execution.slippage
+        # Always against the order: buys pay more, sells receive less
+        return max(price + order_side * offset, 0.0)
+
+    capital = initial_capital
+    lots = []  # open entries: (entry index, units, entry price, entry fee)
+    side = 0
+    stop = target = None
+    scanned = 0  # last candle searched for the stop/target
+    exit_at = None  # (candle index, fill price, reason) once found
+    closed = []
+    orders = []
+
+    def open_lot(index: int, direction: int, confidence: float):
+        nonlocal capital, side, stop, target, scanned, exit_at
+        price = slipped(index, float(close[index]), direction)
+        units = capital * position_size / price
+        fee = fee_rate * units * price + fee_per_order
+        capital -= fee
+        lots.append((index, units, price, fee))
+        side = direction
+        orders.append((index, direction, price, units, fee, None, direction, None, confidence))
+
+        total_units = sum(lot[1] for lot in lots)
+        average = sum(lot[1] * lot[2] for lot in lots) / total_units
+        stop = average * (1 - side * stop_loss) if stop_loss else None
+        target = average * (1 + side * take_profit) if take_profit else None
+        scanned, exit_at = index, None
+
+    def close_position(index: int, price: float, reason: int, confidence=None):
+        nonlocal capital, side, stop, target, exit_at
+        order_side = -side
+        if reason != EXIT_TAKE_PROFIT:
+            price = slipped(index, price, order_side)
+        total_units = sum(lot[1] for lot in lots)
+        total_fee = 0.0
+        total_profit = 0.0
+        for entry_index, units, entry_price, entry_fee in lots:
+            exit_fee = fee_rate * units * price + fee_per_order * units / total_units
+            gross = units * price - units * entry_price
+            if side == SHORT:
+                gross = -gross
+            profit = gross - entry_fee - exit_fee
+            capital += gross - exit_fee
+            closed.append((entry_index, index, side, units, entry_price, price, entry_fee + exit_fee, profit, reason))
+            total_fee += exit_fee
+            total_profit += profit
+        orders.append((index, order_side, price, total_units, total_fee, total_profit, side, reason, confidence))
+        lots.clear()
+        side = 0
+        stop = target = exit_at = None
+
+    def find_exit(until: int):
+        """
+        Search the candles after ``scanned`` through at least ``until`` for
+        the first one reaching the stop or the target
+        """
+        nonlocal scanned, exit_at
+        while exit_at is None and scanned < until:
+            start = scanned + 1
+            end = min(n, max(until + 1, start + _SCAN_CHUNK))
+            lows, highs = low[start:end], high[start:end]
+            if side == LONG:
+                stop_hits = lows <= stop if stop is not None else None
+                target_hits = highs >= target if target is not None else None
+            else:
+                stop_hits = highs >= stop if stop is not None else None
+                target_hits = lows <= target if target is not None else None
+            if stop_hits is None:
+                hits = target_hits
+            elif target_hits is None:
+                hits = stop_hits
+            else:
+                hits = stop_hits | target_hits
+            scanned = end - 1
+            offset = int(hits.argmax())
+            if not hits[offset]:
+                continue
+
+            index = start + offset
+            candle_open = float(open[index])
+            hit_stop = stop_hits is not None and bool(stop_hits[offset])
+            hit_target = target_hits is not None and bool(target_hits[offset])
+            if hit_stop and hit_target:
+                # The open comes first: a gap through the target takes it
+                gapped_to_target = candle_open >= target if side == LONG else candle_open <= target
+                hit_stop = not gapped_to_target
+            if hit_stop:
+                # A gap through the stop fills at the (worse) open
+                price = min(candle_open, stop) if side == LONG else max(candle_open, stop)
+                exit_at = (index, price, EXIT_STOP_LOSS)
+            else:
+                price = max(candle_open, target) if side == LONG else min(candle_open, target)
+                exit_at = (index, price, EXIT_TAKE_PROFIT)
+            scanned = index
+
+    checks_levels = stop_loss is not None or take_profit is not None
+    for index, direction, confidence in zip(
+        signal_index.tolist(), signal_side.tolist(), signal_confidence.tolist()
+    ):
+        if side and checks_levels:
+            find_exit(index)
+            if exit_at is not None and exit_at[0] <= index:
+                close_position(*exit_at)
+
+        if direction == side:
+            if len(lots) < execution.max_entries and capital > 0:
+                open_lot(index, direction, confidence)
+        elif side:
+            close_position(index, float(close[index]), EXIT_SIGNAL, confidence)
+            if (direction == LONG or execution.allow_short) and capital > 0:
+                open_lot(index, direction, confidence)
+        elif (direction == LONG or execution.allow_short) and capital > 0:
+            open_lot(index, direction, confidence)
+
+    if side and checks_levels:
+        find_exit(n - 1)
+        if exit_at is not None:
+            close_position(*exit_at)
+    if side:
+        close_position(n - 1, float(close[n - 1]), EXIT_END)
+
+    return Fills(closed, orders, capital)
@@ -0,0 +1,375 @@
+"""
+Incremental (streaming) Technical Indicators
+Each calculator keeps only the running state of its indicator, so feeding one
+new candle costs O(1) amortized instead of a full re-scan of the history.
+
+After ``n`` updates, ``update`` returns the same value the batch function in
+``technical_indicators`` returns at index ``n - 1`` (warm-up entries use the
+same fill values). The rolling means and EMAs mirror pandas' window
+algorithms and agree with the batch values bit for bit; the Bollinger
+standard deviation agrees to within floating-point rounding.
+"""
+import math
+from collections import deque
+from typing import Tuple
+
+
+class _RollingMean:
+    """
+    Fixed-window mean with Kahan-compensated add/remove, as in pandas
+    ``Series.rolling(window).mean()``
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._reset()
+
+    def _reset(self):
+        self._nobs = 0
+        self._sum = 0.0
+        self._neg_ct = 0
+        self._compensation_add = 0.0
+        self._compensation_remove = 0.0
+        self._same_count = 0
+        self._prev_value = math.nan
+
+    def _add(self, value: float):
+        if math.isnan(value):
+            return
+        self._nobs += 1
+        y = value - self._compensation_add
+        t = self._sum + y
+        self._compensation_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct += 1
+        if value == self._prev_value:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev_value = value
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            return
+        self._nobs -= 1
+        y = -value - self._compensation_remove
+        t = self._sum + y
+        self._compensation_remove = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct -= 1
+
+    def push(self, value: float) -> float:
+        if self.window == 1:
+            # A one-candle window is recomputed from scratch every step
+            self._values.clear()
+            self._reset()
+        elif len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        self._add(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self._nobs < self.window:
+            return math.nan
+        if self._same_count >= self._nobs:
+            return self._prev_value
+        result = self._sum / self._nobs
+        if self._neg_ct == 0 and result < 0:
+            return 0.0
+        if self._neg_ct == self._nobs and result > 0:
+            return 0.0
+        return result
+
+
+class _RollingStd:
+    """
+    Fixed-window sample standard deviation using Welford add/remove
+    updates, as in pandas ``Series.rolling(window).std()``
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._reset()
+
+    def _reset(self):
+        self._nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._same_count = 0
+        self._prev_value = math.nan
+
+    def _add(self, value: float):
+        if math.isnan(value):
+            return
+        if value == self._prev_value:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev_value = value
+        self._nobs += 1
+        prev_mean = self._mean
+        self._mean = self._mean + (value - self._mean) / self._nobs
+        self._ssqdm = self._ssqdm + (value - prev_mean) * (value - self._mean)
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            return
+        self._nobs -= 1
+        if self._nobs:
+            prev_mean = self._mean
+            self._mean = self._mean - (value - self._mean) / self._nobs
+            self._ssqdm = self._ssqdm - (value - prev_mean) * (value - self._mean)
+        else:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+
+    def push(self, value: float) -> float:
+        if self.window == 1:
+            self._values.clear()
+            self._reset()
+        elif len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        self._add(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self._nobs < self.window or self._nobs <= 1:
+            return math.nan
+        if self._same_count >= self._nobs:
+            return 0.0
+        variance = self._ssqdm / (self._nobs - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+
+class _RollingExtreme:
+    """
+    Fixed-window minimum or maximum backed by a monotonic deque
+    """
+    def __init__(self, window: int, maximum: bool):
+        self.window = window
+        self.maximum = maximum
+        self._count = 0
+        self._deque = deque()  # (index, value), values monotonic
+
+    def push(self, value: float) -> float:
+        index = self._count
+        self._count += 1
+        if self.maximum:
+            while self._deque and self._deque[-1][1] <= value:
+                self._deque.pop()
+        else:
+            while self._deque and self._deque[-1][1] >= value:
+                self._deque.pop()
+        self._deque.append((index, value))
+        if self._deque[0][0] <= index - self.window:
+            self._deque.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self._count < self.window:
+            return math.nan
+        return self._deque[0][1]
+
+
+class _EWM:
+    """
+    Recursive exponential mean, as in pandas ``ewm(span, adjust=False)``
+    """
+    def __init__(self, span: int):
+        com = (span - 1) / 2.0
+        self._alpha = 1.0 / (1.0 + com)
+        self._old_weight = 1.0 - self._alpha
+        self.value = math.nan
+
+    def push(self, value: float) -> float:
+        weighted = self.value
+        if math.isnan(weighted):
+            self.value = value
+        elif not math.isnan(value) and weighted != value:
+            weighted = self._old_weight * weighted + self._alpha * value
+            self.value = weighted / (self._old_weight + self._alpha)
+        return self.value
+
+
+def _fill(value: float, fill: float) -> float:
+    return fill if math.isnan(value) else value
+
+
+class IncrementalSMA:
+    """
+    Streaming ``calculate_sma``
+    """
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self._mean = _RollingMean(period)
+
+    def push(self, value: float) -> float:
+        self.count += 1
+        return _fill(self._mean.push(value), 0.0)
+
+    def update(self, candle) -> float:
+        return self.push(candle.close)
+
+
+class IncrementalEMA:
+    """
+    Streaming ``calculate_ema``
+    """
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self._ewm = _EWM(period)
+
+    def push(self, value: float) -> float:
+        self.count += 1
+        return _fill(self._ewm.push(value), 0.0)
+
+    def update(self, candle) -> float:
+        return self.push(candle.close)
+
+    def resume(self, last_value: float, count: int) -> "IncrementalEMA":
+        """
+        Continue from a known EMA value after ``count`` candles; the EMA
+        recursion needs no other state
+        """
+        self._ewm.value = last_value
+        self.count = count
+        return self
+
+
+class IncrementalRSI:
+    """
+    Streaming ``calculate_rsi`` (SMA of gains and losses)
+    """
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self._prev_close = math.nan
+        self._gain = _RollingMean(period)
+        self._loss = _RollingMean(period)
+
+    def push(self, value: float) -> float:
+        self.count += 1
+        delta = value - self._prev_close
+        self._prev_close = value
+        # Mirrors delta.where(delta > 0, 0) and -delta.where(delta < 0, 0)
+        gain = self._gain.push(delta if delta > 0 else 0.0)
+        loss = self._loss.push(-(delta if delta < 0 else 0.0))
+
+        if math.isnan(gain) or math.isnan(loss):
+            return 50.0
+        if loss == 0:
+            return 50.0 if gain == 0 else 100.0
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+    def update(self, candle) -> float:
+        return self.push(candle.close)
+
+
+class IncrementalMACD:
+    """
+    Streaming ``calculate_macd``; returns (macd_line, signal_line, histogram)
+    """
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.count = 0
+        self._fast = _EWM(fast_period)
+        self._slow = _EWM(slow_period)
+        self._signal = _EWM(signal_period)
+
+    def push(self, value: float) -> Tuple[float, float, float]:
+        self.count += 1
+        macd_line = self._fast.push(value) - self._slow.push(value)
+        signal_line = self._signal.push(macd_line)
+        histogram = macd_line - signal_line
+        return _fill(macd_line, 0.0), _fill(signal_line, 0.0), _fill(histogram, 0.0)
+
+    def update(self, candle) -> Tuple[float, float, float]:
+        return self.push(candle.close)
+
+
+class IncrementalBollingerBands:
+    """
+    Streaming ``calculate_bollinger_bands``; returns (upper, middle, lower)
+    """
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.period = period
+        self.std_dev = std_dev
+        self.count = 0
+        self._mean = _RollingMean(period)
+        self._std = _RollingStd(period)
+
+    def push(self, value: float) -> Tuple[float, float, float]:
+        self.count += 1
+        middle = self._mean.push(value)
+        std = self._std.push(value)
+        upper = middle + (std * self.std_dev)
+        lower = middle - (std * self.std_dev)
+        return _fill(upper, 0.0), _fill(middle, 0.0), _fill(lower, 0.0)
+
+    def update(self, candle) -> Tuple[float, float, float]:
+        return self.push(candle.close)
+
+
+class IncrementalATR:
+    """
+    Streaming ``calculate_atr`` (SMA of true range)
+    """
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self._prev_close = math.nan
+        self._mean = _RollingMean(period)
+
+    def push(self, high: float, low: float, close: float) -> float:
+        self.count += 1
+        true_range = high - low
+        if not math.isnan(self._prev_close):
+            true_range = max(true_range, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        return _fill(self._mean.push(true_range), 0.0)
+
+    def update(self, candle) -> float:
+        return self.push(candle.high, candle.low, candle.close)
+
+
+class IncrementalStochastic:
+    """
+    Streaming ``calculate_stochastic``; returns (%K, %D)
+    """
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        self.k_period = k_period
+        self.d_period = d_period
+        self.count = 0
+        self._lowest = _RollingExtreme(k_period, maximum=False)
+        self._highest = _RollingExtreme(k_period, maximum=True)
+        self._d = _RollingMean(d_period)
+
+    def push(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        self.count += 1
+        lowest_low = self._lowest.push(low)
+        highest_high = self._highest.push(high)
+        price_range = highest_high - lowest_low
+        if math.isnan(price_range):
+            k = math.nan
+        elif price_range == 0:
+            offset = close - lowest_low
+            k = math.nan if offset == 0 else math.copysign(math.inf, offset)
+        else:
+            k = 100 * (close - lowest_low) / price_range
+        d = self._d.push(k)
+        return _fill(k, 50.0), _fill(d, 50.0)
+
+    def update(self, candle) -> Tuple[float, float]:
+        return self.push(candle.high, candle.low, candle.close)
@@ -0,0 +1,222 @@
+"""
+Indicator Graph Module
+Plans a set of indicators as a DAG of primitive series operations (diff,
+rolling mean/std/min/max, ewm, elementwise arithmetic) so that a primitive
+shared by several indicators is computed once. Each indicator is built from
+the same pandas operations as ``technical_indicators``, so its values are
+identical to the standalone function's.
+
+With the ``numpy`` backend the primitives are the ``fast_indicators``
+kernels and the graph works on arrays end to end.
+"""
+from typing import Callable, Dict, Tuple
+import numpy as np
+import pandas as pd
+from utils import fast_indicators
+
+NodeKey = Tuple
+
+# Primitive kernels by backend: (series, *node params) -> series
+_PRIMITIVES = {
+    "pandas": {
+        "diff": lambda s: s.diff(),
+        "shift": lambda s: s.shift(1),
+        "positive_part": lambda s: s.where(s > 0, 0),
+        "negative_part": lambda s: -s.where(s < 0, 0),
+        "rolling_mean": lambda s, window: s.rolling(window=window).mean(),
+        "rolling_std": lambda s, window: s.rolling(window=window).std(),
+        "rolling_min": lambda s, window: s.rolling(window=window).min(),
+        "rolling_max": lambda s, window: s.rolling(window=window).max(),
+        "ewm": lambda s, span: s.ewm(span=span, adjust=False).mean(),
+    },
+    "numpy": {
+        "diff": fast_indicators.diff,
+        "shift": fast_indicators.shift,
+        "positive_part": fast_indicators.positive_part,
+        "negative_part": fast_indicators.negative_part,
+        "rolling_mean": fast_indicators.rolling_mean,
+        "rolling_std": fast_indicators.rolling_std,
+        "rolling_min": fast_indicators.rolling_min,
+        "rolling_max": fast_indicators.rolling_max,
+        "ewm": fast_indicators.ewm,
+    },
+}
+
+
+class IndicatorOutputs:
+    """
+    Output lines of one indicator: node keys by line name, plus the
+    minimum input length and NaN fill value its standalone function uses
+    """
+    __slots__ = ("lines", "min_length", "fill")
+
+    def __init__(self, lines: Dict[str, NodeKey], min_length: int, fill: float):
+        self.lines = lines
+        self.min_length = min_length
+        self.fill = fill
+
+
+class IndicatorGraph:
+    """
+    DAG of primitive operations keyed by their inputs and parameters.
+    Adding a node that already exists returns the existing key.
+    """
+    def __init__(self, backend: str = "pandas"):
+        if backend not in _PRIMITIVES:
+            raise ValueError(f"Unknown indicator backend: {backend}")
+        self.backend = backend
+        # Insertion order is a topological order: deps are added first
+        self._nodes: Dict[NodeKey, Tuple[Callable, Tuple[NodeKey, ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _add(self, key: NodeKey, fn: Callable, *deps: NodeKey) -> NodeKey:
+        if key not in self._nodes:
+            self._nodes[key] = (fn, deps)
+        return key
+
+    def _primitive(self, name: str, src: NodeKey, *params) -> NodeKey:
+        # fn None: looked up in the backend's primitives at evaluation
+        return self._add((name, src, *params), None, src)
+
+    def column(self, name: str) -> NodeKey:
+        return self._add(("column", name), None)
+
+    def diff(self, src: NodeKey) -> NodeKey:
+        return self._primitive("diff", src)
+
+    def shift(self, src: NodeKey) -> NodeKey:
+        return self._primitive("shift", src)
+
+    def positive_part(self, src: NodeKey) -> NodeKey:
+        return self._primitive("positive_part", src)
+
+    def negative_part(self, src: NodeKey) -> NodeKey:
+        return self._primitive("negative_part", src)
+
+    def rolling_mean(self, src: NodeKey, window: int) -> NodeKey:
+        return self._primitive("rolling_mean", src, window)
+
+    def rolling_std(self, src: NodeKey, window: int) -> NodeKey:
+        return self._primitive("rolling_std", src, window)
+
+    def rolling_min(self, src: NodeKey, window: int) -> NodeKey:
+        return self._primitive("rolling_min", src, window)
+
+    def rolling_max(self, src: NodeKey, window: int) -> NodeKey:
+        return self._primitive("rolling_max", src, window)
+
+    def ewm(self, src: NodeKey, span: int) -> NodeKey:
+        return self._primitive("ewm", src, span)
+
+    def apply(self, name: str, fn: Callable, *deps: NodeKey, params: Tuple = ()) -> NodeKey:
+        """
+        Elementwise node combining ``deps`` with ``fn``; ``name`` and
+        ``params`` identify it for sharing
+        """
+        return self._add((name, *deps, *params), fn, *deps)
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> Dict[NodeKey, object]:
+        """
+        Compute every node once, in dependency order; nodes are pandas
+        Series or, with the numpy backend, arrays
+        """
+        primitives = _PRIMITIVES[self.backend]
+        results = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for key, (fn, deps) in self._nodes.items():
+                if key[0] == "column":
+                    values = np.asarray(columns[key[1]], dtype=np.float64)
+                    results[key] = pd.Series(values) if self.backend == "pandas" else values
+                elif fn is None:
+                    results[key] = primitives[key[0]](results[deps[0]], *key[2:])
+                else:
+                    results[key] = fn(*(results[dep] for dep in deps))
+        return results
+
+    @staticmethod
+    def assemble(outputs: IndicatorOutputs, results: Dict[NodeKey, object], n: int) -> Dict[str, object]:
+        """
+        Output lines of one indicator, with its short-input and NaN rules.
+        Lines are lists from the pandas backend and arrays from numpy.
+        """
+        if n < outputs.min_length:
+            return {line: [np.nan] * n for line in outputs.lines}
+        lines = {}
+        for line, key in outputs.lines.items():
+            values = results[key]
+            if isinstance(values, pd.Series):
+                lines[line] = values.fillna(outputs.fill).tolist()
+            else:
+                lines[line] = np.where(np.isnan(values), outputs.fill, values)
+        return lines
+
+
+def plan_sma(graph: IndicatorGraph, period: int = 14) -> IndicatorOutputs:
+    close = graph.column("close")
+    return IndicatorOutputs({"value": graph.rolling_mean(close, period)}, period, 0)
+
+
+def plan_ema(graph: IndicatorGraph, period: int = 14) -> IndicatorOutputs:
+    close = graph.column("close")
+    return IndicatorOutputs({"value": graph.ewm(close, period)}, period, 0)
+
+
+def plan_rsi(graph: IndicatorGraph, period: int = 14) -> IndicatorOutputs:
+    delta = graph.diff(graph.column("close"))
+    gain = graph.rolling_mean(graph.positive_part(delta), period)
+    loss = graph.rolling_mean(graph.negative_part(delta), period)
+    rsi = graph.apply("rsi", lambda g, l: 100 - (100 / (1 + g / l)), gain, loss)
+    return IndicatorOutputs({"value": rsi}, period + 1, 50)
+
+
+def plan_macd(
+    graph: IndicatorGraph,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9
+) -> IndicatorOutputs:
+    close = graph.column("close")
+    macd_line = graph.apply(
+        "sub", lambda a, b: a - b,
+        graph.ewm(close, fast_period), graph.ewm(close, slow_period)
+    )
+    signal_line = graph.ewm(macd_line, signal_period)
+    histogram = graph.apply("sub", lambda a, b: a - b, macd_line, signal_line)
+    return IndicatorOutputs(
+        {"macd": macd_line, "signal": signal_line, "histogram": histogram},
+        slow_period, 0
+    )
+
+
+def plan_bollinger_bands(graph: IndicatorGraph, period: int = 20, std_dev: float = 2.0) -> IndicatorOutputs:
+    close = graph.column("close")
+    middle = graph.rolling_mean(close, period)
+    std = graph.rolling_std(close, period)
+    upper = graph.apply("band_upper", lambda m, s: m + (s * std_dev), middle, std, params=(std_dev,))
+    lower = graph.apply("band_lower", lambda m, s: m - (s * std_dev), middle, std, params=(std_dev,))
+    return IndicatorOutputs({"upper": upper, "middle": middle, "lower": lower}, period, 0)
+
+
+def plan_atr(graph: IndicatorGraph, period: int = 14) -> IndicatorOutputs:
+    high, low = graph.column("high"), graph.column("low")
+    prev_close = graph.shift(graph.column("close"))
+    # fmax skips NaN like DataFrame.max(axis=1) on the first row
+    true_range = graph.apply(
+        "true_range",
+        lambda h, l, p: np.fmax(np.fmax(h - l, abs(h - p)), abs(l - p)),
+        high, low, prev_close
+    )
+    return IndicatorOutputs({"value": graph.rolling_mean(true_range, period)}, period, 0)
+
+
+def plan_stochastic(graph: IndicatorGraph, k_period: int = 14, d_period: int = 3) -> IndicatorOutputs:
+    lowest_low = graph.rolling_min(graph.column("low"), k_period)
+    highest_high = graph.rolling_max(graph.column("high"), k_period)
+    k = graph.apply(
+        "stochastic_k",
+        lambda c, ll, hh: 100 * (c - ll) / (hh - ll),
+        graph.column("close"), lowest_low, highest_high
+    )
+    return IndicatorOutputs({"k": k, "d": graph.rolling_mean(k, d_period)}, k_period, 50)
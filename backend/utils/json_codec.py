@@ -0,0 +1,132 @@
+"""
+JSON Codec Module
+Serializes responses with orjson (when installed): NumPy arrays are written
+directly, models built by the server are dumped without re-validation, and
+NaN/Infinity always become null
+"""
+import json
+import math
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict
+import numpy as np
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder is the fallback
+    orjson = None
+
+# Keys of the compact columnar JSON shape
+COMPACT_KEYS = {
+    "timestamp": "t",
+    "open": "o",
+    "high": "h",
+    "low": "l",
+    "close": "c",
+    "volume": "v",
+}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        # Fields as set: server-built models (often ``model_construct``ed)
+        # are trusted rather than validated again
+        return dict(value)
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in "fiub":
+            return np.ascontiguousarray(value)
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _plain(value: Any) -> Any:
+    """
+    ``value`` as plain JSON types for the standard library encoder, with
+    non-finite floats as None
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            return np.where(np.isfinite(value), value, None).tolist()
+        return value.tolist()
+    if isinstance(value, Enum):
+        return _plain(value.value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (BaseModel, np.generic)):
+        return _plain(_default(value))
+    return value
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode ``content`` as compact JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(_plain(content), separators=(",", ":"), allow_nan=False).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded by ``dumps``. Returned from a route, it also
+    bypasses the ``response_model`` validation FastAPI would otherwise run.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def compact_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Columns keyed for the compact shape ``{"t": [...], "o": [...], ...}``:
+    OHLCV columns get one-letter keys, others keep their names, and
+    timestamps become epoch milliseconds (exact in JavaScript numbers)
+    """
+    compact = {}
+    for name, column in columns.items():
+        if name == "timestamp":
+            column = np.asarray(column, dtype=np.int64) // 1_000_000
+        compact[COMPACT_KEYS.get(name, name)] = column
+    return compact
+
+
+def market_data_content(series) -> Dict[str, Any]:
+    """
+    The ``MarketData`` JSON of an ``OHLCVSeries``, built from its columns
+    without an ``OHLCV`` model per candle
+    """
+    timestamps = series.timestamp.astype("datetime64[ns]")
+    whole_seconds = not (series.timestamp % 1_000_000_000).any()
+    iso = np.datetime_as_string(timestamps, unit="s" if whole_seconds else "us").tolist()
+    data = [
+        {"timestamp": ts, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for ts, o, h, l, c, v in zip(
+            iso,
+            series.open.tolist(),
+            series.high.tolist(),
+            series.low.tolist(),
+            series.close.tolist(),
+            series.volume.tolist(),
+        )
+    ]
+    return {
+        "symbol": series.symbol,
+        "timeframe": series.timeframe.value,
+        "data": data,
+        "last_updated": series.last_updated,
+    }
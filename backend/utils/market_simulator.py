@@ -0,0 +1,212 @@
+"""
+Market Simulator
+Vectorized mock OHLCV generation from a seeded ``numpy.random.Generator``.
+
+Log returns follow geometric Brownian motion, with ``drift`` as the mean
+log return so the median price does not decay. The volatility can cluster
+(GARCH(1,1)), switch between a calm and a turbulent regime, and prices can
+jump (compound Poisson, applied as an opening gap). Highs and lows are drawn
+from the exact range of a Brownian bridge between open and close, so every
+candle is consistent (low <= open, close <= high).
+
+Candles are produced in fixed blocks of ``_BLOCK``: the values depend only on
+the seed and the model, never on how many candles are requested at a time,
+so streamed chunks concatenate to exactly the one-shot series.
+"""
+import math
+from typing import Dict, Iterator, Optional
+import numpy as np
+from models.market_data import MockMarketModel, VolatilityModel
+
+# Candles simulated per step of every random stream
+_BLOCK = 8192
+# GARCH steps solved per closed-form row; bounds the exponents to ~±500
+_GARCH_ROW = 32
+_MIN_GARCH_FACTOR = 1e-6
+
+
+def _garch_variance(
+    shocks: np.ndarray,
+    previous_variance: float,
+    previous_shock: float,
+    omega: float,
+    alpha: float,
+    beta: float
+) -> np.ndarray:
+    """
+    ``v[t] = omega + (alpha * z[t-1]**2 + beta) * v[t-1]``.
+
+    The recursion is linear in ``v`` with random factors, so within a row
+    v[k] = F[k] * (v[-1] + omega * sum_j 1 / F[j]) where F are the running
+    products of the factors, taken in log space. Only the carry between rows
+    is a Python loop.
+    """
+    n = len(shocks)
+    factors = alpha * np.concatenate(([previous_shock], shocks[:-1])) ** 2 + beta
+    rows = -(-n // _GARCH_ROW)
+    grid = np.ones(rows * _GARCH_ROW)
+    grid[:n] = np.maximum(factors, _MIN_GARCH_FACTOR)
+    log_products = np.cumsum(np.log(grid.reshape(rows, _GARCH_ROW)), axis=1)
+    products = np.exp(log_products)
+    local = products * omega * np.cumsum(np.exp(-log_products), axis=1)
+
+    carries = np.empty(rows)
+    carry = previous_variance
+    for row, (product, offset) in enumerate(zip(products[:, -1].tolist(), local[:, -1].tolist())):
+        carries[row] = carry
+        carry = product * carry + offset
+    return (local + products * carries[:, None]).ravel()[:n]
+
+
+class MarketSimulator:
+    """
+    Stateful candle generator: each ``take`` continues the series where the
+    previous call stopped.
+
+    ``start_ns`` is the first candle's timestamp and ``step_ns`` the candle
+    spacing, both in nanoseconds since the Unix epoch. Prices are rounded to
+    ``decimals`` places, never below one tick (None keeps full precision).
+    """
+
+    def __init__(
+        self,
+        model: Optional[MockMarketModel] = None,
+        seed: Optional[int] = None,
+        base_price: float = 50000.0,
+        start_ns: int = 0,
+        step_ns: int = 300 * 10**9,
+        decimals: Optional[int] = 2
+    ):
+        self.model = model or MockMarketModel()
+        self.step_ns = int(step_ns)
+        self.decimals = decimals
+        # One stream per component: enabling jumps or regimes leaves the
+        # diffusive path of the same seed unchanged
+        streams = np.random.SeedSequence(seed).spawn(4)
+        self._shocks, self._bars, self._regimes, self._jumps = (
+            np.random.default_rng(stream) for stream in streams
+        )
+
+        self._next_ns = int(start_ns)
+        self._log_close = math.log(base_price)
+        self._variance = self.model.volatility ** 2
+        self._previous_shock = 0.0
+        self._regime = 0
+        self._regime_left = 0
+        self._buffer: Dict[str, np.ndarray] = {}
+        self._buffered = 0
+
+    def _regime_path(self, n: int) -> np.ndarray:
+        """
+        Turbulent (True) or calm per candle: run lengths of a two-state
+        Markov chain are geometric, so whole runs are drawn at once
+        """
+        model = self.model
+        switch = (model.calm_to_turbulent, model.turbulent_to_calm)
+        regimes = np.empty(n, dtype=bool)
+        filled = 0
+        while filled < n:
+            if self._regime_left == 0:
+                self._regime_left = int(self._regimes.geometric(switch[self._regime]))
+            run = min(self._regime_left, n - filled)
+            regimes[filled:filled + run] = bool(self._regime)
+            filled += run
+            self._regime_left -= run
+            if self._regime_left == 0:
+                self._regime = 1 - self._regime
+        return regimes
+
+    def _block(self, n: int) -> Dict[str, np.ndarray]:
+        model = self.model
+        shocks = self._shocks.standard_normal(n)
+
+        if model.volatility_model == VolatilityModel.GARCH:
+            omega = model.volatility ** 2 * (1 - model.garch_alpha - model.garch_beta)
+            variance = _garch_variance(
+                shocks, self._variance, self._previous_shock,
+                omega, model.garch_alpha, model.garch_beta
+            )
+            self._variance = float(variance[-1])
+            self._previous_shock = float(shocks[-1])
+            sigma = np.sqrt(variance)
+        else:
+            sigma = np.full(n, model.volatility)
+        if model.regime_switching:
+            sigma = np.where(self._regime_path(n), sigma * model.turbulent_multiplier, sigma)
+
+        # Close-to-open gaps from jumps; the sum of k normal jumps is normal
+        gaps = np.zeros(n)
+        if model.jump_intensity > 0:
+            counts = self._jumps.poisson(model.jump_intensity, n)
+            gaps = counts * model.jump_mean + np.sqrt(counts) * model.jump_std * self._jumps.standard_normal(n)
+
+        diffusion = model.drift + sigma * shocks
+        log_close = self._log_close + np.cumsum(gaps + diffusion)
+        log_open = log_close - diffusion
+        self._log_close = float(log_close[-1])
+
+        # Maximum and minimum of a Brownian bridge from open to close:
+        # (x + y +- sqrt((y - x)^2 - 2 s^2 log U)) / 2 with U uniform on (0, 1]
+        uniforms = 1.0 - self._bars.random((2, n))
+        spread = diffusion * diffusion - 2 * sigma * sigma * np.log(uniforms)
+        midpoint = log_open + log_close
+        log_high = 0.5 * (midpoint + np.sqrt(spread[0]))
+        log_low = 0.5 * (midpoint - np.sqrt(spread[1]))
+
+        # Volume grows with the size of the move
+        volume = model.base_volume * (0.5 + 0.5 * np.abs(shocks)) * np.exp(
+            0.3 * self._bars.standard_normal(n) - 0.045
+        )
+
+        timestamp = self._next_ns + self.step_ns * np.arange(n, dtype=np.int64)
+        self._next_ns += self.step_ns * n
+        columns = {
+            "timestamp": timestamp,
+            "open": np.exp(log_open),
+            "high": np.exp(log_high),
+            "low": np.exp(log_low),
+            "close": np.exp(log_close),
+            "volume": volume,
+        }
+        if self.decimals is not None:
+            tick = 10.0 ** -self.decimals
+            for name in ("open", "high", "low", "close", "volume"):
+                columns[name] = np.maximum(np.round(columns[name], self.decimals), tick)
+        return columns
+
+    def take(self, n: int) -> Dict[str, np.ndarray]:
+        """
+        The next ``n`` candles as columns (timestamp, open, high, low, close,
+        volume)
+        """
+        parts = [self._buffer] if self._buffered else []
+        available = self._buffered
+        while available < n:
+            block = self._block(_BLOCK)
+            parts.append(block)
+            available += _BLOCK
+        if not parts:
+            empty = {name: np.empty(0) for name in ("open", "high", "low", "close", "volume")}
+            return {"timestamp": np.empty(0, dtype=np.int64), **empty}
+
+        columns = {
+            name: np.concatenate([part[name] for part in parts]) if len(parts) > 1 else parts[0][name]
+            for name in parts[0]
+        }
+        self._buffer = {name: column[n:] for name, column in columns.items()}
+        self._buffered = available - n
+        return {name: column[:n] for name, column in columns.items()}
+
+    def chunks(self, num_candles: Optional[int] = None, chunk_size: int = 100_000) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Successive chunks of at most ``chunk_size`` candles; endless when
+        ``num_candles`` is None
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        remaining = num_candles
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            yield self.take(size)
+            if remaining is not None:
+                remaining -= size
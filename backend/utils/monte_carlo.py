@@ -0,0 +1,116 @@
+"""
+Monte Carlo Module
+Robustness of a backtest under resampled trade sequences. Trade returns
+are laid out as a (resamples x trades) matrix and compounded in log space,
+so final capital, the deepest drawdown and ruin of every resample come
+from a few array reductions.
+"""
+from typing import Dict, Iterator
+import numpy as np
+from models.monte_carlo import MonteCarloConfig, MonteCarloMode
+
+# Matrix cells per batch of resamples; bounds memory at ~64 MB per array
+_BATCH_CELLS = 8_000_000
+
+
+def trade_returns(profits: np.ndarray, initial_capital: float) -> np.ndarray:
+    """
+    Each trade's profit as a fraction of the capital before it, with
+    trades settling in order
+    """
+    profits = np.asarray(profits, dtype=np.float64)
+    capital_before = initial_capital + np.concatenate(([0.0], np.cumsum(profits)[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(capital_before > 0, profits / capital_before, -1.0)
+    return np.maximum(returns, -1.0)
+
+
+def _resampled(log_returns: np.ndarray, rows: int, config: MonteCarloConfig, rng: np.random.Generator) -> np.ndarray:
+    trades = len(log_returns)
+    if config.mode == MonteCarloMode.BOOTSTRAP:
+        return log_returns[rng.integers(0, trades, size=(rows, trades), dtype=np.int32)]
+    if config.mode == MonteCarloMode.RESHUFFLE:
+        return rng.permuted(np.broadcast_to(log_returns, (rows, trades)), axis=1)
+    kept = rng.random((rows, trades), dtype=np.float32) >= config.skip_probability
+    return np.where(kept, log_returns, 0.0)
+
+
+def _batches(returns: np.ndarray, config: MonteCarloConfig) -> Iterator[np.ndarray]:
+    """
+    Log equity paths (relative to the initial capital) of the resamples,
+    in batches of rows
+    """
+    rng = np.random.default_rng(config.seed)
+    rows = max(1, _BATCH_CELLS // max(len(returns), 1))
+    # A return of -1 wipes the account: log equity -inf from there on
+    with np.errstate(divide="ignore"):
+        log_returns = np.log1p(returns)
+    for start in range(0, config.resamples, rows):
+        paths = _resampled(log_returns, min(rows, config.resamples - start), config, rng)
+        yield np.cumsum(paths, axis=1, out=paths)
+
+
+def _distribution(values: np.ndarray, config: MonteCarloConfig) -> Dict:
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        finite = np.zeros(1)
+    low, high = float(finite.min()), float(finite.max())
+    if high - low <= 1e-9 * max(abs(low), 1.0):
+        # All equal up to rounding (e.g. the final capital of reshuffles)
+        low, high = low - 0.5, high + 0.5
+    counts, edges = np.histogram(finite, bins=config.bins, range=(low, high))
+    return {
+        "mean": float(finite.mean()),
+        "std": float(finite.std()),
+        "min": float(finite.min()),
+        "max": float(finite.max()),
+        "percentiles": {
+            f"{p:g}": float(value)
+            for p, value in zip(config.percentiles, np.percentile(finite, config.percentiles))
+        },
+        "histogram": {"edges": edges, "counts": counts},
+    }
+
+
+def run_monte_carlo(returns: np.ndarray, initial_capital: float, config: MonteCarloConfig) -> Dict:
+    """
+    Distributions of final capital and maximum drawdown (percent of the
+    running peak, starting from the initial capital) over the resamples,
+    and the probability of ruin: equity reaching ``1 - ruin_drawdown``
+    times the initial capital at any point of a sequence.
+    """
+    returns = np.maximum(np.asarray(returns, dtype=np.float64), -1.0)
+    if any(not 0 <= p <= 100 for p in config.percentiles):
+        raise ValueError("percentiles must be between 0 and 100")
+
+    final = np.empty(config.resamples)
+    drawdown = np.empty(config.resamples)
+    ruined = np.empty(config.resamples, dtype=bool)
+    ruin_level = np.log1p(-config.ruin_drawdown) if config.ruin_drawdown < 1 else -np.inf
+    row = 0
+    for paths in _batches(returns, config):
+        rows = len(paths)
+        if paths.shape[1] == 0:
+            paths = np.zeros((rows, 1))
+        lowest = paths.min(axis=1)
+        final[row:row + rows] = paths[:, -1]
+        ruined[row:row + rows] = lowest <= ruin_level
+        # Deepest fall from a running peak; the initial capital (0) is the
+        # first peak, which the -lowest term covers
+        peaks = np.maximum.accumulate(paths, axis=1)
+        with np.errstate(invalid="ignore"):
+            np.subtract(peaks, paths, out=peaks)
+            deepest = np.fmax(np.fmax.reduce(peaks, axis=1), -lowest)
+        drawdown[row:row + rows] = -np.expm1(-deepest)
+        row += rows
+
+    return {
+        "mode": config.mode.value,
+        "resamples": config.resamples,
+        "trades": len(returns),
+        "final_capital": _distribution(initial_capital * np.exp(final), config),
+        "max_drawdown_percent": _distribution(drawdown * 100, config),
+        "ruin_probability": float(ruined.mean()),
+        "ruin_capital": initial_capital * (1 - config.ruin_drawdown),
+        "profitable_probability": float((final > 0).mean()),
+    }
@@ -0,0 +1,109 @@
+"""
+Resampling Module
+Rolls base candles up into a coarser timeframe with vectorized group
+reductions (first open, max high, min low, last close, summed volume), and
+maps higher-timeframe bars back onto the base candles without look-ahead.
+
+Bars are aligned to multiples of the bar length since the Unix epoch (so D1
+bars start at 00:00 UTC) and stamped with their opening time.
+"""
+from typing import Dict
+import numpy as np
+
+BAR_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume", "count")
+
+
+def resample_columns(
+    timestamp: np.ndarray,
+    open: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    bar_ns: int,
+    fill_gaps: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Bars of ``bar_ns`` nanoseconds from candles with strictly increasing
+    timestamps. ``count`` is the number of candles in each bar, so bars
+    with missing base candles can be told apart.
+
+    Bars no candle falls into are left out, or with ``fill_gaps`` written
+    as flat bars at the previous close with zero volume and count.
+    """
+    timestamp = np.asarray(timestamp, dtype=np.int64)
+    if len(timestamp) == 0:
+        empty = {name: np.empty(0) for name in BAR_COLUMNS}
+        empty["timestamp"] = np.empty(0, dtype=np.int64)
+        empty["count"] = np.empty(0, dtype=np.int64)
+        return empty
+    if np.any(timestamp[1:] <= timestamp[:-1]):
+        raise ValueError("Candle timestamps must be strictly increasing to resample")
+
+    bars = timestamp // bar_ns * bar_ns
+    starts = np.flatnonzero(np.r_[True, bars[1:] != bars[:-1]])
+    stops = np.r_[starts[1:], len(timestamp)]
+    columns = {
+        "timestamp": bars[starts],
+        "open": np.asarray(open, dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(np.asarray(high, dtype=np.float64), starts),
+        "low": np.minimum.reduceat(np.asarray(low, dtype=np.float64), starts),
+        "close": np.asarray(close, dtype=np.float64)[stops - 1],
+        "volume": np.add.reduceat(np.asarray(volume, dtype=np.float64), starts),
+        "count": stops - starts,
+    }
+    if fill_gaps:
+        columns = _fill_gaps(columns, bar_ns)
+    return columns
+
+
+def _fill_gaps(columns: Dict[str, np.ndarray], bar_ns: int) -> Dict[str, np.ndarray]:
+    first = columns["timestamp"][0]
+    slots = (columns["timestamp"] - first) // bar_ns
+    total = int(slots[-1]) + 1
+    if total == len(slots):
+        return columns
+
+    # Each empty slot repeats the close of the last bar before it
+    occupied = np.zeros(total, dtype=np.int64)
+    occupied[slots] = 1
+    carried_close = columns["close"][np.cumsum(occupied) - 1]
+
+    filled = {
+        "timestamp": first + bar_ns * np.arange(total, dtype=np.int64),
+        "volume": np.zeros(total),
+        "count": np.zeros(total, dtype=np.int64),
+    }
+    for name in ("open", "high", "low", "close"):
+        filled[name] = carried_close.copy()
+    for name in ("open", "high", "low", "close", "volume", "count"):
+        filled[name][slots] = columns[name]
+    return filled
+
+
+def completed_bar_index(
+    base_timestamp: np.ndarray,
+    base_ns: int,
+    bar_timestamp: np.ndarray,
+    bar_ns: int
+) -> np.ndarray:
+    """
+    For every base candle, the index of the last bar that had closed when
+    that candle closed (-1 before the first). A bar is never visible from
+    the candles it is built from, except the one that completes it.
+    """
+    bar_ends = np.asarray(bar_timestamp, dtype=np.int64) + bar_ns
+    candle_ends = np.asarray(base_timestamp, dtype=np.int64) + base_ns
+    return np.searchsorted(bar_ends, candle_ends, side="right") - 1
+
+
+def align(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """
+    Bar ``values`` spread over the base candles by ``completed_bar_index``;
+    NaN where no bar has closed yet
+    """
+    values = np.asarray(values, dtype=np.float64)
+    aligned = np.full(len(index), np.nan)
+    visible = index >= 0
+    aligned[visible] = values[index[visible]]
+    return aligned
@@ -0,0 +1,58 @@
+"""
+Risk Metrics Module
+Per-candle drawdown and the risk-adjusted ratios of an equity curve,
+computed with array reductions over the whole curve
+"""
+from typing import Dict
+import numpy as np
+
+
+def drawdown(equity: np.ndarray) -> np.ndarray:
+    """
+    Fall of each candle's equity below its running peak, as a fraction of
+    the peak (0 at new highs)
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    peaks = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peaks > 0, 1.0 - equity / peaks, 0.0)
+
+
+def risk_metrics(equity: np.ndarray, in_market: np.ndarray, periods_per_year: float) -> Dict:
+    """
+    Sharpe and Sortino ratios of the per-candle returns (risk-free rate 0),
+    annualized with ``periods_per_year``; the Calmar ratio (annualized
+    return over maximum drawdown); the maximum drawdown; and exposure, the
+    share of candles with a position open.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    n = len(equity)
+    max_drawdown = float(drawdown(equity).max()) if n else 0.0
+
+    sharpe = sortino = calmar = 0.0
+    if n > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.where(equity[:-1] > 0, np.diff(equity) / equity[:-1], 0.0)
+        mean = returns.mean()
+        std = returns.std()
+        downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+        scale = np.sqrt(periods_per_year)
+        if std > 0:
+            sharpe = float(mean / std * scale)
+        if downside > 0:
+            sortino = float(mean / downside * scale)
+
+        years = (n - 1) / periods_per_year
+        growth = equity[-1] / equity[0] if equity[0] > 0 else 0.0
+        with np.errstate(over="ignore"):
+            annual_return = growth ** (1 / years) - 1 if growth > 0 else -1.0
+        if max_drawdown > 0:
+            calmar = float(annual_return / max_drawdown)
+
+    return {
+        "max_drawdown_percent": round(max_drawdown * 100, 2),
+        "sharpe_ratio": round(sharpe, 2),
+        "sortino_ratio": round(sortino, 2),
+        "calmar_ratio": round(calmar, 2),
+        "exposure_percent": round(float(np.mean(in_market)) * 100, 2) if n else 0.0,
+    }
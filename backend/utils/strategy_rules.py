@@ -0,0 +1,421 @@
+"""
+Strategy Rules Module
+Parses rule expressions such as
+``crosses_above(EMA(9), EMA(21)) and RSI(14) < 70`` once into a plan of
+NumPy array operations that evaluates a rule for every candle at once.
+
+Grammar (a subset of Python expressions):
+  - price columns: ``open``, ``high``, ``low``, ``close``, ``volume``
+  - indicators: ``SMA(period)``, ``EMA(period)``, ``RSI(period)``,
+    ``ATR(period)``, ``MACD(fast_period, slow_period, signal_period)``,
+    ``BB(period, std_dev)``, ``STOCH(k_period, d_period)``; other output
+    lines by attribute, e.g. ``MACD(12, 26, 9).signal`` or ``BB(20, 2).upper``
+  - ``crosses_above(a, b)``, ``crosses_below(a, b)``, ``prev(x, n=1)``,
+    ``abs(x)``
+  - ``on("1h", x)``: price columns and indicators inside ``x`` are read
+    from a higher timeframe, showing on each candle the last bar closed by
+    then (``prev`` and crossings inside still step by base candles)
+  - numbers, ``+ - * /``, comparisons (chainable), ``and``, ``or``, ``not``
+  - any other name is a strategy parameter, resolved when the plan is
+    evaluated, so one compiled rule serves a whole parameter sweep
+"""
+import ast
+import operator
+from functools import lru_cache, reduce
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from models.market_data import TimeFrame
+
+NodeKey = Tuple
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# name: (indicator type, arguments with defaults, output lines; the first is the default)
+INDICATOR_FUNCTIONS = {
+    "SMA": ("sma", (("period", 14),), ("value",)),
+    "EMA": ("ema", (("period", 14),), ("value",)),
+    "RSI": ("rsi", (("period", 14),), ("value",)),
+    "ATR": ("atr", (("period", 14),), ("value",)),
+    "MACD": (
+        "macd",
+        (("fast_period", 12), ("slow_period", 26), ("signal_period", 9)),
+        ("macd", "signal", "histogram")
+    ),
+    "BB": ("bollinger_bands", (("period", 20), ("std_dev", 2.0)), ("middle", "upper", "lower")),
+    "STOCH": ("stochastic", (("k_period", 14), ("d_period", 3)), ("k", "d")),
+}
+
+_ARITHMETIC = {
+    ast.Add: ("add", operator.add),
+    ast.Sub: ("sub", operator.sub),
+    ast.Mult: ("mul", operator.mul),
+    ast.Div: ("div", operator.truediv),
+}
+
+_COMPARISONS = {
+    ast.Lt: ("lt", operator.lt),
+    ast.LtE: ("le", operator.le),
+    ast.Gt: ("gt", operator.gt),
+    ast.GtE: ("ge", operator.ge),
+    ast.Eq: ("eq", operator.eq),
+    ast.NotEq: ("ne", operator.ne),
+}
+
+_OPERATORS = {name: fn for name, fn in list(_ARITHMETIC.values()) + list(_COMPARISONS.values())}
+
+
+def _timeframe_of(key: NodeKey):
+    """
+    Timeframe of a column or indicator node inside ``on(...)``, else None
+    """
+    position = 2 if key[0] == "column" else 4
+    return key[position] if len(key) > position else None
+
+
+def _shift(values, n: int):
+    """
+    ``values`` delayed by ``n`` candles, NaN where there is no earlier candle
+    """
+    if np.ndim(values) == 0:
+        return values
+    shifted = np.full(len(values), np.nan)
+    if n < len(values):
+        shifted[n:] = values[:len(values) - n]
+    return shifted
+
+
+def _indicator_spec(function: str, arguments: Dict) -> Tuple[str, str, int, Dict, int]:
+    """
+    (name, indicator type, period, params, minimum candles) of an indicator
+    call with resolved arguments. Names follow ``IndicatorService``'s.
+    """
+    def whole(name):
+        value = arguments[name]
+        if value != int(value) or value < 1:
+            raise ValueError(f"{function} {name} must be a positive whole number, got {value}")
+        return int(value)
+
+    if function in ("SMA", "EMA", "RSI", "ATR"):
+        period = whole("period")
+        minimum = period + 1 if function == "RSI" else period
+        return f"{function}_{period}", INDICATOR_FUNCTIONS[function][0], period, {}, minimum
+    if function == "MACD":
+        fast, slow, signal = whole("fast_period"), whole("slow_period"), whole("signal_period")
+        params = {"fast_period": fast, "slow_period": slow, "signal_period": signal}
+        return f"MACD_{fast}_{slow}_{signal}", "macd", 14, params, slow
+    if function == "BB":
+        period, std_dev = whole("period"), float(arguments["std_dev"])
+        return f"BB_{period}_{std_dev}", "bollinger_bands", period, {"std_dev": std_dev}, period
+    k_period, d_period = whole("k_period"), whole("d_period")
+    params = {"k_period": k_period, "d_period": d_period}
+    return f"STOCH_{k_period}_{d_period}", "stochastic", 14, params, k_period
+
+
+class RulePlan:
+    """
+    Compiled rules sharing one DAG of array operations. Nodes are keyed by
+    their inputs, so a subexpression used by several rules (an EMA in both
+    the buy and the sell rule) is evaluated once.
+    """
+    def __init__(self):
+        # Insertion order is a topological order: deps are added first
+        self._nodes: Dict[NodeKey, str] = {}  # key -> "bool" or "number"
+        self.roots: Dict[str, NodeKey] = {}
+        self.parameters: List[str] = []
+        self.timeframes: List[str] = []
+        self._timeframe = None  # set while visiting the inside of on(...)
+
+    def _add(self, key: NodeKey, kind: str) -> NodeKey:
+        self._nodes.setdefault(key, kind)
+        return key
+
+    def compile(self, name: str, expression: str, kind: str):
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid {name} rule: {e.msg}")
+        key = self._visit(tree.body)
+        if self._nodes[key] != kind:
+            raise ValueError(f"The {name} rule must be a {'condition' if kind == 'bool' else 'number'}")
+        self.roots[name] = key
+
+    def _expect(self, node: ast.AST, kind: str) -> NodeKey:
+        key = self._visit(node)
+        if self._nodes[key] != kind:
+            expected = "a condition" if kind == "bool" else "a number"
+            raise ValueError(f"Expected {expected} at: {ast.unparse(node)}")
+        return key
+
+    def _scalar(self, node: ast.AST) -> NodeKey:
+        key = self._visit(node)
+        if key[0] not in ("const", "param"):
+            raise ValueError(f"Indicator arguments must be numbers or parameter names: {ast.unparse(node)}")
+        return key
+
+    def _visit(self, node: ast.AST) -> NodeKey:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return self._add(("const", float(node.value)), "number")
+
+        if isinstance(node, ast.Name):
+            if node.id in PRICE_COLUMNS:
+                return self._add(("column", node.id, *self._context()), "number")
+            if node.id not in self.parameters:
+                self.parameters.append(node.id)
+            return self._add(("param", node.id), "number")
+
+        if isinstance(node, ast.UnaryOp):
+            if isinstance(node.op, ast.Not):
+                return self._add(("not", self._expect(node.operand, "bool")), "bool")
+            if isinstance(node.op, ast.USub):
+                return self._add(("neg", self._expect(node.operand, "number")), "number")
+            if isinstance(node.op, ast.UAdd):
+                return self._expect(node.operand, "number")
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            name = _ARITHMETIC[type(node.op)][0]
+            left = self._expect(node.left, "number")
+            right = self._expect(node.right, "number")
+            return self._add(("arith", name, left, right), "number")
+
+        if isinstance(node, ast.BoolOp):
+            name = "and" if isinstance(node.op, ast.And) else "or"
+            operands = tuple(self._expect(value, "bool") for value in node.values)
+            return self._add((name, *operands), "bool")
+
+        if isinstance(node, ast.Compare):
+            # a < b < c is (a < b) and (b < c)
+            terms = [self._expect(node.left, "number")]
+            terms += [self._expect(comparator, "number") for comparator in node.comparators]
+            comparisons = []
+            for op, left, right in zip(node.ops, terms, terms[1:]):
+                if type(op) not in _COMPARISONS:
+                    raise ValueError(f"Unsupported comparison: {ast.unparse(node)}")
+                comparisons.append(self._add(("compare", _COMPARISONS[type(op)][0], left, right), "bool"))
+            if len(comparisons) == 1:
+                return comparisons[0]
+            return self._add(("and", *comparisons), "bool")
+
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Call):
+            return self._indicator(node.value, node.attr)
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            function = node.func.id
+            if function in INDICATOR_FUNCTIONS:
+                return self._indicator(node, None)
+            if function == "on":
+                return self._on(node)
+            if node.keywords and function != "prev":
+                raise ValueError(f"{function} takes no keyword arguments")
+            if function in ("crosses_above", "crosses_below") and len(node.args) == 2:
+                left = self._expect(node.args[0], "number")
+                right = self._expect(node.args[1], "number")
+                return self._add((function, left, right), "bool")
+            if function == "abs" and len(node.args) == 1:
+                return self._add(("abs", self._expect(node.args[0], "number")), "number")
+            if function == "prev":
+                arguments = node.args + [keyword.value for keyword in node.keywords if keyword.arg == "n"]
+                if len(arguments) not in (1, 2) or len(node.args) + len(node.keywords) != len(arguments):
+                    raise ValueError("prev takes a series and an optional whole number n")
+                n = 1
+                if len(arguments) == 2:
+                    if not (isinstance(arguments[1], ast.Constant) and isinstance(arguments[1].value, int)) or arguments[1].value < 1:
+                        raise ValueError("prev's n must be a positive whole number")
+                    n = arguments[1].value
+                return self._add(("prev", self._expect(arguments[0], "number"), n), "number")
+            raise ValueError(f"Unknown function or wrong arguments: {ast.unparse(node)}")
+
+        raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+    def _indicator(self, call: ast.Call, line) -> NodeKey:
+        if not isinstance(call.func, ast.Name) or call.func.id not in INDICATOR_FUNCTIONS:
+            raise ValueError(f"Unknown indicator: {ast.unparse(call.func)}")
+        function = call.func.id
+        _, signature, lines = INDICATOR_FUNCTIONS[function]
+        if line is not None and line not in lines:
+            raise ValueError(f"{function} has no line {line} (available: {', '.join(lines)})")
+        if len(call.args) > len(signature):
+            raise ValueError(f"{function} takes at most {len(signature)} arguments")
+
+        names = [name for name, _ in signature]
+        arguments = {name: self._add(("const", float(default)), "number") for name, default in signature}
+        for name, value in zip(names, call.args):
+            arguments[name] = self._scalar(value)
+        for keyword in call.keywords:
+            if keyword.arg not in arguments:
+                raise ValueError(f"{function} has no argument {keyword.arg}")
+            arguments[keyword.arg] = self._scalar(keyword.value)
+        return self._add(
+            ("indicator", function, tuple(arguments[name] for name in names), line or lines[0], *self._context()),
+            "number"
+        )
+
+    def _context(self) -> Tuple:
+        return (self._timeframe,) if self._timeframe else ()
+
+    def _on(self, call: ast.Call) -> NodeKey:
+        if call.keywords or len(call.args) != 2:
+            raise ValueError('on takes a timeframe and an expression, e.g. on("1h", EMA(50))')
+        timeframe = call.args[0]
+        timeframes = [tf.value for tf in TimeFrame]
+        if not (isinstance(timeframe, ast.Constant) and timeframe.value in timeframes):
+            raise ValueError(f"on's timeframe must be one of {', '.join(timeframes)}")
+        if self._timeframe is not None:
+            raise ValueError("on(...) cannot be nested")
+        self._timeframe = timeframe.value
+        try:
+            key = self._expect(call.args[1], "number")
+        finally:
+            self._timeframe = None
+        if timeframe.value not in self.timeframes:
+            self.timeframes.append(timeframe.value)
+        return key
+
+    @staticmethod
+    def _scalar_value(key: NodeKey, parameters: Dict) -> float:
+        if key[0] == "const":
+            return key[1]
+        if key[1] not in parameters:
+            raise ValueError(f"Unknown parameter: {key[1]}")
+        value = parameters[key[1]]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Parameter {key[1]} must be a number")
+        return float(value)
+
+    def _resolve(self, key: NodeKey, parameters: Dict) -> Tuple[str, str, int, Dict, int]:
+        function, argument_keys = key[1], key[2]
+        names = [name for name, _ in INDICATOR_FUNCTIONS[function][1]]
+        arguments = {name: self._scalar_value(arg, parameters) for name, arg in zip(names, argument_keys)}
+        return _indicator_spec(function, arguments)
+
+    def lookback(self, parameters: Dict, defined_from: Dict[NodeKey, int] = None) -> int:
+        """
+        Candles needed before every rule's inputs are defined on the history
+        seen so far; rules are false on earlier candles.
+
+        Higher-timeframe inputs count from ``defined_from``, their first
+        candle with a closed bar; without it, from the first candle.
+        """
+        needed = {}
+        for key in self._nodes:
+            kind = key[0]
+            if kind in ("const", "param"):
+                needed[key] = 0
+            elif kind in ("column", "indicator") and _timeframe_of(key):
+                needed[key] = (defined_from or {}).get(key, 0) + 1
+            elif kind == "column":
+                needed[key] = 1
+            elif kind == "indicator":
+                needed[key] = self._resolve(key, parameters)[4]
+            elif kind == "prev":
+                # The shifted value is defined n candles after its input
+                needed[key] = needed[key[1]] + key[2]
+            elif kind in ("crosses_above", "crosses_below"):
+                needed[key] = max(needed[key[1]], needed[key[2]]) + 1
+            else:
+                needed[key] = max([needed[dep] for dep in key[1:] if isinstance(dep, tuple)], default=0)
+        return max((needed[root] for root in self.roots.values()), default=0)
+
+    def indicators(self, parameters: Dict) -> List[Tuple[str, str, int, Dict, str, str]]:
+        """
+        (name, indicator type, period, params, line, timeframe or None) of
+        every indicator the rules read
+        """
+        indicators = []
+        for key in self._nodes:
+            if key[0] == "indicator":
+                name, indicator_type, period, params, _ = self._resolve(key, parameters)
+                indicators.append((name, indicator_type, period, params, key[3], _timeframe_of(key)))
+        return indicators
+
+    def evaluate(
+        self,
+        columns: Dict[str, np.ndarray],
+        parameters: Dict,
+        indicator_lines: Callable[[str, int, Dict, str], Dict[str, np.ndarray]],
+        timeframe_columns: Callable[[str], Dict[str, np.ndarray]] = None
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Every rule for every candle of ``columns``, plus the indicator lines
+        read (keyed like ``Signal.indicators``).
+
+        ``indicator_lines(type, period, params, timeframe)`` supplies an
+        indicator's output lines as arrays, and ``timeframe_columns(timeframe)``
+        the price columns of a higher timeframe; both aligned to the candles
+        of ``columns``, NaN where no bar has closed yet (timeframe is None for
+        the base candles). Conditions are false before ``lookback``.
+        """
+        n = len(columns["close"])
+        results = {}
+        indicators = {}
+        defined_from = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for key in self._nodes:
+                kind = key[0]
+                if kind in ("const", "param"):
+                    value = self._scalar_value(key, parameters)
+                elif kind == "column":
+                    timeframe = _timeframe_of(key)
+                    value = timeframe_columns(timeframe)[key[1]] if timeframe else columns[key[1]]
+                elif kind == "indicator":
+                    name, indicator_type, period, params, _ = self._resolve(key, parameters)
+                    line, timeframe = key[3], _timeframe_of(key)
+                    value = indicator_lines(indicator_type, period, params, timeframe)[line]
+                    main = INDICATOR_FUNCTIONS[key[1]][2][0]
+                    label = name if line == main else f"{name}_{line}"
+                    indicators[f"{label}@{timeframe}" if timeframe else label] = value
+                elif kind == "neg":
+                    value = -results[key[1]]
+                elif kind == "abs":
+                    value = np.abs(results[key[1]])
+                elif kind in ("arith", "compare"):
+                    value = _OPERATORS[key[1]](results[key[2]], results[key[3]])
+                elif kind == "not":
+                    value = ~np.asarray(results[key[1]], dtype=bool)
+                elif kind == "and":
+                    value = reduce(np.logical_and, [results[dep] for dep in key[1:]])
+                elif kind == "or":
+                    value = reduce(np.logical_or, [results[dep] for dep in key[1:]])
+                elif kind == "prev":
+                    value = _shift(results[key[1]], key[2])
+                elif kind == "crosses_above":
+                    a, b = results[key[1]], results[key[2]]
+                    value = (_shift(a, 1) <= _shift(b, 1)) & (a > b)
+                else:  # crosses_below
+                    a, b = results[key[1]], results[key[2]]
+                    value = (_shift(a, 1) >= _shift(b, 1)) & (a < b)
+                if kind in ("column", "indicator") and _timeframe_of(key):
+                    defined = np.flatnonzero(~np.isnan(value))
+                    defined_from[key] = int(defined[0]) if len(defined) else n
+                results[key] = value
+
+        ready = np.arange(1, n + 1) >= self.lookback(parameters, defined_from)
+        outputs = {}
+        for name, root in self.roots.items():
+            value = np.broadcast_to(results[root], (n,))
+            if self._nodes[root] == "bool":
+                outputs[name] = ready & value.astype(bool)
+            else:
+                outputs[name] = np.asarray(value, dtype=np.float64)
+        return outputs, indicators
+
+
+@lru_cache(maxsize=256)
+def _compile(conditions: Tuple[Tuple[str, str], ...], numbers: Tuple[Tuple[str, str], ...]) -> RulePlan:
+    plan = RulePlan()
+    for name, expression in conditions:
+        plan.compile(name, expression, "bool")
+    for name, expression in numbers:
+        plan.compile(name, expression, "number")
+    return plan
+
+
+def compile_rules(conditions: Dict[str, str], numbers: Dict[str, str] = None) -> RulePlan:
+    """
+    Compile condition rules (e.g. ``buy``/``sell``) and numeric rules (e.g.
+    ``confidence``) into one plan. Plans are memoized by the rule texts, so
+    repeated evaluations of the same strategy parse nothing.
+    """
+    for name, expression in list(conditions.items()) + list((numbers or {}).items()):
+        if not isinstance(expression, str):
+            raise ValueError(f"The {name} rule must be an expression string")
+    return _compile(tuple(conditions.items()), tuple((numbers or {}).items()))
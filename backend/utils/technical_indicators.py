@@ -1,13 +1,17 @@
 """
 Technical Indicators Calculation Module
 Implements common trading indicators without external TA-Lib dependency
+
+Inputs may be plain lists or the float64 columns of an ``OHLCVSeries``.
 """
 import numpy as np
 import pandas as pd
-from typing import Tuple, List
+from typing import Tuple, List, Union
+
+ArrayLike = Union[List[float], np.ndarray]
 
 
-def calculate_sma(data: List[float], period: int = 14) -> List[float]:
+def calculate_sma(data: ArrayLike, period: int = 14) -> List[float]:
     """
     Calculate Simple Moving Average
     """
@@ -19,7 +23,7 @@ def calculate_sma(data: List[float], period: int = 14) -> List[float]:
     return sma.fillna(0).tolist()
 
 
-def calculate_ema(data: List[float], period: int = 14) -> List[float]:
+def calculate_ema(data: ArrayLike, period: int = 14) -> List[float]:
     """
     Calculate Exponential Moving Average
     """
@@ -31,7 +35,7 @@ def calculate_ema(data: List[float], period: int = 14) -> List[float]:
     return ema.fillna(0).tolist()
 
 
-def calculate_rsi(data: List[float], period: int = 14) -> List[float]:
+def calculate_rsi(data: ArrayLike, period: int = 14) -> List[float]:
     """
     Calculate Relative Strength Index
     """
@@ -51,7 +55,7 @@ def calculate_rsi(data: List[float], period: int = 14) -> List[float]:
 
 
 def calculate_macd(
-    data: List[float], 
+    data: ArrayLike, 
     fast_period: int = 12, 
     slow_period: int = 26, 
     signal_period: int = 9
@@ -81,7 +85,7 @@ def calculate_macd(
 
 
 def calculate_bollinger_bands(
-    data: List[float], 
+    data: ArrayLike, 
     period: int = 20, 
     std_dev: float = 2.0
 ) -> Tuple[List[float], List[float], List[float]]:
@@ -109,9 +113,9 @@ def calculate_bollinger_bands(
 
 
 def calculate_atr(
-    high: List[float], 
-    low: List[float], 
-    close: List[float], 
+    high: ArrayLike, 
+    low: ArrayLike, 
+    close: ArrayLike, 
     period: int = 14
 ) -> List[float]:
     """
@@ -138,9 +142,9 @@ def calculate_atr(
 
 
 def calculate_stochastic(
-    high: List[float], 
-    low: List[float], 
-    close: List[float], 
+    high: ArrayLike, 
+    low: ArrayLike, 
+    close: ArrayLike, 
     k_period: int = 14,
     d_period: int = 3
 ) -> Tuple[List[float], List[float]]: